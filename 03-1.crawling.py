@@ -1,100 +1,248 @@
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.common.keys import Keys
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.common.action_chains import ActionChains
 import time
 import traceback
 import json
 from datetime import datetime
 import os
 
+from bigkinds_http import BigKindsHttpCrawler
+from snapshot_store import SnapshotStore
+
+BIGKINDS_URL = os.getenv("BIGKINDS_URL", "https://www.bigkinds.or.kr/")
+CRAWL_BACKEND = os.getenv("CRAWL_BACKEND", "selenium")    # selenium | http (실험적, 실패 시 selenium으로 대체)
+CRAWL_MODE = os.getenv("CRAWL_MODE", "single_pass")       # selenium 방식: single_pass | legacy
+CRAWL_HEADLESS = os.getenv("CRAWL_HEADLESS", "on") != "off"
+CRAWL_MAX_ISSUES = int(os.getenv("CRAWL_MAX_ISSUES", "10"))
+
+NEXT_BUTTON_SELECTOR = 'div.swiper-button-next.section2-btn.st2-sw1-next'
+POPUP_TITLE_SELECTOR = 'p.issuPopTitle'
+POPUP_CONTENT_SELECTOR = 'p.pT20.issuPopContent'
+
+
+# selenium은 HTTP 크롤링이 실패해 대체 경로를 쓸 때만 불러옴 (HTTP 백엔드만 쓰면 설치 불필요)
+webdriver = By = Keys = WebDriverWait = EC = ActionChains = None
+
+
+def _load_selenium():
+    global webdriver, By, Keys, WebDriverWait, EC, ActionChains
+    if webdriver is not None:
+        return
+    try:
+        from selenium import webdriver as _webdriver
+        from selenium.webdriver.common.by import By as _By
+        from selenium.webdriver.common.keys import Keys as _Keys
+        from selenium.webdriver.support.ui import WebDriverWait as _WebDriverWait
+        from selenium.webdriver.support import expected_conditions as _EC
+        from selenium.webdriver.common.action_chains import ActionChains as _ActionChains
+    except ImportError as e:
+        raise RuntimeError("Selenium 크롤링에는 selenium 패키지가 필요합니다 (pip install selenium). "
+                           "HTTP 백엔드는 BIGKINDS_ISSUE_LIST_URL을 설정하세요.") from e
+    webdriver, By, Keys, WebDriverWait, EC, ActionChains = (
+        _webdriver, _By, _Keys, _WebDriverWait, _EC, _ActionChains)
+
+
 # 1. 크롬 드라이버 설정
-options = webdriver.ChromeOptions()
-options.add_argument("--start-maximized")
-driver = webdriver.Chrome(options=options)
-wait = WebDriverWait(driver, 10)
+def create_driver(headless=True):
+    _load_selenium()
+    options = webdriver.ChromeOptions()
+    if headless:
+        options.add_argument("--headless=new")
+        options.add_argument("--window-size=1920,1080")
+    else:
+        options.add_argument("--start-maximized")
+    return webdriver.Chrome(options=options)
 
-# 2. 사이트 접속
-driver.get("https://www.bigkinds.or.kr/")
-time.sleep(2)
 
-# ✅ 강제 스크롤: 오늘의 이슈 섹션이 보이도록 880px 아래로 이동
-try:
-    driver.execute_script("window.scrollTo(0, 880);")
-    time.sleep(1)
-    print("✅ 스크롤 이동 완료")
-except Exception as e:
-    print("❌ 스크롤 이동 실패")
-    traceback.print_exc()
-
-# 3. 전체 카테고리 클릭
-try:
-    category_button = wait.until(EC.element_to_be_clickable((By.CSS_SELECTOR, 'a.issue-category[data-category="전체"]')))
+# 2. 사이트 접속 후 '전체' 카테고리 선택
+def open_issue_section(driver, wait, url):
+    driver.get(url)
+
+    category_button = wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, 'a.issue-category[data-category="전체"]')))
+    # ✅ 오늘의 이슈 섹션이 보이도록 스크롤 (고정 880px 대신 요소 위치 기준)
+    driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", category_button)
     driver.execute_script("arguments[0].click();", category_button)
+    # 카테고리 선택 후 첫 번째 슬라이드가 그려질 때까지 대기
+    wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, 'div.swiper-slide:nth-child(1) .issue-item-link')))
     print("✅ 카테고리 클릭 완료")
-    time.sleep(3)
-except Exception as e:
-    print("❌ 카테고리 클릭 실패")
-    traceback.print_exc()
-
-# 4. 이슈 크롤링
-results = []
-for i in range(1, 11):
-    print(f"▶️ {i}번 이슈 처리 시작")
-    try:
-        # 4-1. 슬라이드 넘기기 (4번부터는 수동으로 넘겨야 보임)
-        if i >= 3:
-            for _ in range(i - 3):
-                try:
-                    next_btn = driver.find_element(By.CSS_SELECTOR, 'div.swiper-button-next.section2-btn.st2-sw1-next')
-                    is_disabled = next_btn.get_attribute('aria-disabled') == 'true'
-                    if is_disabled:
-                        break
-                    driver.execute_script("arguments[0].click();", next_btn)
-                    time.sleep(0.8)
-                except Exception as e:
-                    print(f"⚠️ 슬라이드 넘기기 중 오류 발생 (이슈 {i}): {e}")
+
+
+def _slide_is_visible(driver, element):
+    """슬라이드가 캐러셀 영역 안에 보이는지 (화면 밖으로 밀려난 슬라이드는 False)"""
+    return driver.execute_script("""
+        const el = arguments[0];
+        const container = el.closest('.swiper-container, .swiper') || el.parentElement;
+        const r = el.getBoundingClientRect(), c = container.getBoundingClientRect();
+        return r.width > 0 && r.left >= c.left - 1 && r.right <= c.right + 1;
+    """, element)
+
+
+def _advance_carousel(driver, wait):
+    """'다음' 버튼을 한 번 누르고 슬라이드 이동이 끝날 때까지 대기 (더 넘길 수 없으면 False)"""
+    next_btn = driver.find_element(By.CSS_SELECTOR, NEXT_BUTTON_SELECTOR)
+    if next_btn.get_attribute('aria-disabled') == 'true':
+        return False
+    wrapper = driver.find_element(By.CSS_SELECTOR, 'div.swiper-wrapper')
+    before = wrapper.get_attribute('style')
+    driver.execute_script("arguments[0].click();", next_btn)
+    # 고정 sleep 대신 wrapper의 transform이 바뀌고 CSS 전환 애니메이션이 끝날 때까지 대기
+    wait.until(lambda d: wrapper.get_attribute('style') != before)
+    wait.until(lambda d: d.execute_script("return arguments[0].getAnimations().length === 0;", wrapper))
+    return True
+
+
+def _clear_popup(driver):
+    """이전 이슈의 팝업 제목/내용을 비움 (다음 팝업이 새로 채워졌는지 제목 비교 없이 알 수 있도록)"""
+    driver.execute_script("""
+        for (const selector of arguments) {
+            const el = document.querySelector(selector);
+            if (el) el.textContent = '';
+        }
+    """, POPUP_TITLE_SELECTOR, POPUP_CONTENT_SELECTOR)
+
+
+def _read_popup(driver, wait):
+    """팝업이 열리고 제목/내용이 채워질 때까지 기다린 뒤 (제목, 내용) 반환
+
+    클릭 전에 _clear_popup으로 비워 두므로, 연속한 두 이슈의 제목이 같아도
+    이전 팝업 내용을 새 이슈로 잘못 읽거나 제목이 바뀌기를 기다리다 시간 초과되지 않는다.
+    """
+    wait.until(lambda d: (
+        d.find_element(By.CSS_SELECTOR, POPUP_TITLE_SELECTOR).is_displayed()
+        and d.find_element(By.CSS_SELECTOR, POPUP_TITLE_SELECTOR).text.strip() != ""
+        and d.find_element(By.CSS_SELECTOR, POPUP_CONTENT_SELECTOR).text.strip() != ""
+    ))
+    title = driver.find_element(By.CSS_SELECTOR, POPUP_TITLE_SELECTOR).text.strip()
+    content = driver.find_element(By.CSS_SELECTOR, POPUP_CONTENT_SELECTOR).text.strip()
+    return title, content
+
+
+def _close_popup(driver, wait):
+    ActionChains(driver).send_keys(Keys.ESCAPE).perform()
+    wait.until(EC.invisibility_of_element_located((By.CSS_SELECTOR, POPUP_TITLE_SELECTOR)))
+
+
+# 3. 이슈 크롤링 (캐러셀을 처음부터 끝까지 한 번만 이동)
+def crawl_issues_single_pass(driver, wait, max_issues=10):
+    """슬라이드가 화면 밖에 있을 때만 '다음'을 눌러서 캐러셀을 한 방향으로 한 번만 훑는다"""
+    results = []
+    for i in range(1, max_issues + 1):
+        print(f"▶️ {i}번 이슈 처리 시작")
+        try:
+            issue_selector = f'div.swiper-slide:nth-child({i}) .issue-item-link'
+            issue_element = wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, issue_selector)))
+
+            # 3-1. 보이지 않는 슬라이드면 보일 때까지 한 칸씩 이동 (이미 넘긴 칸은 다시 넘기지 않음)
+            while not _slide_is_visible(driver, issue_element):
+                if not _advance_carousel(driver, wait):
                     break
 
-        # 4-2. 이슈 클릭
-        issue_selector = f'div.swiper-slide:nth-child({i}) .issue-item-link'
-        issue_element = wait.until(EC.element_to_be_clickable((By.CSS_SELECTOR, issue_selector)))
-        driver.execute_script("arguments[0].scrollIntoView(true);", issue_element)
-        driver.execute_script("arguments[0].click();", issue_element)
+            # 3-2. 이슈 클릭 → 팝업 내용 및 제목 추출
+            _clear_popup(driver)
+            driver.execute_script("arguments[0].click();", issue_element)
+            title, content = _read_popup(driver, wait)
+
+            results.append({
+                "이슈번호": i,
+                "제목": title,
+                "내용": content
+            })
+
+            # 3-3. 팝업 닫기 (닫힐 때까지 대기, 스크롤 위치는 그대로 유지)
+            _close_popup(driver, wait)
+
+        except Exception as e:
+            print(f"❌ {i}번 이슈 처리 중 오류 발생:")
+            traceback.print_exc()
+    return results
+
+
+# 기존 방식: 이슈마다 슬라이드를 다시 넘기고 고정 시간 대기 (비교용)
+def crawl_issues_legacy(driver, wait, max_issues=10):
+    # ✅ 강제 스크롤: 오늘의 이슈 섹션이 보이도록 880px 아래로 이동
+    driver.execute_script("window.scrollTo(0, 880);")
+    time.sleep(1)
+
+    results = []
+    for i in range(1, max_issues + 1):
+        print(f"▶️ {i}번 이슈 처리 시작")
+        try:
+            # 슬라이드 넘기기 (4번부터는 수동으로 넘겨야 보임)
+            if i >= 3:
+                for _ in range(i - 3):
+                    try:
+                        next_btn = driver.find_element(By.CSS_SELECTOR, NEXT_BUTTON_SELECTOR)
+                        is_disabled = next_btn.get_attribute('aria-disabled') == 'true'
+                        if is_disabled:
+                            break
+                        driver.execute_script("arguments[0].click();", next_btn)
+                        time.sleep(0.8)
+                    except Exception as e:
+                        print(f"⚠️ 슬라이드 넘기기 중 오류 발생 (이슈 {i}): {e}")
+                        break
 
-        # 4-3. 팝업 내용 및 제목 추출
-        title_elem = wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, 'p.issuPopTitle')))
-        content_elem = wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, 'p.pT20.issuPopContent')))
+            # 이슈 클릭
+            issue_selector = f'div.swiper-slide:nth-child({i}) .issue-item-link'
+            issue_element = wait.until(EC.element_to_be_clickable((By.CSS_SELECTOR, issue_selector)))
+            driver.execute_script("arguments[0].scrollIntoView(true);", issue_element)
+            driver.execute_script("arguments[0].click();", issue_element)
 
-        title = title_elem.text.strip()
-        content = content_elem.text.strip()
+            # 팝업 내용 및 제목 추출
+            title_elem = wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, POPUP_TITLE_SELECTOR)))
+            content_elem = wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, POPUP_CONTENT_SELECTOR)))
 
-        results.append({
-            "이슈번호": i,
-            "제목": title,
-            "내용": content
-        })
+            results.append({
+                "이슈번호": i,
+                "제목": title_elem.text.strip(),
+                "내용": content_elem.text.strip()
+            })
 
-        # 4-4. 팝업 닫기
-        ActionChains(driver).send_keys(Keys.ESCAPE).perform()
-        time.sleep(1)
+            # 팝업 닫기 후 다시 화면을 아래로 스크롤
+            ActionChains(driver).send_keys(Keys.ESCAPE).perform()
+            time.sleep(1)
+            driver.execute_script("window.scrollTo(0, 880);")
+            time.sleep(1)
 
-        # 4-5. 팝업 닫은 후 다시 화면을 아래로 스크롤
-        driver.execute_script("window.scrollTo(0, 880);")
-        time.sleep(1)
+        except Exception as e:
+            print(f"❌ {i}번 이슈 처리 중 오류 발생:")
+            traceback.print_exc()
+    return results
 
+
+def crawl_issues_http(max_issues=CRAWL_MAX_ISSUES):
+    """HTTP 백엔드로 크롤링 (목록/상세 URL이 설정되지 않았거나 실패하면 None)"""
+    crawler = BigKindsHttpCrawler()
+    if not crawler.configured:
+        print("ℹ️ BIGKINDS_ISSUE_LIST_URL이 설정되지 않아 Selenium으로 크롤링합니다.")
+        return None
+    try:
+        results = crawler.crawl(max_issues)
     except Exception as e:
-        print(f"❌ {i}번 이슈 처리 중 오류 발생:")
-        traceback.print_exc()
+        print(f"⚠️ HTTP 크롤링 실패, Selenium으로 대체합니다: {e}")
+        return None
+    if not results:
+        print("⚠️ HTTP 응답에서 이슈를 찾지 못해 Selenium으로 대체합니다.")
+        return None
+    print(f"✅ HTTP 크롤링 완료: {len(results)}개 이슈")
+    return results
+
 
-# 5. 결과 출력
-for r in results:
-    print(f"\n이슈 {r['이슈번호']} 제목: {r['제목']}")
-    print(f"내용:\n{r['내용']}\n{'='*60}")
+def crawl_issues(url=BIGKINDS_URL, mode=CRAWL_MODE, headless=CRAWL_HEADLESS, max_issues=CRAWL_MAX_ISSUES,
+                 backend=CRAWL_BACKEND):
+    """BigKinds 오늘의 이슈 크롤링 (로컬 픽스처 테스트: BIGKINDS_URL=http://localhost:8000/fixtures/bigkinds_issues.html)"""
+    if backend == "http":
+        results = crawl_issues_http(max_issues)
+        if results is not None:
+            return results
+
+    driver = create_driver(headless)
+    wait = WebDriverWait(driver, 10)
+    try:
+        open_issue_section(driver, wait, url)
+        if mode == "legacy":
+            return crawl_issues_legacy(driver, wait, max_issues)
+        return crawl_issues_single_pass(driver, wait, max_issues)
+    finally:
+        driver.quit()
 
-driver.quit()
 
 # ====== JSON 저장 함수 ======
 def save_to_json(data):
@@ -123,6 +271,9 @@ def save_to_json(data):
         with open(filepath, 'w', encoding='utf-8') as f:
             json.dump(save_data, f, ensure_ascii=False, indent=2)
         
+        # 매니페스트에 등록 (최신 스냅샷 조회 / 변경분 계산용)
+        SnapshotStore().register(filepath)
+
         print(f"✅ JSON 저장 완료: {filepath}")
         print(f"📊 저장된 이슈 수: {len(data)}개")
         
@@ -158,8 +309,15 @@ def load_from_json(filepath):
 
 # ====== 사용 예시 ======
 if __name__ == "__main__":
-    # 크롤링 결과가 results에 저장되어 있다고 가정
-    
+    start = time.time()
+    results = crawl_issues()
+    print(f"⏱️ 크롤링 소요 시간: {time.time() - start:.1f}초")
+
+    # 4. 결과 출력
+    for r in results:
+        print(f"\n이슈 {r['이슈번호']} 제목: {r['제목']}")
+        print(f"내용:\n{r['내용']}\n{'='*60}")
+
     # JSON 파일로 저장
     saved_file = save_to_json(results)
     
@@ -1,11 +1,11 @@
 from dotenv import load_dotenv
 import os
-import json
-import glob
 from langchain.schema import Document
-from langchain_openai import OpenAIEmbeddings
-from langchain.text_splitter import RecursiveCharacterTextSplitter
-from pinecone import Pinecone, ServerlessSpec
+from ingest_utils import IngestCheckpoint, iter_chunk_ids, make_token_text_splitter, pipelined_upsert
+from embedding_cache import get_embeddings
+from vector_stores import get_index
+from snapshot_store import SnapshotStore, issue_hash
+from tracing import get_tracer
 
 # 환경 변수 로드
 load_dotenv(override=True)
@@ -16,54 +16,98 @@ OPENAI_EMBEDDING_MODEL = os.getenv("OPENAI_EMBEDDING_MODEL")
 PINECONE_INDEX_NAME = os.getenv("PINECONE_INDEX_NAME")
 PINECONE_NAMESPACE = os.getenv("PINECONE_NAMESPACE")
 
+# 현재 이슈를 적재할 namespace / 배치 체크포인트 파일
+CURRENT_ISSUE_NAMESPACE = os.getenv("CURRENT_ISSUE_NAMESPACE", "current_issue")
+CHECKPOINT_PATH = os.getenv("CURRENT_ISSUE_CHECKPOINT", ".cache/checkpoints/current_issue.json")
 
-def load_latest_current_issues():
-    """최신 현재이슈 JSON 파일을 자동으로 로드"""
-    json_files = glob.glob("data2/*_BigKinds_current_issues.json")
-    if not json_files:
-        raise FileNotFoundError("현재이슈 JSON 파일을 찾을 수 없습니다.")
-    
-    latest_file = max(json_files, key=os.path.getctime)
-    print(f"📂 로드하는 파일: {latest_file}")
-    
-    with open(latest_file, "r", encoding="utf-8") as f:
-        data = json.load(f)
-    
-    issues = data["issues"]
-    docs = [
-        Document(
+# 적재 범위: all(기본, 최신 스냅샷 전체) / delta(이전에 적재한 스냅샷 이후 새 이슈만)
+INGEST_SCOPE = os.getenv("INGEST_SCOPE", "all")
+
+# 파이프라인 적재 설정: 임베딩 배치 / upsert 배치 / 동시 임베딩 요청 수
+EMBED_BATCH_SIZE = int(os.getenv("EMBED_BATCH_SIZE", "50"))
+UPSERT_BATCH_SIZE = int(os.getenv("UPSERT_BATCH_SIZE", "100"))
+INGEST_CONCURRENCY = int(os.getenv("INGEST_CONCURRENCY", "4"))
+
+# 스냅샷 매니페스트에 남기는 적재 완료 기록 이름
+STORE_CONSUMER = "ingest:current_issue"
+
+
+def iter_issue_documents(issues):
+    """이슈를 하나씩 Document로 변환 (issue_hash: 같은 내용이면 스냅샷이 달라도 같은 ID의 행 키)"""
+    for item in issues:
+        yield Document(
             page_content=f"{item['제목']}\n{item['내용']}",
-            metadata={"이슈번호": item["이슈번호"], "제목": item["제목"]}
+            metadata={
+                "이슈번호": item["이슈번호"],
+                "제목": item["제목"],
+                "entity": item["제목"],
+                "issue_hash": issue_hash(item),
+            }
         )
-        for item in issues
-    ]
-    
-    return docs
+
+
+def iter_issue_chunks(issues, text_splitter):
+    """이슈 단위로 분할해서 바로 흘려보냄 (전체 분할을 기다리지 않음)"""
+    for doc in iter_issue_documents(issues):
+        yield from text_splitter.split_documents([doc])
+
+
+def load_latest_current_issues(store, since=None):
+    """최신 현재이슈 스냅샷을 로드 (since: 이 스냅샷까지 나온 적 없는 이슈만)"""
+    latest_file = store.latest()
+    print(f"📂 로드하는 파일: {latest_file}")
+    return latest_file, store.changed_since(since, latest_file)
 
 
 def main():
-    # 문서 로드
-    docs = load_latest_current_issues()
-    
+    store = SnapshotStore()
+    since = store.get_checkpoint(STORE_CONSUMER) if INGEST_SCOPE == "delta" else None
+    latest_file, issues = load_latest_current_issues(store, since)
+    print(f"🔎 적재할 이슈: {len(issues)}개" + (f" ({since} 이후 새 이슈/변경된 이슈)" if since else ""))
+    if not issues and since:
+        print(f"ℹ️ '{since}'까지 이미 적재한 이슈뿐입니다 (최신 스냅샷 전체를 적재하려면 INGEST_SCOPE=all)")
+
+    # 같은 스냅샷을 적재하다 중단된 경우 이미 올린 배치는 건너뜀
+    checkpoint = IngestCheckpoint(CHECKPOINT_PATH, os.path.basename(latest_file))
+    if checkpoint.completed_ids:
+        print(f"♻️ 체크포인트에서 재개: {len(checkpoint.completed_ids)}개 청크는 이미 업로드됨")
+
     # embedding 모델 객체 생성
-    embeddings = OpenAIEmbeddings(model="text-embedding-3-small")
-    
-    # Pinecone 클라이언트 초기화
-    pc = Pinecone(api_key=PINECONE_API_KEY)
+    embeddings = get_embeddings(model="text-embedding-3-small")
     
-    # 텍스트 분할기 설정
-    text_splitter = RecursiveCharacterTextSplitter(
-        chunk_size=450, 
-        chunk_overlap=45,
-        length_function=len,  # 문자수   
-        separators=["\n\n", "\n", " ", ""]
-    )
+    # 벡터 인덱스 연결 (VECTOR_BACKEND=local 이면 로컬 인덱스 사용)
+    index = get_index("lastproject")
     
-    # 문서를 분할
-    chunks = text_splitter.split_documents(docs)
-    
-    return chunks, embeddings, pc
+    # 텍스트 분할기 설정 (문자 450개 기준, CHUNK_UNIT=tokens 이면 토큰 300개 기준)
+    text_splitter = make_token_text_splitter(300, 30, 450, 45)
+
+    # 이슈 → 분할 → 결정적 ID → (체크포인트에 없는 것만) 임베딩/업로드
+    def pending_pairs():
+        for chunk_id, chunk in iter_chunk_ids(iter_issue_chunks(issues, text_splitter),
+                                              CURRENT_ISSUE_NAMESPACE, row_key_field="issue_hash"):
+            if chunk_id not in checkpoint.completed_ids:
+                yield chunk_id, chunk
+
+    with get_tracer().span(f"ingest.{CURRENT_ISSUE_NAMESPACE}", issues=len(issues)) as span:
+        uploaded = pipelined_upsert(
+            pending_pairs(), embeddings, index, CURRENT_ISSUE_NAMESPACE,
+            embed_batch_size=EMBED_BATCH_SIZE,
+            upsert_batch_size=UPSERT_BATCH_SIZE,
+            max_in_flight=INGEST_CONCURRENCY,
+            on_batch=checkpoint.record
+        )
+        span["new"] = uploaded
+
+    # 로컬 백엔드는 변경 내용을 디스크에 기록
+    if hasattr(index, "flush"):
+        index.flush()
+
+    # 스냅샷 전체 적재가 끝났으므로 다음 실행은 이 스냅샷 이후 변경분만 처리
+    store.set_checkpoint(STORE_CONSUMER, latest_file)
+    checkpoint.clear()
+    print(f"✅ 현재 이슈 적재 완료: {uploaded}개 청크 업로드 (namespace: {CURRENT_ISSUE_NAMESPACE})")
 
 
 if __name__ == "__main__":
-    chunks, embeddings, pc = main()
\ No newline at end of file
+    # 03-1 크롤링 직후 실행: python 03-1.crawling.py && python 03-2.crawling_vector.py
+    main()
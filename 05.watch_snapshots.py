@@ -0,0 +1,188 @@
+# 05.watch_snapshots.py
+# data2/에 새 뉴스 스냅샷이 생기면 바로 분석하는 상주(watch) 모드
+# RAGEngine(임베딩/LLM 클라이언트, 후보 CSV, 캐시)을 한 번만 만들어 계속 재사용한다
+#
+# 실행: python 05.watch_snapshots.py  (다른 터미널에서 python 03-1.crawling.py)
+
+import os
+import json
+import time
+import glob
+import queue
+import fnmatch
+
+from dotenv import load_dotenv
+
+from rag_engine import RAGEngine, analyze_and_print, profile_consumer, select_issues
+from snapshot_store import SnapshotStore, SNAPSHOT_PATTERN
+
+# watchdog(inotify)이 설치되어 있지 않으면 주기적으로 폴더를 확인
+try:
+    from watchdog.observers import Observer
+    from watchdog.events import FileSystemEventHandler
+except ImportError:
+    Observer = None
+    FileSystemEventHandler = object
+
+load_dotenv(override=True)
+
+WATCH_DIR = os.getenv("WATCH_DIR", "data2")
+WATCH_POLL_SECONDS = float(os.getenv("WATCH_POLL_SECONDS", "5"))
+ANALYZE_SCOPE = os.getenv("ANALYZE_SCOPE", "delta")
+# 분석이 실패한 스냅샷의 재시도 횟수 / 첫 재시도 대기 시간(초, 이후 두 배씩)
+WATCH_MAX_RETRIES = int(os.getenv("WATCH_MAX_RETRIES", "3"))
+WATCH_RETRY_SECONDS = float(os.getenv("WATCH_RETRY_SECONDS", "30"))
+PROFILE_NAMES = [name.strip() for name in os.getenv("RAG_PROFILES", "industry,past_issue").split(",")]
+
+
+class SnapshotEventHandler(FileSystemEventHandler):
+    """새 스냅샷 파일 생성/이동 이벤트를 큐에 넣음"""
+
+    def __init__(self, events):
+        self.events = events
+
+    def _push(self, path):
+        if fnmatch.fnmatch(os.path.basename(path), SNAPSHOT_PATTERN):
+            self.events.put(path)
+
+    def on_created(self, event):
+        if not event.is_directory:
+            self._push(event.src_path)
+
+    def on_moved(self, event):
+        if not event.is_directory:
+            self._push(event.dest_path)
+
+    def on_closed(self, event):
+        # 파일 쓰기가 끝난 시점 (inotify IN_CLOSE_WRITE)
+        if not event.is_directory:
+            self._push(event.src_path)
+
+
+def poll_snapshots(events, known, watch_dir):
+    """폴링 방식: 이전 확인 이후 새로 생긴 스냅샷 파일을 큐에 넣음"""
+    for path in sorted(glob.glob(os.path.join(watch_dir, SNAPSHOT_PATTERN))):
+        if path not in known:
+            known.add(path)
+            events.put(path)
+
+
+def is_complete(path):
+    """JSON 쓰기가 끝났는지 확인 (쓰는 중이면 파싱 실패)"""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            json.load(f)
+        return True
+    except (OSError, ValueError):
+        return False
+
+
+def analyze_snapshot(engine, store, consumer, path):
+    """스냅샷 하나를 분석하고, 모든 (이슈, 프로필)이 성공하면 True 반환
+
+    체크포인트는 기존 것보다 최신 스냅샷일 때만 옮긴다 (오래된 스냅샷의 재시도가
+    더 최신 스냅샷의 성공 뒤에 끝나도 체크포인트가 뒤로 가지 않음).
+    """
+    started = time.time()
+    store.register(path)
+    print(f"\n📥 새 스냅샷: {os.path.basename(path)}")
+    issues = select_issues(store, path, consumer, ANALYZE_SCOPE)
+    failures = []
+    if issues:
+        _, failures = analyze_and_print(engine, issues)
+    engine.print_stats()
+    engine.tracer.print_summary()    # 상주 프로세스는 종료 시점까지 기다리지 않고 스냅샷마다 누적 요약 출력
+    if failures:
+        # 체크포인트를 옮기지 않으므로 재시도(또는 다음 delta 분석)에서 이 이슈들을 다시 분석
+        print(f"\n⚠️ {len(failures)}개 (이슈, 프로필) 분석 실패 — 분석 완료 기록을 남기지 않습니다")
+        return False
+    store.advance_checkpoint(consumer, path)
+    print(f"\n🎉 {len(issues)}개 이슈 분석 완료 ({time.time() - started:.1f}초)")
+    return True
+
+
+def main():
+    store = SnapshotStore(WATCH_DIR)
+    store.sync()
+    consumer = profile_consumer(PROFILE_NAMES)
+
+    print("🔥 분석 엔진 준비 중 (클라이언트, 후보 목록, 캐시 로드)...")
+    engine = RAGEngine(PROFILE_NAMES)
+
+    events = queue.Queue()
+    known = set(glob.glob(os.path.join(WATCH_DIR, SNAPSHOT_PATTERN)))
+    observer = None
+    if Observer is not None:
+        observer = Observer()
+        observer.schedule(SnapshotEventHandler(events), WATCH_DIR, recursive=False)
+        observer.start()
+        print(f"👀 {WATCH_DIR}/ 감시 시작 (watchdog)")
+    else:
+        print(f"👀 {WATCH_DIR}/ 감시 시작 ({WATCH_POLL_SECONDS:.0f}초 간격 폴링, watchdog 미설치)")
+
+    # 시작 시점에 아직 분석하지 않은 최신 스냅샷이 있으면 먼저 처리
+    try:
+        latest = store.latest()
+        if store.get_checkpoint(consumer) != os.path.basename(latest):
+            events.put(latest)
+    except FileNotFoundError:
+        pass
+
+    processed = set()
+    given_up = set()    # 재시도를 모두 쓴 스냅샷 (중복 이벤트로 다시 재시도하지 않음)
+    retries = {}    # 스냅샷 파일명 -> [실패 횟수, 재시도 시각(0이면 큐에 다시 넣음), 경로]
+    try:
+        while True:
+            if observer is None:
+                poll_snapshots(events, known, WATCH_DIR)
+            now = time.time()
+            for retry in retries.values():
+                if 0 < retry[1] <= now:
+                    retry[1] = 0
+                    events.put(retry[2])
+            try:
+                path = events.get(timeout=WATCH_POLL_SECONDS)
+            except queue.Empty:
+                continue
+
+            name = os.path.basename(path)
+            if name in processed or name in given_up or (name in retries and retries[name][1] > time.time()):
+                # 이미 분석했거나, 포기했거나, 재시도 대기 중 (대기가 끝나면 위에서 다시 큐에 넣음)
+                continue
+            if not is_complete(path):
+                # 아직 쓰는 중이면 잠시 후 다시 확인
+                time.sleep(0.5)
+                events.put(path)
+                continue
+
+            try:
+                succeeded = analyze_snapshot(engine, store, consumer, path)
+            except Exception as e:
+                # 한 스냅샷의 오류로 상주 프로세스가 종료되지 않도록 기록만 하고 재시도
+                print(f"❌ 스냅샷 {name} 분석 중 오류 발생: {e}")
+                succeeded = False
+
+            if succeeded:
+                processed.add(name)
+                retries.pop(name, None)
+                continue
+            attempts = retries.get(name, [0])[0] + 1
+            if attempts > WATCH_MAX_RETRIES:
+                print(f"⛔ {name}: {WATCH_MAX_RETRIES}회 재시도 후 포기 "
+                      f"(이 스냅샷으로는 체크포인트를 옮기지 않음, 다시 분석하려면 ANALYZE_SCOPE=all로 04 실행)")
+                retries.pop(name, None)
+                given_up.add(name)
+                continue
+            delay = WATCH_RETRY_SECONDS * (2 ** (attempts - 1))
+            retries[name] = [attempts, time.time() + delay, path]
+            print(f"⏳ {name}: {delay:.0f}초 후 다시 분석 ({attempts}/{WATCH_MAX_RETRIES})")
+    except KeyboardInterrupt:
+        print("\n👋 감시 종료")
+    finally:
+        if observer is not None:
+            observer.stop()
+            observer.join()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,198 @@
+# 06.rag_service.py
+# 분석 엔진을 한 번만 띄워 두고 HTTP로 분석 요청을 받는 로컬 상주 서비스
+#
+# 실행: python 06.rag_service.py  (기본 http://127.0.0.1:8000)
+#
+# POST /analyze
+#   {"issue": {"제목": "...", "내용": "..."}, "profiles": ["industry"]}   이슈 하나
+#   {"issues": [{...}, ...]}                                                이슈 여러 개
+#   {"snapshot": "latest" | "<파일명>", "scope": "all" | "delta"}          data2/ 스냅샷
+#   profiles 생략 시 서비스에 로드된 전체 프로필(industry, past_issue)로 분석
+#   "stream": true 이면 server-sent events로 응답
+#     event: token   {"issue_index", "profile", "text"}   최종 분석 토큰 (도착하는 대로)
+#     event: result  결과 하나 ((이슈, 프로필) 순서대로)
+#     event: error   실패한 (이슈, 프로필) 하나 {"issue_index", "profile", "title", "error"}
+#     event: done    {"issues", "elapsed_seconds", "failures"}
+#   일부 (이슈, 프로필)이 실패하면 일반 응답은 HTTP 500 + results/failures를 반환하고,
+#   scope=delta 요청의 처리 완료 기록(체크포인트)은 모두 성공했을 때만 남긴다.
+# GET /health
+# GET /stats     서비스 시작 이후 span 이름별 누적 소요 시간 요약 (TRACE=on일 때만, 기본은 빈 목록)
+
+import os
+import json
+import time
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+from dotenv import load_dotenv
+
+from rag_engine import RAGEngine, load_issues, profile_consumer, select_issues
+from snapshot_store import SnapshotStore
+
+load_dotenv(override=True)
+
+SERVICE_HOST = os.getenv("RAG_SERVICE_HOST", "127.0.0.1")
+SERVICE_PORT = int(os.getenv("RAG_SERVICE_PORT", "8000"))
+PROFILE_NAMES = [name.strip() for name in os.getenv("RAG_PROFILES", "industry,past_issue").split(",")]
+
+
+class BadRequest(Exception):
+    pass
+
+
+def _validate_issue(issue):
+    if not isinstance(issue, dict) or not issue.get("제목") or not issue.get("내용"):
+        raise BadRequest("각 이슈에는 '제목'과 '내용'이 필요합니다.")
+    return issue
+
+
+def resolve_issues(store, body, profile_names):
+    """요청 본문에서 분석할 이슈 리스트를 만든다
+
+    Returns:
+        (이슈 리스트, 분석이 모두 성공하면 기록할 (소비자, 스냅샷 경로) 또는 None)
+    """
+    if "issue" in body:
+        return [_validate_issue(body["issue"])], None
+    if "issues" in body:
+        if not isinstance(body["issues"], list):
+            raise BadRequest("'issues'는 리스트여야 합니다.")
+        return [_validate_issue(issue) for issue in body["issues"]], None
+    if "snapshot" in body:
+        snapshot = body["snapshot"]
+        try:
+            path = store.latest() if snapshot == "latest" else os.path.join(store.root, os.path.basename(snapshot))
+        except FileNotFoundError as e:
+            raise BadRequest(str(e))
+        if not os.path.exists(path):
+            raise BadRequest(f"스냅샷을 찾을 수 없습니다: {snapshot}")
+        if body.get("scope", "all") == "delta":
+            # 대시보드용 delta는 CLI/watch 모드와 별도로 기록
+            consumer = "service:" + profile_consumer(profile_names)
+            return select_issues(store, path, consumer, "delta"), (consumer, path)
+        return load_issues(path), None
+    raise BadRequest("'issue', 'issues', 'snapshot' 중 하나가 필요합니다.")
+
+
+class AnalysisHandler(BaseHTTPRequestHandler):
+    engine = None
+    store = None
+
+    def _send_json(self, status, payload):
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _stream_events(self, issues, profile_names, checkpoint):
+        """분석 토큰과 결과를 server-sent events로 전송 (토큰은 작업 스레드에서도 보내므로 lock으로 직렬화)"""
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream; charset=utf-8")
+        self.send_header("Cache-Control", "no-cache")
+        self.end_headers()
+        lock = threading.Lock()
+        state = {"connected": True}
+
+        def send(event, payload):
+            data = json.dumps(payload, ensure_ascii=False)
+            with lock:
+                if not state["connected"]:
+                    return
+                try:
+                    self.wfile.write(f"event: {event}\ndata: {data}\n\n".encode("utf-8"))
+                    self.wfile.flush()
+                except (BrokenPipeError, ConnectionResetError):
+                    # 클라이언트가 연결을 끊어도 분석은 끝까지 진행 (캐시에 남아 재요청 시 재사용)
+                    state["connected"] = False
+
+        def on_text(idx, name, text, part):
+            if part == "analysis":
+                send("token", {"issue_index": idx, "profile": name, "text": text})
+
+        started = time.time()
+        try:
+            _, failures = self.engine.analyze_issues(
+                issues, profile_names, on_text=on_text,
+                on_result=lambda result: send("result", {k: v for k, v in result.items() if k != "text"}),
+                on_error=lambda failure: send("error", failure)
+            )
+        except Exception as e:
+            send("error", {"error": str(e)})
+            return
+        if checkpoint and not failures:
+            self.store.set_checkpoint(*checkpoint)
+        send("done", {"issues": len(issues), "elapsed_seconds": round(time.time() - started, 2),
+                      "failures": len(failures)})
+
+    def do_GET(self):
+        if self.path.rstrip("/") == "/health":
+            self._send_json(200, {"status": "ok", "profiles": list(self.engine.agents)})
+        elif self.path.rstrip("/") == "/stats":
+            self._send_json(200, {"spans": self.engine.tracer.summary()})
+        else:
+            self._send_json(404, {"error": "not found"})
+
+    def do_POST(self):
+        if self.path.rstrip("/") != "/analyze":
+            self._send_json(404, {"error": "not found"})
+            return
+        try:
+            length = int(self.headers.get("Content-Length") or 0)
+            body = json.loads(self.rfile.read(length) or b"{}")
+            if not isinstance(body, dict):
+                raise BadRequest("요청 본문은 JSON 객체여야 합니다.")
+
+            profile_names = body.get("profiles") or list(self.engine.agents)
+            unknown = [name for name in profile_names if name not in self.engine.agents]
+            if unknown:
+                raise BadRequest(f"로드되지 않은 프로필: {', '.join(unknown)}")
+
+            issues, checkpoint = resolve_issues(self.store, body, profile_names)
+        except (BadRequest, ValueError, FileNotFoundError) as e:
+            self._send_json(400, {"error": str(e)})
+            return
+
+        if body.get("stream"):
+            self._stream_events(issues, profile_names, checkpoint)
+            return
+
+        started = time.time()
+        try:
+            results, failures = self.engine.analyze_issues(issues, profile_names)
+        except Exception as e:
+            self._send_json(500, {"error": str(e)})
+            return
+        if checkpoint and not failures:
+            self.store.set_checkpoint(*checkpoint)
+
+        self._send_json(500 if failures else 200, {
+            "issues": len(issues),
+            "elapsed_seconds": round(time.time() - started, 2),
+            "results": [{k: v for k, v in result.items() if k != "text"} for result in results],
+            "failures": failures,
+        })
+
+    def log_message(self, format, *args):
+        print(f"🌐 {self.address_string()} {format % args}")
+
+
+def main():
+    print("🔥 분석 엔진 준비 중 (클라이언트, 후보 목록, 캐시 로드)...")
+    AnalysisHandler.engine = RAGEngine(PROFILE_NAMES)
+    AnalysisHandler.store = SnapshotStore()
+
+    server = ThreadingHTTPServer((SERVICE_HOST, SERVICE_PORT), AnalysisHandler)
+    print(f"🚀 분석 서비스 시작: http://{SERVICE_HOST}:{SERVICE_PORT} (POST /analyze)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n👋 서비스 종료")
+    finally:
+        server.server_close()
+        AnalysisHandler.engine.print_stats()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,248 @@
+# bench/run_bench.py
+# 01/02/03-2/04 단계를 로컬 대역 서버(OpenAI / Pinecone)에 대해 실제 코드 그대로 실행하는 오프라인 벤치마크
+#
+# 실행 예:
+#   python bench/run_bench.py --scales 1,5 --embed-latency-ms 80 --chat-latency-ms 400
+#   python bench/run_bench.py --scales 1 --json bench/.work/base.json
+#   python bench/run_bench.py --scales 1 --compare bench/.work/base.json   (느려지면 종료 코드 1)
+#
+# - data/ CSV와 최신 data2/ 스냅샷을 scale배로 늘린 사본을 bench/.work/scale_N/ 에 만들고
+#   각 단계를 그 폴더에서 별도 프로세스로 실행한다 (저장소의 data2/, .cache/는 건드리지 않음)
+# - 단계별 벽시계 시간, 처리량(chunks/s, issues/s), 최대 메모리(RSS), 대역 서버 호출 수를 출력
+# - 환경 변수로 대역 서버를 가리키므로, .env에 OPENAI_BASE_URL / PINECONE_INDEX_HOST가 있으면 그 값이 우선한다
+
+import os
+import sys
+import json
+import glob
+import time
+import shutil
+import argparse
+import subprocess
+
+import pandas as pd
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, REPO_DIR)
+
+from ingest_utils import detect_encoding
+from stub_servers import StubConfig, OpenAIStubHandler, PineconeStubHandler, start_stub
+
+INDUSTRY_CSV = "산업DB.v.0.3.csv"
+PAST_ISSUE_CSV = "Past_news.csv"
+
+# (단계 이름, 실행할 스크립트)
+STAGES = {
+    "01": "01.pinecone_industry.py",
+    "02": "02.pinecone_past_issue.py",
+    "03-2": "03-2.crawling_vector.py",
+    "04": "rag_engine.py",
+}
+
+
+# ====== 데이터 준비 ======
+def scale_csv(src, dst, scale, name_column, id_column=None):
+    """CSV 행을 scale배로 복제 (복사본의 이름/ID에는 #k를 붙여 서로 다른 후보로 만듦)"""
+    encoding = detect_encoding(src)
+    df = pd.read_csv(src, encoding=encoding)
+    copies = []
+    for k in range(scale):
+        copy = df.copy()
+        if k:
+            copy[name_column] = copy[name_column].astype(str) + f" #{k}"
+            if id_column:
+                copy[id_column] = copy[id_column].astype(str) + f"_{k}"
+        copies.append(copy)
+    pd.concat(copies, ignore_index=True).to_csv(dst, index=False, encoding=encoding)
+    return len(df) * scale
+
+
+def scale_snapshot(src, dst, scale):
+    """최신 스냅샷의 이슈를 scale배로 복제 (제목에 (k)를 붙여 서로 다른 이슈로 만듦)"""
+    with open(src, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    issues = []
+    for k in range(scale):
+        for issue in data["issues"]:
+            title = issue["제목"] + (f" ({k})" if k else "")
+            issues.append({**issue, "이슈번호": len(issues) + 1, "제목": title})
+    data.update(issues=issues, total_issues=len(issues))
+    with open(dst, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+    return len(issues)
+
+
+def prepare_workdir(scale):
+    workdir = os.path.join(BENCH_DIR, ".work", f"scale_{scale}")
+    shutil.rmtree(workdir, ignore_errors=True)
+    os.makedirs(os.path.join(workdir, "data"))
+    os.makedirs(os.path.join(workdir, "data2"))
+
+    rows = scale_csv(os.path.join(REPO_DIR, "data", INDUSTRY_CSV), os.path.join(workdir, "data", INDUSTRY_CSV),
+                     scale, "KRX 업종명")
+    rows += scale_csv(os.path.join(REPO_DIR, "data", PAST_ISSUE_CSV), os.path.join(workdir, "data", PAST_ISSUE_CSV),
+                      scale, "Issue_name", "ID")
+    # 파일명이 크롤링 시각이므로 이름순 마지막이 최신
+    latest = sorted(glob.glob(os.path.join(REPO_DIR, "data2", "*_BigKinds_current_issues.json")))[-1]
+    issues = scale_snapshot(latest, os.path.join(workdir, "data2", os.path.basename(latest)), scale)
+    return workdir, rows, issues
+
+
+# ====== 단계 실행 ======
+def run_stage(script, workdir, env, log_path):
+    """단계를 별도 프로세스로 실행하고 (종료 코드, 벽시계 시간, 최대 RSS MB) 반환"""
+    started = time.perf_counter()
+    with open(log_path, "w", encoding="utf-8") as log:
+        proc = subprocess.Popen([sys.executable, os.path.join(REPO_DIR, script)],
+                                cwd=workdir, env=env, stdout=log, stderr=subprocess.STDOUT)
+        # wait4: 해당 자식 프로세스만의 자원 사용량 (ru_maxrss, Linux는 KB 단위)
+        _, status, rusage = os.wait4(proc.pid, 0)
+    proc.returncode = os.waitstatus_to_exitcode(status)
+    return proc.returncode, time.perf_counter() - started, rusage.ru_maxrss / 1024
+
+
+def stage_env(openai_url, pinecone_url, extra=None):
+    env = dict(os.environ)
+    env.update({
+        "OPENAI_BASE_URL": openai_url + "/v1",
+        "OPENAI_API_BASE": openai_url + "/v1",
+        "OPENAI_API_KEY": "bench",
+        "PINECONE_API_KEY": "bench",
+        "PINECONE_INDEX_HOST": pinecone_url,
+        "VECTOR_BACKEND": "pinecone",
+        "EMBEDDING_CACHE": "off",
+        "LLM_CACHE": "off",
+        "EMBEDDING_CTX_CHECK": "off",     # 오프라인에서는 tiktoken 인코딩을 내려받을 수 없음
+        "INGEST_SCOPE": "all",
+        "ANALYZE_SCOPE": "all",
+        "PYTHONPATH": REPO_DIR + os.pathsep + env.get("PYTHONPATH", ""),
+        "PYTHONUNBUFFERED": "1",
+    })
+    env.update(extra or {})
+    return env
+
+
+def diff_counts(before, after):
+    return {key: after.get(key, 0) - before.get(key, 0) for key in after}
+
+
+def run_scale(scale, args):
+    workdir, rows, issues = prepare_workdir(scale)
+    print(f"\n📦 scale x{scale}: CSV {rows}행, 이슈 {issues}개 ({workdir})")
+
+    embed_config = StubConfig(args.embed_latency_ms, args.jitter_ms, args.embed_rpm)
+    chat_config = StubConfig(args.chat_latency_ms, args.jitter_ms, args.chat_rpm, token_ms=args.chat_token_ms)
+    pinecone_config = StubConfig(args.pinecone_latency_ms, args.jitter_ms)
+
+    # embeddings / chat은 지연·한도를 따로 주입하기 위해 서버를 나눔 (통계는 공유)
+    openai_server, embed_url, openai_stats = start_stub(OpenAIStubHandler, embed_config)
+    chat_server, chat_url, _ = start_stub(OpenAIStubHandler, chat_config, openai_stats)
+    pinecone_server, pinecone_url, pinecone_stats = start_stub(PineconeStubHandler, pinecone_config)
+
+    results = []
+    try:
+        for stage in args.stages:
+            script = STAGES[stage]
+            # 04는 chat 서버, 나머지는 embeddings 서버 (04의 임베딩 호출도 chat 서버가 처리)
+            env = stage_env(chat_url if stage == "04" else embed_url, pinecone_url)
+            before = {**openai_stats.snapshot(), **pinecone_stats.snapshot()}
+            log_path = os.path.join(workdir, f"stage_{stage}.log")
+            code, wall, peak_mb = run_stage(script, workdir, env, log_path)
+            counts = diff_counts(before, {**openai_stats.snapshot(), **pinecone_stats.snapshot()})
+
+            result = {
+                "scale": scale,
+                "stage": stage,
+                "exit_code": code,
+                "wall_s": round(wall, 2),
+                "peak_rss_mb": round(peak_mb, 1),
+                "upserted": counts.get("upserted_vectors", 0),
+                "embedded": counts.get("embedding_inputs", 0),
+                "chat_calls": counts.get("chat_requests", 0),
+                "queries": counts.get("queries", 0),
+                "rate_limited": counts.get("rate_limited", 0),
+            }
+            if stage == "04":
+                result["issues_per_s"] = round(issues / wall, 2)
+            else:
+                result["chunks_per_s"] = round(result["upserted"] / wall, 1)
+            results.append(result)
+
+            status = "✅" if code == 0 else "❌"
+            print(f"{status} {stage:>4}  {wall:7.2f}s  {peak_mb:7.1f}MB  "
+                  + (f"{result['issues_per_s']} issues/s" if stage == "04" else f"{result['chunks_per_s']} chunks/s")
+                  + (f"  (429 {result['rate_limited']}회)" if result["rate_limited"] else ""))
+            if code != 0:
+                with open(log_path, "r", encoding="utf-8") as f:
+                    print("".join(f.readlines()[-15:]))
+    finally:
+        for server in (openai_server, chat_server, pinecone_server):
+            server.shutdown()
+    return results
+
+
+# ====== 결과 출력 / 비교 ======
+def print_table(results):
+    print(f"\n{'scale':>5} {'stage':>5} {'wall(s)':>8} {'peak(MB)':>9} {'chunks/s':>9} {'issues/s':>9} "
+          f"{'upserted':>9} {'embedded':>9} {'chat':>6} {'query':>6} {'429':>5}")
+    for r in results:
+        print(f"{r['scale']:>5} {r['stage']:>5} {r['wall_s']:>8} {r['peak_rss_mb']:>9} "
+              f"{r.get('chunks_per_s', '-'):>9} {r.get('issues_per_s', '-'):>9} {r['upserted']:>9} "
+              f"{r['embedded']:>9} {r['chat_calls']:>6} {r['queries']:>6} {r['rate_limited']:>5}")
+
+
+def compare(results, baseline_path, max_regression):
+    """기준 결과보다 max_regression 비율 이상 느려진 단계를 출력하고 개수 반환"""
+    with open(baseline_path, "r", encoding="utf-8") as f:
+        baseline = {(r["scale"], r["stage"]): r for r in json.load(f)}
+    regressions = 0
+    print(f"\n📏 기준 대비 ({baseline_path})")
+    for r in results:
+        base = baseline.get((r["scale"], r["stage"]))
+        if not base or not base["wall_s"]:
+            continue
+        ratio = r["wall_s"] / base["wall_s"]
+        flag = "⚠️" if ratio > 1 + max_regression else "  "
+        regressions += ratio > 1 + max_regression
+        print(f"{flag} x{r['scale']} {r['stage']:>4}: {base['wall_s']}s → {r['wall_s']}s ({ratio:.2f}배), "
+              f"메모리 {base['peak_rss_mb']} → {r['peak_rss_mb']}MB")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="오프라인 적재/분석 벤치마크")
+    parser.add_argument("--scales", default="1", help="CSV/스냅샷 배율 목록 (예: 1,5,10)")
+    parser.add_argument("--stages", default="01,02,03-2,04", help="실행할 단계 (01,02,03-2,04)")
+    parser.add_argument("--embed-latency-ms", type=float, default=50)
+    parser.add_argument("--chat-latency-ms", type=float, default=300)
+    parser.add_argument("--chat-token-ms", type=float, default=0, help="스트리밍 응답의 조각 간격 (ms)")
+    parser.add_argument("--pinecone-latency-ms", type=float, default=10)
+    parser.add_argument("--jitter-ms", type=float, default=0)
+    parser.add_argument("--embed-rpm", type=int, default=0, help="임베딩 분당 요청 한도 (초과 시 429)")
+    parser.add_argument("--chat-rpm", type=int, default=0, help="chat 분당 요청 한도 (초과 시 429)")
+    parser.add_argument("--json", help="결과를 저장할 JSON 경로")
+    parser.add_argument("--compare", help="비교할 기준 결과 JSON 경로")
+    parser.add_argument("--max-regression", type=float, default=0.2, help="허용하는 느려짐 비율")
+    args = parser.parse_args()
+    args.stages = [s.strip() for s in args.stages.split(",")]
+
+    results = []
+    for scale in [int(s) for s in args.scales.split(",")]:
+        results.extend(run_scale(scale, args))
+    print_table(results)
+
+    if args.json:
+        os.makedirs(os.path.dirname(os.path.abspath(args.json)), exist_ok=True)
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+        print(f"\n💾 결과 저장: {args.json}")
+
+    failed = any(r["exit_code"] != 0 for r in results)
+    if args.compare and compare(results, args.compare, args.max_regression):
+        failed = True
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
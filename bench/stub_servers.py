@@ -0,0 +1,319 @@
+# bench/stub_servers.py
+# 벤치마크용 로컬 대역 서버: OpenAI(embeddings / chat) + Pinecone 데이터 플레인
+# 지연 시간과 분당 요청 한도(초과 시 429)를 주입할 수 있다
+
+import re
+import json
+import time
+import base64
+import hashlib
+import threading
+from collections import defaultdict
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+import numpy as np
+
+
+class StubConfig:
+    """요청당 지연(ms)과 분당 요청 한도(0이면 제한 없음), 스트리밍 응답의 토큰 간격(ms)"""
+
+    def __init__(self, latency_ms=0.0, jitter_ms=0.0, requests_per_minute=0, token_ms=0.0):
+        self.latency_ms = latency_ms
+        self.token_ms = token_ms
+        self.jitter_ms = jitter_ms
+        self.requests_per_minute = requests_per_minute
+        self._window = []
+        self._lock = threading.Lock()
+        self._rng = np.random.default_rng(0)
+
+    def delay(self):
+        latency = self.latency_ms
+        if self.jitter_ms:
+            with self._lock:
+                latency += float(self._rng.uniform(0, self.jitter_ms))
+        if latency > 0:
+            time.sleep(latency / 1000)
+
+    def allow(self):
+        """최근 60초 요청 수가 한도 이내이면 True"""
+        if not self.requests_per_minute:
+            return True
+        now = time.monotonic()
+        with self._lock:
+            self._window = [t for t in self._window if now - t < 60]
+            if len(self._window) >= self.requests_per_minute:
+                return False
+            self._window.append(now)
+            return True
+
+
+class StubStats:
+    """대역 서버가 받은 요청 수/항목 수 (단계별 처리량 계산용)"""
+
+    def __init__(self):
+        self.counts = defaultdict(int)
+        self._lock = threading.Lock()
+
+    def add(self, key, value=1):
+        with self._lock:
+            self.counts[key] += value
+
+    def snapshot(self):
+        with self._lock:
+            return dict(self.counts)
+
+
+class _JsonHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    config = None
+    stats = None
+
+    def _read_json(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        return json.loads(self.rfile.read(length) or b"{}")
+
+    def _send_json(self, status, payload, headers=None):
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _throttle(self):
+        """지연 주입 후 한도 초과면 429 응답 (True 반환 시 처리 중단)"""
+        self.config.delay()
+        if self.config.allow():
+            return False
+        self.stats.add("rate_limited")
+        self._send_json(429, {"error": {"message": "Rate limit reached (stub)", "type": "requests",
+                                        "code": "rate_limit_exceeded"}}, {"retry-after": "1"})
+        return True
+
+    def log_message(self, format, *args):
+        pass
+
+
+# ====== OpenAI ======
+def fake_embedding(item, dimensions):
+    """입력(문자열 또는 토큰 ID 리스트)의 해시로 만든 결정적 단위 벡터"""
+    key = item if isinstance(item, str) else json.dumps(item)
+    seed = int.from_bytes(hashlib.sha1(key.encode("utf-8")).digest()[:8], "little")
+    vector = np.random.default_rng(seed).standard_normal(dimensions).astype(np.float32)
+    return vector / np.linalg.norm(vector)
+
+
+def fake_chat_reply(prompt):
+    """AI Agent 1 프롬프트면 후보 JSON, 그 외에는 분석 텍스트"""
+    if "출력 형식 (JSON)" in prompt:
+        key = '"industry"' if "KRX 업종 리스트" in prompt else '"issue"'
+        match = re.search(r"리스트\]\n(.*)\n", prompt)
+        names = match.group(1).split(", ")[:3] if match else []
+        return json.dumps({"candidates": [
+            {key.strip('"'): name, "score": 8 - i, "reason": "벤치마크 응답"} for i, name in enumerate(names)
+        ]}, ensure_ascii=False)
+    return "**이슈 요약**\n벤치마크 응답입니다.\n\n**분석 신뢰도**: 벤치마크"
+
+
+class OpenAIStubHandler(_JsonHandler):
+    def do_POST(self):
+        path = self.path.split("?")[0].rstrip("/")
+        body = self._read_json()
+        if self._throttle():
+            return
+        if path.endswith("/embeddings"):
+            self._embeddings(body)
+        elif path.endswith("/chat/completions"):
+            self._chat(body)
+        else:
+            self._send_json(404, {"error": {"message": f"unknown path {path}"}})
+
+    def _embeddings(self, body):
+        inputs = body["input"]
+        if isinstance(inputs, str) or (inputs and isinstance(inputs[0], int)):
+            inputs = [inputs]
+        dimensions = body.get("dimensions") or 1536
+        data = []
+        for i, item in enumerate(inputs):
+            vector = fake_embedding(item, dimensions)
+            if body.get("encoding_format") == "base64":
+                embedding = base64.b64encode(vector.astype("<f4").tobytes()).decode("ascii")
+            else:
+                embedding = vector.tolist()
+            data.append({"object": "embedding", "index": i, "embedding": embedding})
+        tokens = sum(len(item) if not isinstance(item, str) else len(item) // 2 for item in inputs)
+        self.stats.add("embedding_requests")
+        self.stats.add("embedding_inputs", len(inputs))
+        self._send_json(200, {"object": "list", "data": data, "model": body.get("model"),
+                              "usage": {"prompt_tokens": tokens, "total_tokens": tokens}})
+
+    def _chat(self, body):
+        prompt = "\n".join(str(m.get("content", "")) for m in body.get("messages", []))
+        content = fake_chat_reply(prompt)
+        prompt_tokens, completion_tokens = len(prompt) // 2, len(content) // 2
+        usage = {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens,
+                 "total_tokens": prompt_tokens + completion_tokens}
+        completion_id = f"chatcmpl-stub-{hashlib.sha1(prompt.encode('utf-8')).hexdigest()[:12]}"
+        self.stats.add("chat_requests")
+        if body.get("stream"):
+            self._chat_stream(body, completion_id, content, usage)
+            return
+        self._send_json(200, {
+            "id": completion_id,
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model"),
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": content},
+                         "finish_reason": "stop"}],
+            "usage": usage,
+        })
+
+    def _chat_stream(self, body, completion_id, content, usage):
+        """stream=true 요청: 응답을 몇 글자씩 나눈 SSE chunk로 전송 (token_ms 간격)"""
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        self.close_connection = True
+
+        def send(payload):
+            self.wfile.write(f"data: {json.dumps(payload, ensure_ascii=False)}\n\n".encode("utf-8"))
+            self.wfile.flush()
+
+        def chunk(choices, **extra):
+            send({"id": completion_id, "object": "chat.completion.chunk", "created": int(time.time()),
+                   "model": body.get("model"), "choices": choices, **extra})
+
+        chunk([{"index": 0, "delta": {"role": "assistant", "content": ""}, "finish_reason": None}])
+        for i in range(0, len(content), 4):
+            if self.config.token_ms:
+                time.sleep(self.config.token_ms / 1000)
+            chunk([{"index": 0, "delta": {"content": content[i:i+4]}, "finish_reason": None}])
+        chunk([{"index": 0, "delta": {}, "finish_reason": "stop"}])
+        if (body.get("stream_options") or {}).get("include_usage"):
+            chunk([], usage=usage)
+        self.wfile.write(b"data: [DONE]\n\n")
+        self.wfile.flush()
+
+
+# ====== Pinecone ======
+class PineconeStubHandler(_JsonHandler):
+    """Pinecone REST 데이터 플레인(upsert / query / list / delete / fetch / stats)의 메모리 구현"""
+
+    namespaces = None          # {namespace: {id: (vector, metadata)}}
+    lock = None
+
+    def do_GET(self):
+        path, _, query = self.path.partition("?")
+        params = dict(p.split("=", 1) for p in query.split("&") if "=" in p)
+        if self._throttle():
+            return
+        if path == "/vectors/list":
+            self._list(params)
+        elif path == "/vectors/fetch":
+            self._fetch(params, query)
+        else:
+            self._send_json(404, {"message": f"unknown path {path}"})
+
+    def do_POST(self):
+        path = self.path.split("?")[0].rstrip("/")
+        body = self._read_json()
+        if self._throttle():
+            return
+        handler = {
+            "/vectors/upsert": self._upsert,
+            "/query": self._query,
+            "/vectors/delete": self._delete,
+            "/describe_index_stats": self._stats,
+        }.get(path)
+        if handler is None:
+            self._send_json(404, {"message": f"unknown path {path}"})
+        else:
+            handler(body)
+
+    def _upsert(self, body):
+        namespace = body.get("namespace", "")
+        with self.lock:
+            store = self.namespaces.setdefault(namespace, {})
+            for record in body["vectors"]:
+                store[record["id"]] = (np.asarray(record["values"], dtype=np.float32), record.get("metadata") or {})
+        self.stats.add("upsert_requests")
+        self.stats.add("upserted_vectors", len(body["vectors"]))
+        self._send_json(200, {"upsertedCount": len(body["vectors"])})
+
+    def _query(self, body):
+        namespace = body.get("namespace", "")
+        top_k = body.get("topK", 10)
+        with self.lock:
+            items = list(self.namespaces.get(namespace, {}).items())
+        matches = []
+        if items:
+            matrix = np.stack([vector for _, (vector, _) in items])
+            query = np.asarray(body["vector"], dtype=np.float32)
+            scores = matrix @ query / (np.linalg.norm(matrix, axis=1) * np.linalg.norm(query) + 1e-12)
+            for i in np.argsort(-scores)[:top_k]:
+                vector_id, (vector, metadata) = items[i]
+                match = {"id": vector_id, "score": float(scores[i])}
+                if body.get("includeMetadata"):
+                    match["metadata"] = metadata
+                if body.get("includeValues"):
+                    match["values"] = vector.tolist()
+                matches.append(match)
+        self.stats.add("queries")
+        self._send_json(200, {"matches": matches, "namespace": namespace, "usage": {"readUnits": 1}})
+
+    def _list(self, params):
+        namespace = params.get("namespace", "")
+        limit = int(params.get("limit", 100))
+        start = int(params.get("paginationToken", 0) or 0)
+        with self.lock:
+            ids = sorted(self.namespaces.get(namespace, {}))
+        page = ids[start:start + limit]
+        payload = {"vectors": [{"id": vector_id} for vector_id in page], "namespace": namespace,
+                   "usage": {"readUnits": 1}}
+        if start + limit < len(ids):
+            payload["pagination"] = {"next": str(start + limit)}
+        self._send_json(200, payload)
+
+    def _fetch(self, params, query):
+        namespace = params.get("namespace", "")
+        ids = [p.split("=", 1)[1] for p in query.split("&") if p.startswith("ids=")]
+        with self.lock:
+            store = self.namespaces.get(namespace, {})
+            vectors = {
+                vector_id: {"id": vector_id, "values": store[vector_id][0].tolist(), "metadata": store[vector_id][1]}
+                for vector_id in ids if vector_id in store
+            }
+        self._send_json(200, {"vectors": vectors, "namespace": namespace, "usage": {"readUnits": 1}})
+
+    def _delete(self, body):
+        namespace = body.get("namespace", "")
+        with self.lock:
+            store = self.namespaces.get(namespace, {})
+            if body.get("deleteAll"):
+                store.clear()
+            for vector_id in body.get("ids") or []:
+                store.pop(vector_id, None)
+        self.stats.add("deleted_vectors", len(body.get("ids") or []))
+        self._send_json(200, {})
+
+    def _stats(self, body):
+        with self.lock:
+            namespaces = {name: {"vectorCount": len(store)} for name, store in self.namespaces.items()}
+            dimension = next((len(v) for store in self.namespaces.values() for v, _ in store.values()), 0)
+        self._send_json(200, {"namespaces": namespaces, "dimension": dimension, "indexFullness": 0.0,
+                              "totalVectorCount": sum(ns["vectorCount"] for ns in namespaces.values())})
+
+
+def start_stub(handler_base, config=None, stats=None, host="127.0.0.1", port=0):
+    """대역 서버를 백그라운드 스레드로 시작하고 (server, url, stats) 반환"""
+    attrs = {"config": config or StubConfig(), "stats": stats or StubStats()}
+    if handler_base is PineconeStubHandler:
+        attrs.update(namespaces={}, lock=threading.Lock())
+    handler = type(handler_base.__name__, (handler_base,), attrs)
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://{host}:{server.server_address[1]}", attrs["stats"]
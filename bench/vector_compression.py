@@ -0,0 +1,168 @@
+# bench/vector_compression.py
+# 축소 차원 임베딩 × 로컬 벡터 양자화(int8/float16) 조합의 메모리/지연시간/재현율 비교
+#
+# 실행 예:
+#   python bench/vector_compression.py                          (실제 OpenAI 임베딩, 임베딩 캐시 사용)
+#   python bench/vector_compression.py --dims 1536,512 --quantize none,int8 --rescore 0,4
+#   python bench/vector_compression.py --stub                   (오프라인 대역 서버: 실행 확인용, 재현율 수치는 의미 없음)
+#
+# - 산업DB / Past_news 청크와 최신 스냅샷 이슈(질의)를 전체 차원으로 한 번만 임베딩하고,
+#   축소 차원은 앞쪽 성분을 잘라 다시 정규화하여 만든다
+#   (text-embedding-3-* 의 dimensions 요청과 같은 결과이므로 차원별로 다시 임베딩하지 않음)
+# - 정답은 전체 차원 float32 brute-force 검색의 상위 k개, 재현율은 recall@k
+# - 메모리는 검색 시 메모리에 올라가는 행렬 크기 (LocalIndex.memory_usage: 양자화 시 검색용 행렬 + 행 배율,
+#   원래 정밀도 행렬은 디스크 memory-map에서 재채점 후보 행만 읽으므로 제외)
+
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import tempfile
+
+import numpy as np
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, REPO_DIR)
+
+from dotenv import load_dotenv
+
+from embedding_cache import get_embeddings
+from ingest_sources import SOURCES, iter_source_chunks
+from local_vector_store import LocalIndex
+from snapshot_store import SnapshotStore
+from stub_servers import OpenAIStubHandler, start_stub
+
+
+# ====== 데이터 준비 ======
+def load_corpus(source_names):
+    """namespace별 청크 텍스트 (01/02 적재와 같은 분할 설정)"""
+    os.chdir(REPO_DIR)
+    return {name: [chunk.page_content for chunk in iter_source_chunks(SOURCES[name])] for name in source_names}
+
+
+def load_queries(limit):
+    """최신 스냅샷의 이슈 제목+내용 (04 분석의 검색 질의와 같은 형태)"""
+    store = SnapshotStore(os.path.join(REPO_DIR, "data2"))
+    issues = store.load(store.latest())[:limit]
+    return [f"{issue.get('제목', '')}\n{issue.get('내용', '')}" for issue in issues]
+
+
+def truncate(matrix, dims):
+    """앞쪽 dims개 성분만 남기고 다시 정규화 (축소 차원 임베딩과 동일)"""
+    matrix = np.asarray(matrix, dtype=np.float32)[:, :dims]
+    return matrix / np.maximum(np.linalg.norm(matrix, axis=1, keepdims=True), 1e-12)
+
+
+def exact_top_k(doc_matrix, query_matrix, k):
+    scores = query_matrix @ doc_matrix.T
+    return [set(np.argsort(-row)[:k].tolist()) for row in scores]
+
+
+# ====== 측정 ======
+def measure(doc_matrix, query_matrix, truth, k, quantize, rescore, repeat):
+    workdir = tempfile.mkdtemp(prefix="vector_compression_")
+    try:
+        # 적재 후 디스크에서 다시 열어 실제 검색 프로세스와 같은 상태(memory-map)로 측정
+        writer = LocalIndex(workdir)
+        for start in range(0, len(doc_matrix), 1000):
+            block = doc_matrix[start:start+1000]
+            writer.upsert([(str(start + i), row.tolist(), {}) for i, row in enumerate(block)], namespace="bench")
+        writer.flush()
+
+        index = LocalIndex(workdir, quantize=quantize, rescore_factor=rescore)
+        started = time.perf_counter()
+        index.query_many(query_matrix[:1], top_k=k, namespace="bench")   # 양자화 행렬 생성 포함
+        build_ms = (time.perf_counter() - started) * 1000
+
+        latencies = []
+        for _ in range(repeat):
+            for vector in query_matrix:
+                started = time.perf_counter()
+                result = index.query(vector.tolist(), top_k=k, namespace="bench", include_metadata=False)
+                latencies.append((time.perf_counter() - started) * 1000)
+
+        results = index.query_many(query_matrix, top_k=k, namespace="bench", include_metadata=False)
+        recall = np.mean([
+            len({int(match["id"]) for match in result["matches"]} & expected) / k
+            for result, expected in zip(results, truth)
+        ])
+
+        # 양자화 행렬 + (memory-map이 아니면) 메모리에 남은 원래 정밀도 행렬까지 포함한 실제 크기
+        resident = index.memory_usage("bench")["total"]
+        return {
+            "recall": round(float(recall), 4),
+            "resident_mb": round(resident / 1024 / 1024, 2),
+            "p50_ms": round(float(np.percentile(latencies, 50)), 3),
+            "p95_ms": round(float(np.percentile(latencies, 95)), 3),
+            "build_ms": round(build_ms, 1),
+        }
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+def print_table(results):
+    print(f"\n{'namespace':>10} {'dims':>5} {'quant':>7} {'rescore':>7} {'recall':>7} {'mem(MB)':>8} "
+          f"{'p50(ms)':>8} {'p95(ms)':>8} {'build(ms)':>9}")
+    for r in results:
+        print(f"{r['namespace']:>10} {r['dims']:>5} {r['quantize']:>7} {r['rescore']:>7} {r['recall']:>7} "
+              f"{r['resident_mb']:>8} {r['p50_ms']:>8} {r['p95_ms']:>8} {r['build_ms']:>9}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="임베딩 차원 축소/벡터 양자화 재현율·메모리·지연시간 비교")
+    parser.add_argument("--sources", default="industry,past_issue", help="비교할 적재 설정 (ingest_sources.py)")
+    parser.add_argument("--dims", default="1536,1024,512,256", help="비교할 임베딩 차원 목록")
+    parser.add_argument("--quantize", default="none,float16,int8", help="검색 행렬 형식 목록")
+    parser.add_argument("--rescore", default="0,4", help="재채점 후보 배율 목록 (0이면 재채점 없음)")
+    parser.add_argument("--k", type=int, default=10, help="recall@k의 k")
+    parser.add_argument("--queries", type=int, default=50, help="사용할 최대 질의(이슈) 수")
+    parser.add_argument("--repeat", type=int, default=5, help="지연시간 측정 반복 횟수")
+    parser.add_argument("--stub", action="store_true", help="OpenAI 대신 로컬 대역 서버로 임베딩 (오프라인 실행 확인용)")
+    parser.add_argument("--json", help="결과를 저장할 JSON 경로")
+    args = parser.parse_args()
+
+    load_dotenv(os.path.join(REPO_DIR, ".env"), override=True)
+    if args.stub:
+        _, url, _ = start_stub(OpenAIStubHandler)
+        os.environ.update(OPENAI_BASE_URL=url + "/v1", OPENAI_API_KEY="bench", EMBEDDING_CACHE="off",
+                          EMBEDDING_CTX_CHECK="off")
+        print("⚠️ 대역 서버 임베딩은 무작위 벡터이므로 재현율은 실행 확인용입니다")
+    # 전체 차원으로 한 번만 임베딩 (EMBEDDING_DIMENSIONS 설정과 무관하게)
+    os.environ.pop("EMBEDDING_DIMENSIONS", None)
+    embeddings = get_embeddings(model="text-embedding-3-small")
+
+    corpus = load_corpus(args.sources.split(","))
+    queries = load_queries(args.queries)
+    print(f"🔎 질의 {len(queries)}개, 청크 " + ", ".join(f"{name} {len(texts)}개" for name, texts in corpus.items()))
+    query_full = np.asarray(embeddings.embed_documents(queries), dtype=np.float32)
+
+    results = []
+    for name, texts in corpus.items():
+        doc_full = np.asarray(embeddings.embed_documents(texts), dtype=np.float32)
+        k = min(args.k, len(texts))
+        truth = exact_top_k(truncate(doc_full, doc_full.shape[1]), truncate(query_full, query_full.shape[1]), k)
+        for dims in [int(d) for d in args.dims.split(",") if int(d) <= doc_full.shape[1]]:
+            doc_matrix, query_matrix = truncate(doc_full, dims), truncate(query_full, dims)
+            for quantize in args.quantize.split(","):
+                # 양자화하지 않으면 재채점할 것이 없으므로 한 번만 측정
+                for rescore in ([0] if quantize == "none" else [int(r) for r in args.rescore.split(",")]):
+                    row = {"namespace": name, "dims": dims, "quantize": quantize, "rescore": rescore}
+                    row.update(measure(doc_matrix, query_matrix, truth, k, quantize, rescore, args.repeat))
+                    results.append(row)
+                    print(f"✅ {name} {dims}d {quantize} rescore={rescore}: recall@{k} {row['recall']}, "
+                          f"{row['resident_mb']}MB, p50 {row['p50_ms']}ms")
+
+    print_table(results)
+
+    if args.json:
+        os.makedirs(os.path.dirname(os.path.abspath(args.json)), exist_ok=True)
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+        print(f"\n💾 결과 저장: {args.json}")
+
+
+if __name__ == "__main__":
+    main()
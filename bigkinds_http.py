@@ -0,0 +1,164 @@
+# bigkinds_http.py
+# Selenium 없이 HTTP로 BigKinds 오늘의 이슈 목록/상세를 가져오는 크롤러 백엔드 (실험적)
+# 결과는 03-1.crawling.py의 save_to_json과 같은 형식({"이슈번호", "제목", "내용"})으로 반환
+#
+# ⚠️ 아직 실제 BigKinds 엔드포인트에 연결하지 않았다. 목록/상세 URL과 아래 키 이름은 추정값이고,
+#    fixtures/bigkinds_responses/는 이 파서 형식에 맞춰 손으로 만든 응답이라
+#    스텁 서버 테스트는 파서가 자기 형식을 읽는지만 확인한다.
+#    실제 엔드포인트와 녹화한 응답으로 검증하기 전까지 기본 크롤러는 Selenium(CRAWL_BACKEND=selenium)이다.
+
+import os
+import json
+from html.parser import HTMLParser
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# 응답 형식이 다른 경우를 위해 여러 키 이름을 순서대로 시도 (실제 응답으로 확인하지 않은 추정값)
+LIST_KEYS = ("issues", "list", "data", "resultList", "result")
+ID_KEYS = ("id", "issue_id", "issueId", "topic_sn", "이슈번호")
+TITLE_KEYS = ("title", "topic", "issue_title", "제목")
+CONTENT_KEYS = ("content", "contents", "summary", "topic_content", "내용")
+
+
+def create_session(pool_size=10, max_retries=3):
+    """연결을 재사용하는 세션 (동시 상세 요청 수만큼 커넥션 풀 확보, 5xx/429는 재시도)"""
+    session = requests.Session()
+    retry = Retry(total=max_retries, backoff_factor=0.5, status_forcelist=(429, 500, 502, 503, 504))
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    session.headers.update({
+        "User-Agent": "Mozilla/5.0 (compatible; 3pj-crawler)",
+        "X-Requested-With": "XMLHttpRequest",
+    })
+    return session
+
+
+def _first(item, keys):
+    for key in keys:
+        if isinstance(item, dict) and item.get(key) not in (None, ""):
+            return item[key]
+    return None
+
+
+class _PopupParser(HTMLParser):
+    """상세 HTML에서 p.issuPopTitle / p.pT20.issuPopContent 텍스트 추출"""
+
+    TARGETS = {"title": {"issuPopTitle"}, "content": {"pT20", "issuPopContent"}}
+
+    def __init__(self):
+        super().__init__()
+        self.fields = {"title": [], "content": []}
+        self._current = None
+
+    def handle_starttag(self, tag, attrs):
+        if tag != "p":
+            return
+        classes = set((dict(attrs).get("class") or "").split())
+        for field, required in self.TARGETS.items():
+            if required <= classes:
+                self._current = field
+
+    def handle_endtag(self, tag):
+        if tag == "p":
+            self._current = None
+
+    def handle_data(self, data):
+        if self._current:
+            self.fields[self._current].append(data)
+
+    def result(self):
+        return {field: "".join(parts).strip() for field, parts in self.fields.items()}
+
+
+def parse_issue_list(payload):
+    """목록 응답(JSON)에서 [{"id", "title"}] 추출"""
+    items = payload
+    if isinstance(payload, dict):
+        items = _first(payload, LIST_KEYS) or []
+    issues = []
+    for item in items:
+        issue_id = _first(item, ID_KEYS)
+        if issue_id is None:
+            continue
+        issues.append({"id": issue_id, "title": _first(item, TITLE_KEYS), "content": _first(item, CONTENT_KEYS)})
+    return issues
+
+
+def parse_issue_detail(response):
+    """상세 응답(JSON 또는 팝업 HTML)에서 (제목, 내용) 추출"""
+    content_type = response.headers.get("Content-Type", "")
+    text = response.text
+    if "json" in content_type or text.lstrip().startswith(("{", "[")):
+        payload = json.loads(text)
+        if isinstance(payload, dict) and not _first(payload, TITLE_KEYS):
+            payload = _first(payload, ("data", "result", "detail")) or payload
+        return (_first(payload, TITLE_KEYS) or "").strip(), (_first(payload, CONTENT_KEYS) or "").strip()
+
+    parser = _PopupParser()
+    parser.feed(text)
+    fields = parser.result()
+    return fields["title"], fields["content"]
+
+
+class BigKindsHttpCrawler:
+    """이슈 목록 1회 + 상세 N회를 풀링된 세션으로 동시에 요청
+
+    - list_url: 오늘의 이슈 목록 (JSON)
+    - detail_url: 이슈 상세 (JSON 또는 팝업 HTML), "{id}" 자리에 이슈 ID가 들어감
+    목록 응답에 본문이 이미 있으면 상세 요청을 생략한다.
+    """
+
+    def __init__(self, list_url=None, detail_url=None, max_workers=None, timeout=10, session=None):
+        self.list_url = list_url or os.getenv("BIGKINDS_ISSUE_LIST_URL", "")
+        self.detail_url = detail_url or os.getenv("BIGKINDS_ISSUE_DETAIL_URL", "")
+        self.max_workers = max_workers or int(os.getenv("CRAWL_HTTP_CONCURRENCY", "5"))
+        self.timeout = timeout
+        self.session = session or create_session(pool_size=self.max_workers)
+
+    @property
+    def configured(self):
+        return bool(self.list_url)
+
+    def fetch_issue_list(self, category="전체"):
+        response = self.session.get(self.list_url, params={"category": category}, timeout=self.timeout)
+        response.raise_for_status()
+        return parse_issue_list(response.json())
+
+    def fetch_issue_detail(self, issue):
+        if issue.get("content") or not self.detail_url:
+            return (issue.get("title") or "").strip(), (issue.get("content") or "").strip()
+        response = self.session.get(self.detail_url.format(id=issue["id"]), timeout=self.timeout)
+        response.raise_for_status()
+        title, content = parse_issue_detail(response)
+        return title or (issue.get("title") or "").strip(), content
+
+    def crawl(self, max_issues=10, category="전체"):
+        """save_to_json과 같은 형식의 이슈 리스트 반환 (목록 순서 유지)
+
+        상세 요청이 실패한 이슈는 건너뛰고 성공한 이슈만 반환한다.
+        """
+        issues = self.fetch_issue_list(category)[:max_issues]
+        details = [None] * len(issues)
+        with ThreadPoolExecutor(max_workers=max(1, min(self.max_workers, len(issues) or 1))) as executor:
+            futures = {executor.submit(self.fetch_issue_detail, issue): i for i, issue in enumerate(issues)}
+            for future in as_completed(futures):
+                i = futures[future]
+                try:
+                    details[i] = future.result()
+                except Exception as e:
+                    print(f"⚠️ {i + 1}번 이슈 상세 요청 실패로 건너뜁니다: {e}")
+
+        results = []
+        for i, detail in enumerate(details, 1):
+            if detail is None:
+                continue
+            title, content = detail
+            if not title or not content:
+                print(f"⚠️ {i}번 이슈의 제목/내용이 비어 있어 건너뜁니다.")
+                continue
+            results.append({"이슈번호": i, "제목": title, "내용": content})
+        return results
@@ -0,0 +1,82 @@
+# candidate_prefilter.py
+# AI Agent 1 프롬프트에 넣을 후보 이름을 로컬에서 미리 추려내는 사전 필터
+
+import threading
+
+import numpy as np
+
+
+def char_ngrams(text, n=2):
+    """공백을 제거한 문자 n-gram 집합 (형태소 분석 없이 한국어에 적용 가능)"""
+    text = "".join(str(text).lower().split())
+    if len(text) < n:
+        return {text} if text else set()
+    return {text[i:i+n] for i in range(len(text) - n + 1)}
+
+
+class CandidateShortlist:
+    """벡터 유사도 + 문자 n-gram 겹침으로 상위 N개 후보 이름을 선별
+
+    이름+설명 임베딩은 처음 사용할 때 한 번만 계산한다
+    (임베딩 캐시를 쓰면 이후 실행에서는 API 호출이 없다).
+    """
+
+    def __init__(self, names, descriptions, embedding, desc_chars=300, vector_weight=0.7):
+        self.names = list(names)
+        self.texts = [f"{name}\n{str(desc)[:desc_chars]}" for name, desc in zip(self.names, descriptions)]
+        self.embedding = embedding
+        self.vector_weight = vector_weight
+        self.name_grams = [char_ngrams(name) for name in self.names]
+        self._name_set = set(self.names)
+        self._matrix = None
+        self._lock = threading.Lock()
+
+    def _ensure_built(self):
+        with self._lock:
+            if self._matrix is None:
+                matrix = np.asarray(self.embedding.embed_documents(self.texts), dtype=np.float32)
+                norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+                self._matrix = matrix / np.maximum(norms, 1e-12)
+        return self._matrix
+
+    def _lexical_scores(self, query):
+        """이름의 n-gram 중 뉴스에 등장하는 비율 (이름이 그대로 등장하면 1.0)"""
+        compact_query = "".join(query.lower().split())
+        query_grams = char_ngrams(query)
+        scores = np.zeros(len(self.names), dtype=np.float32)
+        for i, (name, grams) in enumerate(zip(self.names, self.name_grams)):
+            if "".join(name.lower().split()) in compact_query:
+                scores[i] = 1.0
+            elif grams:
+                scores[i] = len(grams & query_grams) / len(grams)
+        return scores
+
+    def shortlist(self, query, top_n, query_vector=None, always_include=()):
+        """query와 관련 가능성이 높은 이름 top_n개를 점수 순으로 반환
+
+        Args:
+            query: 뉴스 내용
+            top_n: 반환할 이름 수 (0 이하이면 전체 반환)
+            query_vector: 이미 계산된 질의 임베딩 (없으면 새로 계산)
+            always_include: 점수와 관계없이 포함할 이름 (예: 벡터 검색 후보)
+        """
+        if top_n <= 0 or top_n >= len(self.names):
+            return list(self.names)
+
+        matrix = self._ensure_built()
+        if query_vector is None:
+            query_vector = self.embedding.embed_query(query)
+        query_vector = np.asarray(query_vector, dtype=np.float32)
+        query_vector = query_vector / max(np.linalg.norm(query_vector), 1e-12)
+
+        scores = (self.vector_weight * (matrix @ query_vector)
+                  + (1 - self.vector_weight) * self._lexical_scores(query))
+        ranked = [self.names[i] for i in np.argsort(-scores)]
+
+        selected = [name for name in always_include if name in self._name_set]
+        for name in ranked:
+            if len(selected) >= top_n:
+                break
+            if name not in selected:
+                selected.append(name)
+        return selected
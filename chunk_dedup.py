@@ -0,0 +1,128 @@
+# chunk_dedup.py
+# 임베딩 전에 거의 같은 청크를 찾아 하나로 묶는 MinHash 근사 중복 제거 (CHUNK_DEDUP=on일 때만)
+#
+# 청크 전체(머리말 줄 제외)의 문자 5-gram Jaccard 유사도로 판정하므로, 서로 다른 청크 안에 섞인
+# 반복 블록은 없애지 못하고 행 전체가 거의 같은 경우만 묶는다.
+# 동봉 CSV에서 측정한 결과 (문자 수 분할, 묶여서 줄어든 청크 수):
+#   threshold   industry(1205)   past_issue(28)
+#     0.9 / 0.8       0                0
+#     0.7             2                0
+#     0.6             6                0
+#     0.5            12                0
+# 산업DB 본문 중 여러 행에 반복되는 줄은 약 1%(문자 기준)뿐이라 블록 단위 중복 제거도 얻을 것이 적다.
+# 기본 threshold 0.9는 같은 내용의 행이 중복 등록된 CSV를 위한 값이다.
+
+import zlib
+
+import numpy as np
+
+_MERSENNE_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+
+
+def shingles(text, k=5):
+    """공백을 정규화한 문자 k-gram의 32비트 해시 집합 (프로세스가 달라도 같은 값)"""
+    text = " ".join(str(text).split())
+    if len(text) <= k:
+        return {zlib.crc32(text.encode("utf-8"))}
+    return {zlib.crc32(text[i:i+k].encode("utf-8")) for i in range(len(text) - k + 1)}
+
+
+class MinHasher:
+    """고정 시드의 (a*x + b) mod p 순열로 MinHash 서명을 계산"""
+
+    def __init__(self, num_perm=64, seed=1):
+        rng = np.random.default_rng(seed)
+        self.num_perm = num_perm
+        self.a = rng.integers(1, _MERSENNE_PRIME, size=num_perm, dtype=np.uint64)
+        self.b = rng.integers(0, _MERSENNE_PRIME, size=num_perm, dtype=np.uint64)
+
+    def signature(self, shingle_set):
+        values = np.fromiter(shingle_set, dtype=np.uint64, count=len(shingle_set))
+        # 32비트 해시 × 32비트로 줄인 계수는 2^64 미만이고, 덧셈 전에 p(2^61-1)로 줄이므로
+        # (곱 mod p) + b < 2^62 — uint64에서 넘치지 않는다
+        hashed = ((values[:, None] * (self.a[None, :] & _MAX_HASH)) % _MERSENNE_PRIME
+                  + self.b[None, :]) % _MERSENNE_PRIME
+        return (hashed & _MAX_HASH).min(axis=0)
+
+
+def body_text(text, ignore_prefixes=()):
+    """행마다 다른 머리말 줄(예: "KRX 업종명: ...")을 뺀 본문 (본문이 없으면 원래 텍스트)"""
+    if not ignore_prefixes:
+        return text
+    lines = [line for line in str(text).replace('\ufeff', '').split("\n")
+             if not line.strip().startswith(tuple(ignore_prefixes))]
+    body = "\n".join(lines).strip()
+    return body or text
+
+
+def group_near_duplicates(texts, threshold=0.9, num_perm=64, bands=16, k=5):
+    """추정 Jaccard 유사도가 threshold 이상인 텍스트끼리 묶기
+
+    LSH(bands × rows)로 후보 쌍만 비교하므로 전체 쌍을 비교하지 않는다.
+
+    Returns:
+        인덱스 그룹 리스트 (그룹 안은 오름차순, 그룹은 첫 인덱스 순)
+    """
+    hasher = MinHasher(num_perm)
+    signatures = [hasher.signature(shingles(text, k)) for text in texts]
+    rows = num_perm // bands
+
+    parent = list(range(len(texts)))
+
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    for band in range(bands):
+        buckets = {}
+        for i, signature in enumerate(signatures):
+            buckets.setdefault(signature[band*rows:(band+1)*rows].tobytes(), []).append(i)
+        for members in buckets.values():
+            first = members[0]
+            for other in members[1:]:
+                root_a, root_b = find(first), find(other)
+                if root_a == root_b:
+                    continue
+                if np.mean(signatures[first] == signatures[other]) >= threshold:
+                    parent[max(root_a, root_b)] = min(root_a, root_b)
+
+    groups = {}
+    for i in range(len(texts)):
+        groups.setdefault(find(i), []).append(i)
+    return sorted(groups.values(), key=lambda group: group[0])
+
+
+def dedup_chunks(chunks, row_key_field="row", threshold=0.9, ignore_prefixes=()):
+    """근사 중복 청크 그룹마다 첫 청크만 남기고, 소유 행/엔티티를 metadata로 연결
+
+    - owners: 같은 내용을 가진 모든 행 키 (문자열)
+    - entities: 해당 행들의 엔티티(업종명/이슈명) 목록
+    중복 판정은 ignore_prefixes로 시작하는 머리말 줄을 뺀 본문으로 한다
+    (행마다 다른 머리말이 섞이면 같은 본문도 유사도가 threshold에 못 미침).
+    중복이 없는 청크는 metadata를 바꾸지 않으므로 벡터 ID도 그대로다.
+
+    Returns:
+        (대표 청크 리스트, 원래 청크 수)
+    """
+    chunks = list(chunks)
+    groups = group_near_duplicates([body_text(chunk.page_content, ignore_prefixes) for chunk in chunks], threshold)
+
+    representatives = []
+    for group in groups:
+        representative = chunks[group[0]]
+        if len(group) > 1:
+            owners, entities = [], []
+            for i in group:
+                metadata = chunks[i].metadata
+                owner = str(metadata.get(row_key_field, metadata.get("row")))
+                if owner not in owners:
+                    owners.append(owner)
+                entity = metadata.get("entity")
+                if entity and entity not in entities:
+                    entities.append(entity)
+            representative.metadata = {**representative.metadata, "owners": owners, "entities": entities}
+        representatives.append(representative)
+    return representatives, len(chunks)
@@ -0,0 +1,187 @@
+# embedding_cache.py
+# 01/02/03-2/04 스크립트가 함께 쓰는 로컬 임베딩 캐시 (SQLite)
+
+import os
+import hashlib
+import sqlite3
+import threading
+import time
+from array import array
+
+from langchain_core.embeddings import Embeddings
+from langchain_openai import OpenAIEmbeddings
+
+from tracing import TracedEmbeddings, get_tracer
+
+DEFAULT_CACHE_PATH = ".cache/embeddings.sqlite"
+DEFAULT_CACHE_MAX_MB = 512
+# 비어 있는 페이지가 한도의 이 비율을 넘을 때만 VACUUM으로 파일을 줄임
+# (삭제로 생긴 빈 페이지는 이후 저장에 재사용되므로 평소에는 VACUUM하지 않음)
+VACUUM_FREE_RATIO = 0.5
+
+
+def _text_hash(text):
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class CachedEmbeddings(Embeddings):
+    """OpenAIEmbeddings 앞단에 SQLite 캐시를 두는 임베딩 래퍼
+
+    캐시 키는 (모델명, 차원 수, 텍스트 해시)이며,
+    사용 중인 페이지 크기가 max_bytes를 넘으면 가장 오래 사용되지 않은 항목부터 지운다.
+    """
+
+    def __init__(self, underlying, model, dimensions=None, path=None, max_bytes=None):
+        # 환경변수는 load_dotenv 이후에 읽도록 생성 시점에 조회
+        path = path or os.getenv("EMBEDDING_CACHE_PATH", DEFAULT_CACHE_PATH)
+        if max_bytes is None:
+            max_bytes = int(float(os.getenv("EMBEDDING_CACHE_MAX_MB", DEFAULT_CACHE_MAX_MB)) * 1024 * 1024)
+
+        self.underlying = underlying
+        self.model = model
+        self.dimensions = dimensions or 0
+        self.path = path
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS embeddings (
+                model TEXT NOT NULL,
+                dimensions INTEGER NOT NULL,
+                text_hash TEXT NOT NULL,
+                vector BLOB NOT NULL,
+                last_used REAL NOT NULL,
+                PRIMARY KEY (model, dimensions, text_hash)
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_last_used ON embeddings(last_used)")
+        self._conn.commit()
+
+    # ---- 캐시 조회/저장 ----
+    def _lookup(self, hashes):
+        found = {}
+        with self._lock:
+            for i in range(0, len(hashes), 500):
+                part = hashes[i:i+500]
+                placeholders = ",".join("?" * len(part))
+                rows = self._conn.execute(
+                    f"SELECT text_hash, vector FROM embeddings "
+                    f"WHERE model=? AND dimensions=? AND text_hash IN ({placeholders})",
+                    [self.model, self.dimensions, *part]
+                ).fetchall()
+                for text_hash, blob in rows:
+                    vector = array("f")
+                    vector.frombytes(blob)
+                    found[text_hash] = vector.tolist()
+            if found:
+                now = time.time()
+                self._conn.executemany(
+                    "UPDATE embeddings SET last_used=? WHERE model=? AND dimensions=? AND text_hash=?",
+                    [(now, self.model, self.dimensions, h) for h in found]
+                )
+                self._conn.commit()
+        return found
+
+    def _store(self, items):
+        now = time.time()
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO embeddings VALUES (?, ?, ?, ?, ?)",
+                [(self.model, self.dimensions, h, array("f", vec).tobytes(), now) for h, vec in items]
+            )
+            self._conn.commit()
+            needs_vacuum = self._evict()
+        if needs_vacuum:
+            self._vacuum()
+
+    def _evict(self):
+        """캐시 크기가 한도를 넘으면 오래된 항목부터 삭제 (호출 측에서 lock 보유)
+
+        크기는 빈 페이지(freelist)를 뺀 사용 중인 페이지로 잰다.
+        VACUUM이 필요할 만큼 빈 페이지가 쌓였으면 True 반환.
+        """
+        page_count = self._conn.execute("PRAGMA page_count").fetchone()[0]
+        page_size = self._conn.execute("PRAGMA page_size").fetchone()[0]
+        free_count = self._conn.execute("PRAGMA freelist_count").fetchone()[0]
+        size = (page_count - free_count) * page_size
+        if size <= self.max_bytes:
+            return free_count * page_size > self.max_bytes * VACUUM_FREE_RATIO
+
+        total = self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+        # 한도의 80% 수준까지 줄이도록 비율만큼 오래된 항목 삭제
+        remove = max(1, int(total * (1 - 0.8 * self.max_bytes / size)))
+        self._conn.execute(
+            "DELETE FROM embeddings WHERE rowid IN "
+            "(SELECT rowid FROM embeddings ORDER BY last_used LIMIT ?)",
+            (remove,)
+        )
+        self._conn.commit()
+        free_count = self._conn.execute("PRAGMA freelist_count").fetchone()[0]
+        return free_count * page_size > self.max_bytes * VACUUM_FREE_RATIO
+
+    def _vacuum(self):
+        """빈 페이지를 정리해 파일 크기를 줄임 (lock 밖에서 별도 연결로 실행, 다른 쓰기와 겹치면 다음 기회로 미룸)"""
+        try:
+            conn = sqlite3.connect(self.path, timeout=0.1)
+            try:
+                conn.execute("VACUUM")
+                # WAL 모드에서는 체크포인트가 끝나야 본 파일이 실제로 줄어듦
+                conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+            finally:
+                conn.close()
+        except sqlite3.OperationalError as e:
+            print(f"⚠️ 임베딩 캐시 VACUUM을 건너뜁니다: {e}")
+
+    # ---- Embeddings 인터페이스 ----
+    def embed_documents(self, texts):
+        with get_tracer().span("embedding.cache", batch_size=len(texts)) as span:
+            hashes = [_text_hash(t) for t in texts]
+            found = self._lookup(list(set(hashes)))
+
+            missing = {}
+            for h, text in zip(hashes, texts):
+                if h not in found and h not in missing:
+                    missing[h] = text
+            self.hits += len(texts) - len(missing)
+            self.misses += len(missing)
+            span["cache_hits"] = len(texts) - len(missing)
+            span["cache_misses"] = len(missing)
+
+            if missing:
+                new_vectors = self.underlying.embed_documents(list(missing.values()))
+                new_items = list(zip(missing.keys(), new_vectors))
+                self._store(new_items)
+                found.update(new_items)
+
+            return [found[h] for h in hashes]
+
+    def embed_query(self, text):
+        return self.embed_documents([text])[0]
+
+
+def get_embeddings(model=None, dimensions=None):
+    """캐시가 적용된 임베딩 객체 생성 (EMBEDDING_CACHE=off 이면 캐시 없이 반환)
+
+    EMBEDDING_DIMENSIONS를 지정하면 text-embedding-3-* 의 축소 차원 임베딩을 요청한다.
+    적재(01/02/03-2)와 검색(04)이 같은 값을 써야 하며, 바꾸면 namespace를 새 버전으로 재구축해야 한다
+    (Pinecone은 인덱스 차원이 고정이므로 해당 차원으로 만든 인덱스를 PINECONE_INDEX_NAME으로 지정).
+    """
+    model = model or os.getenv("OPENAI_EMBEDDING_MODEL") or "text-embedding-3-small"
+    if dimensions is None and os.getenv("EMBEDDING_DIMENSIONS"):
+        dimensions = int(os.getenv("EMBEDDING_DIMENSIONS"))
+    # EMBEDDING_CTX_CHECK=off: 청크가 토큰 한도보다 충분히 짧을 때 클라이언트 쪽 토큰화(tiktoken)를 생략
+    underlying = OpenAIEmbeddings(
+        model=model, dimensions=dimensions,
+        check_embedding_ctx_length=os.getenv("EMBEDDING_CTX_CHECK", "on") != "off"
+    )
+    if get_tracer().enabled:
+        underlying = TracedEmbeddings(underlying)
+    if os.getenv("EMBEDDING_CACHE", "on") == "off":
+        return underlying
+    return CachedEmbeddings(underlying, model=model, dimensions=dimensions)
@@ -0,0 +1,48 @@
+# bigkinds_stub_server.py
+# fixtures/bigkinds_responses/의 응답을 그대로 돌려주는 로컬 스텁 서버
+# (실제 BigKinds에서 녹화한 응답이 아니라 bigkinds_http.py의 파서 형식에 맞춰 만든 응답이므로
+#  HTTP 백엔드의 동시 요청/파싱 흐름만 확인할 수 있고, 실제 사이트와의 호환성은 보장하지 않음)
+#
+# 실행: python fixtures/bigkinds_stub_server.py  (기본 포트 8765)
+#       BIGKINDS_ISSUE_LIST_URL=http://localhost:8765/issues \
+#       BIGKINDS_ISSUE_DETAIL_URL=http://localhost:8765/issues/{id} CRAWL_BACKEND=http python 03-1.crawling.py
+
+import os
+import sys
+from urllib.parse import urlparse
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+RESPONSE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "bigkinds_responses")
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        path = urlparse(self.path).path.rstrip("/")
+        if path == "/issues":
+            self._send_file("list.json", "application/json; charset=utf-8")
+        elif path.startswith("/issues/"):
+            issue_id = os.path.basename(path)
+            for ext, content_type in ((".json", "application/json; charset=utf-8"), (".html", "text/html; charset=utf-8")):
+                if os.path.exists(os.path.join(RESPONSE_DIR, f"detail_{issue_id}{ext}")):
+                    return self._send_file(f"detail_{issue_id}{ext}", content_type)
+            self.send_error(404)
+        else:
+            self.send_error(404)
+
+    def _send_file(self, name, content_type):
+        with open(os.path.join(RESPONSE_DIR, name), "rb") as f:
+            body = f.read()
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+if __name__ == "__main__":
+    port = int(sys.argv[1]) if len(sys.argv) > 1 else 8765
+    print(f"🧪 BigKinds 스텁 서버: http://localhost:{port}/issues")
+    ThreadingHTTPServer(("127.0.0.1", port), StubHandler).serve_forever()
@@ -0,0 +1,155 @@
+# ingest_sources.py
+# 01/02 적재 스크립트와 namespace 관리 도구가 함께 쓰는 CSV 적재 설정
+
+import os
+from dataclasses import dataclass
+
+from dotenv import load_dotenv
+from ingest_utils import incremental_upsert, detect_encoding, iter_csv_chunks, iter_chunk_ids, make_token_text_splitter
+from chunk_dedup import dedup_chunks
+from embedding_cache import get_embeddings
+from vector_stores import get_index
+from namespace_aliases import resolve_namespace
+
+
+@dataclass
+class IngestSource:
+    """CSV 하나를 namespace 하나로 적재하는 설정"""
+    name: str                     # 별칭(namespace) 이름이자 벡터 ID 접두어
+    csv_path: str
+    chunk_size: int               # 문자 수 기준 (기본 CHUNK_UNIT=chars)
+    chunk_overlap: int
+    chunk_tokens: int             # 임베딩 모델 토큰 수 기준 (CHUNK_UNIT=tokens)
+    chunk_token_overlap: int
+    entity_column: str            # metadata["entity"]로 저장할 열
+    id_column: str = None         # metadata["row_id"]로 저장할 열 (없으면 행 내용 sha1)
+    row_key_field: str = "row"    # 벡터 ID의 행 키로 쓸 metadata
+    embed_batch_size: int = 100
+
+
+INDUSTRY_SOURCE = IngestSource(
+    name="industry",
+    csv_path="data/산업DB.v.0.3.csv",
+    chunk_size=2300,
+    chunk_overlap=230,
+    chunk_tokens=1500,
+    chunk_token_overlap=150,
+    entity_column="KRX 업종명",
+    # ID 열이 없으므로 행 키는 업종명 줄을 포함한 행 내용의 sha1 (행 번호를 쓰면 행 하나를
+    # 끼워 넣거나 지울 때 뒤쪽 모든 행의 벡터 ID가 바뀌어 전체를 다시 임베딩함)
+    row_key_field="row_id",
+    embed_batch_size=200,
+)
+
+PAST_ISSUE_SOURCE = IngestSource(
+    name="past_issue",
+    csv_path="data/Past_news.csv",
+    chunk_size=480,
+    chunk_overlap=48,
+    chunk_tokens=320,
+    chunk_token_overlap=32,
+    entity_column="Issue_name",
+    id_column="ID",
+    row_key_field="row_id",
+    embed_batch_size=30,
+)
+
+SOURCES = {
+    INDUSTRY_SOURCE.name: INDUSTRY_SOURCE,
+    PAST_ISSUE_SOURCE.name: PAST_ISSUE_SOURCE,
+}
+
+
+def make_text_splitter(source):
+    return make_token_text_splitter(
+        source.chunk_tokens, source.chunk_token_overlap,
+        source.chunk_size, source.chunk_overlap
+    )
+
+
+def iter_source_chunks(source, encoding=None):
+    """행 단위로 읽으면서 바로 분할
+
+    CHUNK_DEDUP=on이면 근사 중복 청크를 묶어 그룹마다 한 번만 임베딩한다
+    (동봉 CSV에서 측정한 threshold별 효과는 chunk_dedup.py 참고).
+    이 경우 중복 판정을 위해 전체 청크를 한 번 메모리에 모은 뒤 반환하므로
+    기본값(off)은 CSV 크기와 관계없이 메모리가 일정한 스트리밍 분할이다.
+    """
+    chunks = iter_csv_chunks(
+        source.csv_path, make_text_splitter(source), encoding=encoding,
+        entity_column=source.entity_column, id_column=source.id_column
+    )
+    if os.getenv("CHUNK_DEDUP", "off") != "on":
+        return chunks
+
+    # 엔티티/ID 머리말 줄은 행마다 달라 중복 판정에서 제외
+    header_columns = [column for column in (source.entity_column, source.id_column) if column]
+    representatives, total = dedup_chunks(
+        chunks, row_key_field=source.row_key_field,
+        threshold=float(os.getenv("CHUNK_DEDUP_THRESHOLD", "0.9")),
+        ignore_prefixes=tuple(f"{column}:" for column in header_columns)
+    )
+    if len(representatives) < total:
+        print(f"🧬 근사 중복 청크 정리: {total}개 → {len(representatives)}개 "
+              f"({total - len(representatives)}개는 대표 청크의 owners/entities로 연결)")
+    return iter(representatives)
+
+
+def count_source_chunks(source, encoding=None):
+    """CSV에서 만들어질 벡터 수 (임베딩 없이 결정적 ID만 계산)"""
+    return sum(1 for _ in iter_chunk_ids(iter_source_chunks(source, encoding), source.name, source.row_key_field))
+
+
+def ingest_source(source, namespace=None, full=False, encoding=None, embeddings=None, index=None):
+    """CSV를 namespace에 적재 (namespace 생략 시 별칭이 가리키는 현재 namespace)
+
+    Returns:
+        (추가된 수, 유지된 수, 삭제된 수)
+    """
+    # 임베딩 모델 객체 생성 (로컬 캐시 적용)
+    embeddings = embeddings or get_embeddings(model="text-embedding-3-small")
+    # 벡터 인덱스 연결 (VECTOR_BACKEND=local 이면 로컬 인덱스 사용)
+    index = index or get_index("lastproject")
+
+    # 벡터 스토어에 저장 (임베딩과 업로드를 동시에 진행)
+    # incremental: 결정적 ID로 기존 namespace와 비교하여 바뀐 청크만 반영
+    # full: 비교 없이 전체 청크를 다시 업로드
+    return incremental_upsert(
+        embeddings,
+        index,
+        iter_source_chunks(source, encoding),
+        namespace=namespace or resolve_namespace(source.name),
+        id_prefix=source.name,
+        full=full,
+        row_key_field=source.row_key_field,
+        embed_batch_size=int(os.getenv("EMBED_BATCH_SIZE", str(source.embed_batch_size))),
+        upsert_batch_size=int(os.getenv("UPSERT_BATCH_SIZE", "100")),
+        max_in_flight=int(os.getenv("INGEST_CONCURRENCY", "4"))
+    )
+
+
+def run_ingest_cli(name):
+    """01/02 스크립트 진입점"""
+    # 환경변수 로드
+    load_dotenv(override=True)
+    source = SOURCES[name]
+
+    # 파일 존재 여부 확인
+    if not os.path.exists(source.csv_path):
+        print(f"파일을 찾을 수 없습니다: {source.csv_path}")
+        print("현재 디렉토리:", os.getcwd())
+        print("파일 경로를 확인해주세요.")
+        exit(1)
+
+    # 파일 앞부분만 읽어 인코딩 판별 (utf-8 / cp949)
+    try:
+        encoding = detect_encoding(source.csv_path)
+        print(f"CSV 인코딩 확인: {encoding}")
+    except Exception as e:
+        print(f"CSV 인코딩 판별 중 오류 발생: {e}")
+        exit(1)
+
+    # 적재 모드: incremental(기본, 바뀐 청크만 업로드) / full(전체 재업로드)
+    ingest_source(source, full=(os.getenv("INGEST_MODE", "incremental") == "full"), encoding=encoding)
+
+    print("모든 문서 업로드 완료!")
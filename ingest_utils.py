@@ -0,0 +1,372 @@
+# ingest_utils.py
+# 01/02/03-2 적재 스크립트가 함께 쓰는 증분 업로드 유틸리티
+
+import codecs
+import csv
+import hashlib
+import json
+import os
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from langchain.text_splitter import RecursiveCharacterTextSplitter
+from langchain_core.documents import Document
+
+from tracing import get_tracer
+
+
+# 청크 ID 해시에 포함하지 않는 metadata
+# (행 위치/파일 경로는 ID의 행 키로 대신하고, 스냅샷마다 바뀌는 이슈번호는 제외)
+_ID_EXCLUDED_METADATA = ("source", "row", "이슈번호")
+
+
+def make_chunk_id(prefix, row_key, content, metadata=None):
+    """원본 행 키와 청크 내용(+ metadata)으로 결정적(deterministic) 벡터 ID 생성
+
+    같은 행의 같은 내용이면 항상 같은 ID가 나오므로,
+    내용이나 저장할 metadata가 바뀐 청크만 새 ID를 갖게 된다.
+    """
+    payload = content
+    if metadata:
+        payload += "\n" + json.dumps(metadata, ensure_ascii=False, sort_keys=True)
+    digest = hashlib.sha1(payload.encode("utf-8")).hexdigest()[:16]
+    return f"{prefix}-{row_key}-{digest}"
+
+
+def iter_chunk_ids(chunks, prefix, row_key_field="row"):
+    """청크마다 결정적 ID를 붙여 (id, chunk)를 하나씩 반환
+
+    같은 행 안에서 내용이 완전히 같은 청크는 하나만 남긴다.
+    """
+    seen = set()
+    for chunk in chunks:
+        row_key = chunk.metadata.get(row_key_field, chunk.metadata.get("row"))
+        metadata = {k: v for k, v in chunk.metadata.items() if k not in _ID_EXCLUDED_METADATA}
+        chunk_id = make_chunk_id(prefix, row_key, chunk.page_content, metadata)
+        if chunk_id in seen:
+            continue
+        seen.add(chunk_id)
+        yield chunk_id, chunk
+
+
+def detect_encoding(path, candidates=("utf-8", "cp949"), block_size=1024 * 1024):
+    """파일 전체를 블록 단위로 디코딩해 보고 인코딩 판별 (BOM이 있으면 utf-8-sig)
+
+    앞부분만 보면 앞쪽이 ASCII인 cp949 파일을 utf-8로 잘못 판별하여 적재 도중
+    UnicodeDecodeError가 나므로(이미 일부 배치가 올라간 뒤), 적재 전에 끝까지 확인한다.
+    블록 단위로 읽으므로 메모리 사용량은 파일 크기와 관계없이 일정하다.
+    """
+    with open(path, "rb") as f:
+        if f.read(3) == b"\xef\xbb\xbf":
+            return "utf-8-sig"
+    for encoding in candidates:
+        # 블록 경계에서 잘린 멀티바이트 문자는 증분 디코더가 다음 블록과 이어서 처리
+        decoder = codecs.getincrementaldecoder(encoding)()
+        try:
+            with open(path, "rb") as f:
+                for block in iter(lambda: f.read(block_size), b""):
+                    decoder.decode(block)
+            decoder.decode(b"", final=True)
+            return encoding
+        except UnicodeDecodeError:
+            continue
+    raise ValueError(f"지원하지 않는 인코딩입니다 (시도: {', '.join(candidates)}): {path}")
+
+
+def iter_csv_documents(path, encoding=None, entity_column=None, id_column=None):
+    """CSV를 한 행씩 읽어 CSVLoader와 같은 형식의 Document로 반환
+
+    Args:
+        entity_column: 값을 metadata["entity"]로 저장할 열 (예: KRX 업종명, Issue_name)
+        id_column: 값을 metadata["row_id"]로 저장할 열
+            (없으면 행 내용의 sha1 — 앞에 행이 추가/삭제되어도 바뀌지 않는 행 키)
+    """
+    encoding = encoding or detect_encoding(path)
+    with open(path, newline="", encoding=encoding) as f:
+        for i, row in enumerate(csv.DictReader(f)):
+            content = "\n".join(
+                f"{k.strip() if k is not None else k}: {v.strip() if isinstance(v, str) else v}"
+                for k, v in row.items()
+            )
+            metadata = {"source": path, "row": i}
+            if entity_column:
+                metadata["entity"] = (row.get(entity_column) or "").strip()
+            if entity_column or id_column:
+                metadata["row_id"] = (row.get(id_column) or "").strip() if id_column else \
+                    hashlib.sha1(content.encode("utf-8")).hexdigest()[:12]
+            yield Document(page_content=content, metadata=metadata)
+
+
+_SEPARATORS = ["\n\n", "\n", " ", ""]
+
+
+def make_token_text_splitter(chunk_tokens, token_overlap, chunk_chars, char_overlap):
+    """문자 수 기준 분할기 (CHUNK_UNIT=tokens 이면 임베딩 모델 토큰 수 기준)
+
+    한국어는 문자당 토큰 수가 문장마다 크게 달라 토큰 수로 자르면 청크 길이(=임베딩 비용)가
+    고르게 되지만, 분할 방식이 바뀌면 모든 청크 경계와 청크 ID가 바뀌어 기존 namespace를
+    증분 적재할 때 전체를 다시 임베딩하고 기존 벡터를 모두 지운다. 그래서 기본은 기존과 같은
+    문자 수 기준이고, 토큰 기준은 새 버전 namespace로 재구축할 때만 켠다:
+        CHUNK_UNIT=tokens python 참고/pinecone_namespace_delete.py rebuild industry
+    토큰 기준인데 tiktoken 인코딩을 쓸 수 없으면 조용히 문자 수로 바꾸지 않고 오류를 낸다.
+    """
+    unit = os.getenv("CHUNK_UNIT", "chars")
+    if unit == "chars":
+        return RecursiveCharacterTextSplitter(
+            chunk_size=chunk_chars,
+            chunk_overlap=char_overlap,
+            length_function=len,
+            separators=_SEPARATORS
+        )
+    if unit != "tokens":
+        raise ValueError(f"CHUNK_UNIT은 tokens 또는 chars여야 합니다: {unit}")
+    encoding_name = os.getenv("CHUNK_TOKEN_ENCODING", "cl100k_base")
+    try:
+        # text-embedding-3-* 모델과 같은 cl100k_base 인코딩
+        return RecursiveCharacterTextSplitter.from_tiktoken_encoder(
+            encoding_name=encoding_name,
+            chunk_size=chunk_tokens,
+            chunk_overlap=token_overlap,
+            separators=_SEPARATORS
+        )
+    except Exception as e:
+        # tiktoken 미설치 또는 (오프라인이라) 인코딩 파일을 받을 수 없는 경우
+        raise RuntimeError(
+            f"토큰 기준 분할에 필요한 tiktoken 인코딩({encoding_name})을 불러올 수 없습니다: {e}\n"
+            f"  tiktoken 설치/네트워크를 확인하거나, CHUNK_UNIT을 지우고(기본 chars) 실행하세요."
+        ) from e
+
+
+def iter_csv_chunks(path, text_splitter, encoding=None, entity_column=None, id_column=None):
+    """CSV를 행 단위로 읽으면서 바로 분할하여 청크를 하나씩 반환
+
+    전체 파일이나 전체 청크 목록을 메모리에 올리지 않으므로
+    CSV 크기와 관계없이 메모리 사용량이 일정하다.
+    행의 metadata(entity, row_id)는 모든 청크에 그대로 복사되므로,
+    분할 경계가 머리말 줄을 잘라도 청크가 어느 행의 것인지 알 수 있다.
+    """
+    for doc in iter_csv_documents(path, encoding, entity_column, id_column):
+        yield from text_splitter.split_documents([doc])
+
+
+def list_namespace_ids(index, namespace):
+    """namespace에 이미 저장된 벡터 ID 전체를 집합으로 반환"""
+    existing = set()
+    for id_page in index.list(namespace=namespace):
+        existing.update(id_page)
+    return existing
+
+
+def _batched(iterable, size):
+    """iterable을 size개씩 묶어서 순서대로 반환"""
+    batch = []
+    for item in iterable:
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def pipelined_upsert(pairs, embeddings, index, namespace, embed_batch_size=100,
+                     upsert_batch_size=100, max_in_flight=4, text_key="text", on_batch=None):
+    """임베딩과 업로드를 동시에 진행하는 파이프라인 적재
+
+    - 임베딩: 최대 max_in_flight개 배치를 스레드 풀에서 동시에 요청
+    - 업로드: 별도 스레드가 임베딩 결과를 upsert_batch_size 단위로 묶어 upsert
+    - 업로드가 밀리면 새 임베딩 요청을 멈추므로(backpressure) 메모리 사용량이 일정하다
+
+    Args:
+        pairs: (벡터 ID, Document) 쌍의 iterable
+        embeddings: 임베딩 객체 (embed_documents 사용)
+        index: Pinecone Index 또는 LocalIndex
+        namespace: 대상 namespace
+        embed_batch_size: 임베딩 API 한 번에 보낼 텍스트 수
+        upsert_batch_size: Pinecone upsert 한 번에 보낼 벡터 수
+        max_in_flight: 동시에 진행할 임베딩 배치 수
+        text_key: 원문을 저장할 metadata 키 (PineconeVectorStore 기본값과 동일)
+        on_batch: upsert가 끝날 때마다 업로드된 ID 리스트로 호출할 함수 (체크포인트 기록용)
+
+    Returns:
+        업로드된 벡터 수
+    """
+    results = queue.Queue(maxsize=max_in_flight)
+    slots = threading.BoundedSemaphore(max_in_flight)
+    errors = []
+    uploaded = [0]
+
+    def embed_batch(batch):
+        vectors = embeddings.embed_documents([doc.page_content for _, doc in batch])
+        return [
+            {
+                "id": chunk_id,
+                "values": vector,
+                "metadata": {**doc.metadata, text_key: doc.page_content}
+            }
+            for (chunk_id, doc), vector in zip(batch, vectors)
+        ]
+
+    def upload(records):
+        index.upsert(vectors=records, namespace=namespace)
+        uploaded[0] += len(records)
+        if on_batch:
+            on_batch([record["id"] for record in records])
+
+    def upsert_worker():
+        pending = []
+        batch_no = 0
+        while True:
+            future = results.get()
+            if future is None:
+                break
+            try:
+                pending.extend(future.result())
+            except Exception as e:
+                errors.append(e)
+            finally:
+                # 업로드 단계가 결과를 가져간 뒤에야 다음 임베딩 요청 허용
+                slots.release()
+            while len(pending) >= upsert_batch_size and not errors:
+                records, pending = pending[:upsert_batch_size], pending[upsert_batch_size:]
+                try:
+                    upload(records)
+                except Exception as e:
+                    errors.append(e)
+                    break
+                batch_no += 1
+                print(f"배치 {batch_no} 완료: {len(records)}개 문서 업로드")
+        if pending and not errors:
+            try:
+                upload(pending)
+                print(f"배치 {batch_no + 1} 완료: {len(pending)}개 문서 업로드")
+            except Exception as e:
+                errors.append(e)
+
+    uploader = threading.Thread(target=upsert_worker, daemon=True)
+    uploader.start()
+
+    with ThreadPoolExecutor(max_workers=max_in_flight) as executor:
+        try:
+            for batch in _batched(pairs, embed_batch_size):
+                slots.acquire()
+                if errors:
+                    slots.release()
+                    break
+                # 제출 순서대로 큐에 넣어 업로드 순서를 유지
+                results.put(executor.submit(embed_batch, batch))
+        finally:
+            # pairs(CSV 읽기/분할)에서 예외가 나도 업로드 스레드를 끝내고,
+            # 이미 임베딩한 배치는 업로드(체크포인트 기록)한 뒤 그 예외를 그대로 올림
+            results.put(None)
+            uploader.join()
+
+    if errors:
+        raise errors[0]
+    return uploaded[0]
+
+
+def incremental_upsert(embeddings, index, chunks, namespace, id_prefix, full=False,
+                       embed_batch_size=100, upsert_batch_size=100, max_in_flight=4,
+                       row_key_field="row", delete_batch_size=1000):
+    """새로 생기거나 바뀐 청크만 임베딩/업로드하고, 사라진 청크는 삭제
+
+    chunks는 리스트뿐 아니라 generator도 받으며, 청크를 하나씩 흘려보내므로
+    첫 업로드가 전체 분할이 끝나기 전에 시작된다.
+
+    Args:
+        embeddings: 임베딩 객체
+        index: 대상 Pinecone Index 또는 LocalIndex
+        chunks: 분할된 Document의 iterable
+        namespace: 대상 namespace
+        id_prefix: 벡터 ID 접두어
+        full: True이면 기존 벡터와 비교하지 않고 전체를 다시 업로드
+        embed_batch_size, upsert_batch_size, max_in_flight: pipelined_upsert 설정
+        row_key_field: 행을 식별할 metadata 키 (기본: CSVLoader의 row)
+
+    Returns:
+        (추가된 수, 유지된 수, 삭제된 수)
+    """
+    with get_tracer().span(f"ingest.{namespace}") as span:
+        new, kept, deleted = _incremental_upsert(
+            embeddings, index, chunks, namespace, id_prefix, full,
+            embed_batch_size, upsert_batch_size, max_in_flight, row_key_field, delete_batch_size
+        )
+        span.update(new=new, kept=kept, deleted=deleted)
+    return new, kept, deleted
+
+
+def _incremental_upsert(embeddings, index, chunks, namespace, id_prefix, full,
+                        embed_batch_size, upsert_batch_size, max_in_flight, row_key_field, delete_batch_size):
+    existing_ids = set() if full else list_namespace_ids(index, namespace)
+    print(f"🔎 기존 벡터 {len(existing_ids)}개")
+
+    desired_ids = set()
+    counts = {"new": 0, "kept": 0}
+
+    def new_pairs():
+        for chunk_id, chunk in iter_chunk_ids(chunks, id_prefix, row_key_field):
+            desired_ids.add(chunk_id)
+            if chunk_id in existing_ids:
+                counts["kept"] += 1
+                continue
+            counts["new"] += 1
+            yield chunk_id, chunk
+
+    # 새로 생기거나 내용이 바뀐 청크만 임베딩 후 업로드
+    pipelined_upsert(
+        new_pairs(), embeddings, index, namespace,
+        embed_batch_size=embed_batch_size,
+        upsert_batch_size=upsert_batch_size,
+        max_in_flight=max_in_flight
+    )
+
+    # 더 이상 원본에 없는 청크(이전 버전, 랜덤 ID 벡터 포함) 삭제
+    orphan_ids = [] if full else sorted(existing_ids - desired_ids)
+    for i in range(0, len(orphan_ids), delete_batch_size):
+        index.delete(ids=orphan_ids[i:i+delete_batch_size], namespace=namespace)
+
+    # 로컬 백엔드는 변경 내용을 디스크에 기록
+    if hasattr(index, "flush"):
+        index.flush()
+
+    print(f"✅ 적재 완료: 추가 {counts['new']}개, 유지 {counts['kept']}개, 삭제 {len(orphan_ids)}개")
+    return counts["new"], counts["kept"], len(orphan_ids)
+
+
+class IngestCheckpoint:
+    """배치 단위 적재 체크포인트 (중단 후 다시 실행하면 이미 올린 청크는 건너뜀)
+
+    파일 형식: {"source": 적재 중인 원본 이름, "completed_ids": [벡터 ID, ...]}
+    source가 바뀌면(새 스냅샷) 이전 기록은 버리고 새로 시작한다.
+    """
+
+    def __init__(self, path, source):
+        self.path = path
+        self.source = source
+        self.completed_ids = set()
+        self._lock = threading.Lock()
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("source") == source:
+                self.completed_ids = set(data.get("completed_ids", []))
+
+    def record(self, ids):
+        """업로드가 끝난 배치의 ID를 기록 (임시 파일에 쓴 뒤 교체)"""
+        with self._lock:
+            self.completed_ids.update(ids)
+            if os.path.dirname(self.path):
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            tmp_path = self.path + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"source": self.source, "completed_ids": sorted(self.completed_ids)}, f)
+            os.replace(tmp_path, self.path)
+
+    def clear(self):
+        """원본 전체 적재가 끝나면 체크포인트 파일 삭제"""
+        with self._lock:
+            self.completed_ids = set()
+            if os.path.exists(self.path):
+                os.remove(self.path)
@@ -0,0 +1,103 @@
+# issue_scheduler.py
+# 04 에이전트의 이슈별 분석을 동시에 실행하는 스케줄러
+
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from openai import RateLimitError
+
+
+class RateLimiter:
+    """분당 요청 수를 넘지 않도록 호출 간격을 조절 (0 이하이면 제한 없음)"""
+
+    def __init__(self, requests_per_minute=0):
+        self.interval = 60.0 / requests_per_minute if requests_per_minute > 0 else 0
+        self._next_time = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        if not self.interval:
+            return
+        with self._lock:
+            now = time.monotonic()
+            wait = self._next_time - now
+            self._next_time = max(now, self._next_time) + self.interval
+        if wait > 0:
+            time.sleep(wait)
+
+
+def call_with_rate_limit(fn, limiter=None, max_retries=5, base_delay=2.0):
+    """limiter로 호출 속도를 조절하고, 429(RateLimitError)면 지수 백오프로 재시도"""
+    for attempt in range(max_retries + 1):
+        if limiter:
+            limiter.acquire()
+        try:
+            return fn()
+        except RateLimitError:
+            if attempt == max_retries:
+                raise
+            delay = base_delay * (2 ** attempt)
+            print(f"⏳ 요청 한도 초과, {delay:.0f}초 후 재시도 ({attempt + 1}/{max_retries})")
+            time.sleep(delay)
+
+
+def run_in_order(items, worker, max_workers=4):
+    """items를 최대 max_workers개까지 동시에 처리하고, 결과는 입력 순서대로 반환
+
+    앞 항목이 끝나는 즉시 그 결과를 내보내므로, 뒤 항목이 먼저 끝나도
+    출력 순서는 항상 items 순서와 같다.
+
+    Args:
+        items: 처리할 항목 리스트
+        worker: worker(index, item) -> 결과
+        max_workers: 동시에 처리할 최대 항목 수
+
+    Yields:
+        (index, 결과) — 처리 중 예외가 나면 결과 자리에 예외 객체
+    """
+    items = list(items)
+    if not items:
+        return
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(items)))) as executor:
+        futures = [executor.submit(worker, idx, item) for idx, item in enumerate(items)]
+        for idx, future in enumerate(futures):
+            try:
+                yield idx, future.result()
+            except Exception as e:
+                yield idx, e
+
+
+class OrderedStream:
+    """여러 작업이 동시에 만드는 텍스트 조각을 작업 순서대로 내보냄
+
+    맨 앞 작업의 조각은 도착 즉시 write로 보내고, 뒤 작업의 조각은
+    앞 작업이 모두 끝날 때까지 모아 두었다가 차례가 되면 한꺼번에 보낸다.
+    (run_in_order와 같은 순서 보장을 결과 단위가 아닌 조각 단위로 적용)
+
+    Args:
+        write: write(작업 index, *조각) — write(index, ...)로 받은 인자를 lock 안에서 순서대로 전달
+    """
+
+    def __init__(self, write):
+        self._write = write
+        self._head = 0
+        self._buffers = {}
+        self._finished = set()
+        self._lock = threading.Lock()
+
+    def write(self, index, *piece):
+        with self._lock:
+            if index == self._head:
+                self._write(index, *piece)
+            else:
+                self._buffers.setdefault(index, []).append(piece)
+
+    def finish(self, index):
+        """작업이 끝났음을 알리고, 다음 작업들의 모아 둔 조각을 내보냄"""
+        with self._lock:
+            self._finished.add(index)
+            while self._head in self._finished:
+                self._head += 1
+                for piece in self._buffers.pop(self._head, []):
+                    self._write(self._head, *piece)
@@ -0,0 +1,89 @@
+# lexical_index.py
+# 산업DB / Past_news 후보 목록용 로컬 역색인 (문자 n-gram BM25)
+# 형태소 분석기 없이 한국어 키워드 일치를 잡아내서 벡터 검색과 결합한다
+
+import math
+from collections import Counter, defaultdict
+
+import numpy as np
+
+
+def char_ngram_counts(text, n=2):
+    """공백 단위 토큰마다 문자 n-gram을 세어 반환 (n보다 짧은 토큰은 그대로 사용)"""
+    counts = Counter()
+    for token in str(text).lower().split():
+        if len(token) < n:
+            counts[token] += 1
+            continue
+        for i in range(len(token) - n + 1):
+            counts[token[i:i+n]] += 1
+    return counts
+
+
+class BM25Index:
+    """이름별 문서(이름 + 설명)에 대한 문자 n-gram BM25 역색인"""
+
+    def __init__(self, names, texts, n=2, k1=1.5, b=0.75):
+        self.names = list(names)
+        self.n = n
+        self.k1 = k1
+        self.b = b
+
+        # gram → [(문서 번호, 빈도)]
+        self.postings = defaultdict(list)
+        lengths = []
+        for doc_id, text in enumerate(texts):
+            counts = char_ngram_counts(text, n)
+            lengths.append(sum(counts.values()))
+            for gram, tf in counts.items():
+                self.postings[gram].append((doc_id, tf))
+
+        self.doc_lengths = np.asarray(lengths, dtype=np.float32)
+        self.avg_length = float(self.doc_lengths.mean()) if lengths else 0.0
+        doc_count = len(self.names)
+        self.idf = {
+            gram: math.log(1 + (doc_count - len(posting) + 0.5) / (len(posting) + 0.5))
+            for gram, posting in self.postings.items()
+        }
+
+    @classmethod
+    def from_catalogue(cls, names, descriptions, **kwargs):
+        return cls(names, [f"{name}\n{desc}" for name, desc in zip(names, descriptions)], **kwargs)
+
+    def scores(self, query):
+        """모든 문서의 BM25 점수 (질의의 서로 다른 n-gram마다 한 번씩 반영)"""
+        scores = np.zeros(len(self.names), dtype=np.float32)
+        if not self.names:
+            return scores
+        norm = self.k1 * (1 - self.b + self.b * self.doc_lengths / max(self.avg_length, 1e-6))
+        for gram in char_ngram_counts(query, self.n):
+            posting = self.postings.get(gram)
+            if not posting:
+                continue
+            doc_ids = np.fromiter((d for d, _ in posting), dtype=np.int64, count=len(posting))
+            tfs = np.fromiter((tf for _, tf in posting), dtype=np.float32, count=len(posting))
+            scores[doc_ids] += self.idf[gram] * tfs * (self.k1 + 1) / (tfs + norm[doc_ids])
+        return scores
+
+    def search(self, query, k=10):
+        """점수가 0보다 큰 상위 k개를 [(이름, 점수)]로 반환"""
+        scores = self.scores(query)
+        top = np.argsort(-scores)[:k]
+        return [(self.names[i], float(scores[i])) for i in top if scores[i] > 0]
+
+
+def reciprocal_rank_fusion(rankings, k=60):
+    """여러 순위 리스트를 RRF로 결합
+
+    Args:
+        rankings: 이름 리스트들 (각각 관련도 높은 순)
+        k: RRF 상수 (클수록 하위 순위의 영향이 커짐)
+
+    Returns:
+        {이름: RRF 점수}
+    """
+    fused = defaultdict(float)
+    for ranking in rankings:
+        for rank, name in enumerate(ranking, 1):
+            fused[name] += 1.0 / (k + rank)
+    return dict(fused)
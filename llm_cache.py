@@ -0,0 +1,117 @@
+# llm_cache.py
+# 04 에이전트의 LLM 응답 캐시 (SQLite, TTL + 개수 제한)
+
+import os
+import time
+import sqlite3
+import hashlib
+import threading
+
+from langchain_core.caches import BaseCache
+from langchain_core.load import dumps, loads
+
+from tracing import count_in_current_span
+
+DEFAULT_CACHE_PATH = ".cache/llm_responses.sqlite"
+
+
+class TTLSQLiteCache(BaseCache):
+    """(모델/파라미터 문자열, 렌더링된 프롬프트) 해시를 키로 응답을 저장하는 캐시
+
+    - ttl_seconds가 지난 항목은 조회 시 만료 처리
+    - max_entries를 넘으면 가장 오래 사용되지 않은 항목부터 삭제
+    """
+
+    def __init__(self, path=None, ttl_seconds=None, max_entries=None):
+        path = path or os.getenv("LLM_CACHE_PATH", DEFAULT_CACHE_PATH)
+        if ttl_seconds is None:
+            ttl_seconds = float(os.getenv("LLM_CACHE_TTL_HOURS", "168")) * 3600
+        if max_entries is None:
+            max_entries = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "5000"))
+
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS llm_responses (
+                key TEXT PRIMARY KEY,
+                response TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                last_used REAL NOT NULL
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_llm_last_used ON llm_responses(last_used)")
+        self._conn.commit()
+
+    @staticmethod
+    def _key(prompt, llm_string):
+        return hashlib.sha256(f"{llm_string}\n{prompt}".encode("utf-8")).hexdigest()
+
+    def lookup(self, prompt, llm_string):
+        key = self._key(prompt, llm_string)
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT response, created_at FROM llm_responses WHERE key=?", (key,)
+            ).fetchone()
+            if row and self.ttl_seconds and now - row[1] > self.ttl_seconds:
+                self._conn.execute("DELETE FROM llm_responses WHERE key=?", (key,))
+                self._conn.commit()
+                row = None
+            if row is None:
+                self.misses += 1
+                count_in_current_span("llm_cache_misses")
+                return None
+            self.hits += 1
+            count_in_current_span("llm_cache_hits")
+            self._conn.execute("UPDATE llm_responses SET last_used=? WHERE key=?", (now, key))
+            self._conn.commit()
+        return loads(row[0])
+
+    def update(self, prompt, llm_string, return_val):
+        key = self._key(prompt, llm_string)
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO llm_responses VALUES (?, ?, ?, ?)",
+                (key, dumps(list(return_val)), now, now)
+            )
+            count = self._conn.execute("SELECT COUNT(*) FROM llm_responses").fetchone()[0]
+            if self.max_entries and count > self.max_entries:
+                self._conn.execute(
+                    "DELETE FROM llm_responses WHERE key IN "
+                    "(SELECT key FROM llm_responses ORDER BY last_used LIMIT ?)",
+                    (count - self.max_entries,)
+                )
+            self._conn.commit()
+
+    def clear(self, **kwargs):
+        with self._lock:
+            self._conn.execute("DELETE FROM llm_responses")
+            self._conn.commit()
+
+    def print_stats(self):
+        """실행 종료 시 캐시 적중/미적중 횟수 출력"""
+        total = self.hits + self.misses
+        rate = self.hits / total * 100 if total else 0
+        print(f"💾 LLM 캐시: 적중 {self.hits}회 / 미적중 {self.misses}회 (적중률 {rate:.1f}%)")
+
+
+_llm_cache = None
+
+
+def get_llm_cache():
+    """프로세스에서 공유하는 LLM 캐시 (LLM_CACHE=off 이면 None)"""
+    global _llm_cache
+    if os.getenv("LLM_CACHE", "on") == "off":
+        return None
+    if _llm_cache is None:
+        _llm_cache = TTLSQLiteCache()
+    return _llm_cache
@@ -0,0 +1,394 @@
+# local_vector_store.py
+# Pinecone 없이 로컬에서 동작하는 벡터 스토어 (NumPy 행렬 + 메타데이터 파일)
+
+import os
+import json
+import mmap
+import threading
+import atexit
+import uuid
+
+import numpy as np
+from langchain_core.documents import Document
+from langchain_core.vectorstores import VectorStore
+
+
+class _Namespace:
+    """namespace 하나의 벡터 행렬과 메타데이터"""
+
+    def __init__(self, dim=None, dtype="float32"):
+        self.ids = []
+        self.metadata = []
+        self.positions = {}
+        self.matrix = np.zeros((0, dim or 0), dtype=dtype)
+        # 쓰기용 행렬 (matrix는 이 배열 앞쪽 len(ids)행의 view, 용량을 두 배씩 늘려 추가 때마다 전체를 복사하지 않음)
+        self.buffer = None
+        self.dirty = False
+        # 양자화 검색 행렬 (quantize 설정 시 첫 검색 때 matrix에서 만들고, 변경되면 버림)
+        self.quantized = None
+        self.scales = None
+
+
+class LocalIndex:
+    """Pinecone Index와 같은 형태의 메서드를 제공하는 로컬 인덱스
+
+    namespace마다 정규화된 벡터 행렬(.npy, memory-map으로 로드)과
+    ID/메타데이터 사이드카(.meta.jsonl)를 root_dir 아래에 저장한다.
+    검색은 행렬 곱 한 번으로 전체 코사인 유사도를 계산하는 brute-force 방식이다.
+
+    quantize="int8"/"float16"이면 검색용 행렬을 그 형식으로 메모리에 따로 두고,
+    상위 top_k * rescore_factor개 후보만 디스크(memory-map)의 원래 정밀도 벡터로 다시 채점한다.
+    (rescore_factor=0이면 재채점 없이 양자화 점수를 그대로 사용)
+    원래 정밀도 행렬은 디스크에 저장된 상태면 memory-map으로만 두고, 양자화 행렬을 만들며
+    읽은 페이지는 돌려준다. 아직 flush하지 않은 upsert가 있으면 그 동안은 메모리에 남는다
+    (memory_usage()가 실제로 메모리에 올라간 크기를 보고).
+    """
+
+    def __init__(self, root_dir=".cache/vectors", dtype="float32", quantize=None, rescore_factor=4):
+        self.root_dir = root_dir
+        self.dtype = np.dtype(dtype)
+        self.quantize = quantize if quantize in ("int8", "float16") else None
+        self.rescore_factor = rescore_factor
+        self._namespaces = {}
+        self._lock = threading.RLock()
+        os.makedirs(root_dir, exist_ok=True)
+        atexit.register(self.flush)
+
+    # ---- 저장/로드 ----
+    def _paths(self, namespace):
+        base = os.path.join(self.root_dir, namespace or "__default__")
+        return base + ".npy", base + ".meta.jsonl"
+
+    def _get(self, namespace):
+        with self._lock:
+            if namespace in self._namespaces:
+                return self._namespaces[namespace]
+
+            ns = _Namespace(dtype=self.dtype)
+            matrix_path, meta_path = self._paths(namespace)
+            if os.path.exists(matrix_path) and os.path.exists(meta_path):
+                ns.matrix = np.load(matrix_path, mmap_mode="r")
+                with open(meta_path, "r", encoding="utf-8") as f:
+                    for line in f:
+                        record = json.loads(line)
+                        ns.positions[record["id"]] = len(ns.ids)
+                        ns.ids.append(record["id"])
+                        ns.metadata.append(record["metadata"])
+            self._namespaces[namespace] = ns
+            return ns
+
+    def flush(self):
+        """변경된 namespace를 디스크에 기록 (임시 파일에 쓴 뒤 교체)"""
+        with self._lock:
+            for namespace, ns in self._namespaces.items():
+                if not ns.dirty:
+                    continue
+                matrix_path, meta_path = self._paths(namespace)
+                np.save(matrix_path + ".tmp.npy", np.asarray(ns.matrix, dtype=self.dtype))
+                with open(meta_path + ".tmp", "w", encoding="utf-8") as f:
+                    for vector_id, metadata in zip(ns.ids, ns.metadata):
+                        f.write(json.dumps({"id": vector_id, "metadata": metadata}, ensure_ascii=False) + "\n")
+                os.replace(matrix_path + ".tmp.npy", matrix_path)
+                os.replace(meta_path + ".tmp", meta_path)
+                ns.dirty = False
+                if self.quantize:
+                    # 검색은 양자화 행렬로 하므로 원래 정밀도 행렬은 memory-map으로 바꿔 메모리에서 내림
+                    ns.matrix, ns.buffer = np.load(matrix_path, mmap_mode="r"), None
+
+    # ---- Pinecone Index 호환 메서드 ----
+    def upsert(self, vectors, namespace=None):
+        """vectors: {"id", "values", "metadata"} dict 또는 (id, values, metadata) 튜플 리스트"""
+        records = [
+            (v["id"], v["values"], v.get("metadata", {})) if isinstance(v, dict) else
+            (v[0], v[1], v[2] if len(v) > 2 else {})
+            for v in vectors
+        ]
+        if not records:
+            return {"upserted_count": 0}
+
+        values = np.asarray([r[1] for r in records], dtype=np.float32)
+        norms = np.linalg.norm(values, axis=1, keepdims=True)
+        values = (values / np.maximum(norms, 1e-12)).astype(self.dtype)
+
+        with self._lock:
+            ns = self._get(namespace)
+            if ns.ids and ns.matrix.shape[1] != values.shape[1]:
+                # EMBEDDING_DIMENSIONS를 바꾼 경우: 기존 namespace에 섞지 않고 새 버전으로 재구축해야 함
+                raise ValueError(
+                    f"namespace '{namespace}'는 {ns.matrix.shape[1]}차원인데 {values.shape[1]}차원 벡터를 넣으려 했습니다. "
+                    f"임베딩 차원을 바꾸면 새 namespace 버전으로 재구축하세요."
+                )
+            new_ids = {r[0] for r in records if r[0] not in ns.positions}
+            buffer = self._reserve(ns, len(ns.ids) + len(new_ids), values.shape[1])
+
+            for (vector_id, _, metadata), row in zip(records, values):
+                if vector_id in ns.positions:
+                    pos = ns.positions[vector_id]
+                    ns.metadata[pos] = metadata
+                else:
+                    pos = ns.positions[vector_id] = len(ns.ids)
+                    ns.ids.append(vector_id)
+                    ns.metadata.append(metadata)
+                buffer[pos] = row
+            ns.matrix = buffer[:len(ns.ids)]
+            ns.quantized = ns.scales = None
+            ns.dirty = True
+        return {"upserted_count": len(records)}
+
+    def _reserve(self, ns, rows, dim):
+        """rows행을 담을 수 있는 쓰기용 행렬 반환 (부족하면 용량을 두 배로 늘려 기존 행만 한 번 복사)"""
+        if ns.buffer is not None and ns.buffer.shape[0] >= rows:
+            return ns.buffer
+        capacity = max(rows, 2 * (ns.buffer.shape[0] if ns.buffer is not None else len(ns.ids)), 16)
+        buffer = np.empty((capacity, dim), dtype=self.dtype)
+        if ns.ids:
+            buffer[:len(ns.ids)] = ns.matrix[:len(ns.ids)]
+        ns.buffer = buffer
+        return buffer
+
+    def list(self, namespace=None, prefix=None, limit=100):
+        """ID를 limit개씩 나누어 반환 (Pinecone index.list와 동일한 generator)"""
+        ns = self._get(namespace)
+        ids = [i for i in ns.ids if prefix is None or i.startswith(prefix)]
+        for i in range(0, len(ids), limit):
+            yield ids[i:i+limit]
+
+    def delete(self, ids=None, delete_all=False, namespace=None):
+        with self._lock:
+            ns = self._get(namespace)
+            if delete_all:
+                remove = set(ns.ids)
+            else:
+                remove = {i for i in (ids or []) if i in ns.positions}
+            if not remove:
+                return {}
+            keep = [pos for pos, vector_id in enumerate(ns.ids) if vector_id not in remove]
+            ns.matrix = ns.buffer = np.array(ns.matrix[keep], dtype=self.dtype) if keep else \
+                np.zeros((0, ns.matrix.shape[1]), dtype=self.dtype)
+            ns.ids = [ns.ids[pos] for pos in keep]
+            ns.metadata = [ns.metadata[pos] for pos in keep]
+            ns.positions = {vector_id: pos for pos, vector_id in enumerate(ns.ids)}
+            ns.quantized = ns.scales = None
+            ns.dirty = True
+        return {}
+
+    def query(self, vector, top_k=10, namespace=None, include_metadata=True, include_values=False):
+        ns = self._get(namespace)
+        matches = []
+        for pos, score in self._top_k(ns, np.asarray(vector, dtype=np.float32), top_k):
+            match = {"id": ns.ids[pos], "score": float(score)}
+            if include_metadata:
+                match["metadata"] = ns.metadata[pos]
+            matches.append(match)
+        return {"matches": matches, "namespace": namespace or ""}
+
+    def query_many(self, vectors, top_k=10, namespace=None, include_metadata=True):
+        """여러 질의 벡터를 행렬 곱 한 번으로 검색하여 query 결과 리스트 반환"""
+        ns = self._get(namespace)
+        results = []
+        for top in self._top_k_many(ns, np.asarray(vectors, dtype=np.float32), top_k):
+            matches = []
+            for pos, score in top:
+                match = {"id": ns.ids[pos], "score": float(score)}
+                if include_metadata:
+                    match["metadata"] = ns.metadata[pos]
+                matches.append(match)
+            results.append({"matches": matches, "namespace": namespace or ""})
+        return results
+
+    def describe_index_stats(self):
+        with self._lock:
+            for filename in os.listdir(self.root_dir):
+                if filename.endswith(".meta.jsonl"):
+                    self._get(filename[:-len(".meta.jsonl")])
+            namespaces = {
+                name: {"vector_count": len(ns.ids)}
+                for name, ns in self._namespaces.items() if ns.ids
+            }
+        return {
+            "total_vector_count": sum(n["vector_count"] for n in namespaces.values()),
+            "namespaces": namespaces,
+        }
+
+    # ---- 검색 ----
+    def _top_k(self, ns, vector, top_k):
+        """정규화된 행렬과의 내적(=코사인 유사도)으로 상위 top_k (위치, 점수) 반환"""
+        if not ns.ids:
+            return []
+        return self._top_k_many(ns, vector[np.newaxis, :], top_k)[0]
+
+    def _top_k_many(self, ns, vectors, top_k):
+        """질의 행렬 전체를 한 번에 곱해 질의별 상위 top_k 반환"""
+        if not ns.ids:
+            return [[] for _ in vectors]
+        if vectors.shape[1] != ns.matrix.shape[1]:
+            raise ValueError(f"질의 벡터는 {vectors.shape[1]}차원인데 인덱스는 {ns.matrix.shape[1]}차원입니다 "
+                             f"(EMBEDDING_DIMENSIONS 설정을 확인하세요)")
+        vectors = vectors / np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+        if self.quantize:
+            return self._top_k_quantized(ns, vectors, top_k)
+        scores = vectors @ np.asarray(ns.matrix, dtype=np.float32).T
+        return self._select_top_k(scores, top_k)
+
+    @staticmethod
+    def _select_top_k(scores, top_k):
+        if top_k <= 0:
+            return [[] for _ in scores]
+        k = min(top_k, scores.shape[1])
+        top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        results = []
+        for row, candidates in zip(scores, top):
+            candidates = candidates[np.argsort(-row[candidates])]
+            results.append([(int(pos), row[pos]) for pos in candidates])
+        return results
+
+    # ---- 양자화 검색 ----
+    _BLOCK_ROWS = 2048
+
+    def _ensure_quantized(self, ns):
+        """검색용 양자화 행렬을 블록 단위로 생성 (원래 행렬 전체를 float32로 복사하지 않음)"""
+        with self._lock:
+            if ns.quantized is not None:
+                return ns.quantized, ns.scales
+            rows, dim = ns.matrix.shape
+            if self.quantize == "float16":
+                quantized, scales = np.empty((rows, dim), dtype=np.float16), None
+            else:
+                # int8: 행마다 최대 절댓값을 127로 맞추는 대칭 양자화 (점수 = 정수 내적 × 행 배율)
+                quantized, scales = np.empty((rows, dim), dtype=np.int8), np.empty(rows, dtype=np.float32)
+            for start in range(0, rows, self._BLOCK_ROWS):
+                block = np.asarray(ns.matrix[start:start+self._BLOCK_ROWS], dtype=np.float32)
+                if scales is None:
+                    quantized[start:start+len(block)] = block
+                else:
+                    scale = np.maximum(np.abs(block).max(axis=1), 1e-12) / 127.0
+                    quantized[start:start+len(block)] = np.round(block / scale[:, None])
+                    scales[start:start+len(block)] = scale
+            ns.quantized, ns.scales = quantized, scales
+            _release_pages(ns.matrix)
+            return quantized, scales
+
+    def _top_k_quantized(self, ns, vectors, top_k):
+        quantized, scales = self._ensure_quantized(ns)
+        rows = quantized.shape[0]
+        scores = np.empty((len(vectors), rows), dtype=np.float32)
+        for start in range(0, rows, self._BLOCK_ROWS):
+            block = quantized[start:start+self._BLOCK_ROWS].astype(np.float32)
+            scores[:, start:start+len(block)] = vectors @ block.T
+        if scales is not None:
+            scores *= scales
+
+        if self.rescore_factor <= 0:
+            return self._select_top_k(scores, top_k)
+
+        # 양자화 점수 상위 후보만 원래 정밀도 벡터로 다시 채점
+        results = []
+        for vector, candidates in zip(vectors, self._select_top_k(scores, top_k * self.rescore_factor)):
+            positions = np.sort(np.fromiter((pos for pos, _ in candidates), dtype=np.int64))
+            exact = _read_rows(ns.matrix, positions) @ vector
+            order = np.argsort(-exact)[:top_k]
+            results.append([(int(positions[i]), exact[i]) for i in order])
+        return results
+
+    def memory_usage(self, namespace=None):
+        """검색 시 프로세스 메모리에 올라가는 바이트 수
+
+        - search: 검색에 쓰는 행렬 (양자화 행렬 + 행 배율, 양자화하지 않으면 원래 행렬)
+        - full_precision: 양자화 시 메모리에 남아 있는 원래 정밀도 행렬 (memory-map이면 0)
+        """
+        ns = self._get(namespace)
+        on_disk = isinstance(ns.matrix, np.memmap)
+        if self.quantize and ns.quantized is not None:
+            search = ns.quantized.nbytes + (ns.scales.nbytes if ns.scales is not None else 0)
+            full_precision = 0 if on_disk else ns.matrix.nbytes
+        else:
+            search, full_precision = ns.matrix.nbytes, 0
+        return {"search": search, "full_precision": full_precision, "total": search + full_precision}
+
+
+def _release_pages(matrix):
+    """memory-map 행렬에서 읽어 들인 페이지를 운영체제에 돌려줌 (지원하지 않는 OS면 무시)"""
+    buffer = getattr(matrix, "_mmap", None)
+    if buffer is None or not hasattr(mmap, "MADV_DONTNEED"):
+        return
+    try:
+        buffer.madvise(mmap.MADV_DONTNEED)
+    except (OSError, ValueError):
+        pass
+
+
+def _read_rows(matrix, positions):
+    """원래 정밀도 행렬에서 positions 행만 float32로 읽음
+
+    memory-map은 행 하나를 읽어도 커널이 주변 페이지(대형 페이지 캐시 단위)까지 프로세스에
+    매핑하므로, 디스크에 있는 행렬은 파일에서 해당 행만 직접 읽는다.
+    """
+    if not isinstance(matrix, np.memmap) or not matrix.filename or not matrix.flags.c_contiguous:
+        return np.asarray(matrix[positions], dtype=np.float32)
+    row_bytes = matrix.shape[1] * matrix.dtype.itemsize
+    rows = np.empty((len(positions), matrix.shape[1]), dtype=matrix.dtype)
+    with open(matrix.filename, "rb") as f:
+        for i, pos in enumerate(positions):
+            f.seek(matrix.offset + int(pos) * row_bytes)
+            rows[i] = np.frombuffer(f.read(row_bytes), dtype=matrix.dtype)
+    return rows.astype(np.float32, copy=False)
+
+
+class LocalVectorStore(VectorStore):
+    """PineconeVectorStore와 같은 사용법의 로컬 벡터 스토어
+
+    점수는 Pinecone(cosine metric)과 같이 코사인 유사도를 반환한다.
+    """
+
+    def __init__(self, index, embedding, namespace=None, text_key="text"):
+        self._index = index
+        self._embedding = embedding
+        self._namespace = namespace
+        self._text_key = text_key
+
+    @property
+    def embeddings(self):
+        return self._embedding
+
+    def add_texts(self, texts, metadatas=None, ids=None, **kwargs):
+        texts = list(texts)
+        metadatas = metadatas or [{} for _ in texts]
+        ids = ids or [str(uuid.uuid4()) for _ in texts]
+        vectors = self._embedding.embed_documents(texts)
+        self._index.upsert(
+            [
+                {"id": i, "values": v, "metadata": {**m, self._text_key: t}}
+                for i, v, m, t in zip(ids, vectors, metadatas, texts)
+            ],
+            namespace=self._namespace
+        )
+        return ids
+
+    def _to_documents(self, result):
+        docs = []
+        for match in result["matches"]:
+            metadata = dict(match["metadata"])
+            text = metadata.pop(self._text_key, "")
+            docs.append((Document(page_content=text, metadata=metadata), match["score"]))
+        return docs
+
+    def similarity_search_by_vector_with_score(self, embedding, k=4, **kwargs):
+        result = self._index.query(embedding, top_k=k, namespace=self._namespace, include_metadata=True)
+        return self._to_documents(result)
+
+    def similarity_search_by_vectors_with_score(self, embeddings, k=4):
+        """여러 질의 벡터를 한 번에 검색 (질의별 (Document, score) 리스트)"""
+        results = self._index.query_many(embeddings, top_k=k, namespace=self._namespace)
+        return [self._to_documents(result) for result in results]
+
+    def similarity_search_with_score(self, query, k=4, **kwargs):
+        return self.similarity_search_by_vector_with_score(self._embedding.embed_query(query), k=k)
+
+    def similarity_search(self, query, k=4, **kwargs):
+        return [doc for doc, _ in self.similarity_search_with_score(query, k=k)]
+
+    @classmethod
+    def from_texts(cls, texts, embedding, metadatas=None, ids=None, index=None, namespace=None, **kwargs):
+        store = cls(index or LocalIndex(), embedding, namespace=namespace)
+        store.add_texts(texts, metadatas=metadatas, ids=ids)
+        return store
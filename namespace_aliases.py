@@ -0,0 +1,114 @@
+# namespace_aliases.py
+# 에이전트가 읽는 namespace 이름(industry, past_issue) → 실제 버전 namespace(industry__v7) 별칭 레지스트리
+#
+# namespace_aliases.json
+#   {"industry": {"current": "industry__v7", "history": ["industry", "industry__v6"]}}
+# 별칭이 없으면 이름 그대로 사용하므로 기존 namespace와 호환된다.
+
+import os
+import json
+import re
+import threading
+
+DEFAULT_ALIAS_PATH = "namespace_aliases.json"
+VERSION_SEPARATOR = "__v"
+
+
+def versioned_namespace(name, version):
+    return f"{name}{VERSION_SEPARATOR}{version}"
+
+
+def namespace_version(name, namespace):
+    """namespace가 name의 버전이면 버전 번호 (버전 없는 원래 이름은 0), 아니면 None"""
+    if namespace == name:
+        return 0
+    match = re.fullmatch(re.escape(name + VERSION_SEPARATOR) + r"(\d+)", namespace)
+    return int(match.group(1)) if match else None
+
+
+class NamespaceAliases:
+    """파일이 바뀌었을 때만 다시 읽으므로 상주 프로세스도 전환 즉시 새 namespace를 사용한다"""
+
+    def __init__(self, path=None):
+        self.path = path or os.getenv("NAMESPACE_ALIAS_PATH", DEFAULT_ALIAS_PATH)
+        self._lock = threading.Lock()
+        self._mtime = None
+        self._aliases = {}
+
+    def _load(self):
+        try:
+            mtime = os.stat(self.path).st_mtime_ns
+        except FileNotFoundError:
+            self._mtime, self._aliases = None, {}
+            return self._aliases
+        if mtime != self._mtime:
+            with open(self.path, "r", encoding="utf-8") as f:
+                self._aliases = json.load(f)
+            self._mtime = mtime
+        return self._aliases
+
+    def resolve(self, name):
+        """에이전트가 읽을 실제 namespace"""
+        with self._lock:
+            entry = self._load().get(name)
+        return entry["current"] if entry else name
+
+    def history(self, name):
+        """이전에 가리키던 namespace (오래된 순)"""
+        with self._lock:
+            entry = self._load().get(name)
+        return list(entry["history"]) if entry else []
+
+    def all(self):
+        with self._lock:
+            return json.loads(json.dumps(self._load()))
+
+    def switch(self, name, namespace):
+        """name이 namespace를 가리키도록 원자적으로 교체하고 이전 namespace 반환"""
+        with self._lock:
+            aliases = dict(self._load())
+            entry = aliases.get(name, {"current": name, "history": []})
+            previous = entry["current"]
+            history = [ns for ns in entry["history"] if ns != namespace]
+            if previous != namespace:
+                history.append(previous)
+            aliases[name] = {"current": namespace, "history": history}
+
+            # 임시 파일에 쓴 뒤 교체 (읽는 쪽은 항상 완전한 파일을 봄)
+            if os.path.dirname(self.path):
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            tmp_path = self.path + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(aliases, f, ensure_ascii=False, indent=2)
+            os.replace(tmp_path, self.path)
+            self._aliases, self._mtime = aliases, os.stat(self.path).st_mtime_ns
+        return previous
+
+    def forget(self, name, namespaces):
+        """삭제한 namespace를 history에서 제거"""
+        with self._lock:
+            aliases = dict(self._load())
+            entry = aliases.get(name)
+            if not entry:
+                return
+            entry["history"] = [ns for ns in entry["history"] if ns not in set(namespaces)]
+            tmp_path = self.path + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(aliases, f, ensure_ascii=False, indent=2)
+            os.replace(tmp_path, self.path)
+            self._aliases, self._mtime = aliases, os.stat(self.path).st_mtime_ns
+
+
+_aliases = None
+
+
+def get_aliases():
+    """프로세스에서 공유하는 별칭 레지스트리"""
+    global _aliases
+    if _aliases is None:
+        _aliases = NamespaceAliases()
+    return _aliases
+
+
+def resolve_namespace(name):
+    return get_aliases().resolve(name)
@@ -0,0 +1,688 @@
+# rag_engine.py
+# 04 에이전트(산업 / 과거 이슈)를 namespace 프로필로 묶어 한 번에 실행하는 분석 엔진
+
+import os
+import json
+from dataclasses import dataclass
+
+import pandas as pd
+from dotenv import load_dotenv
+from langchain_openai import ChatOpenAI
+from langchain_core.prompts import ChatPromptTemplate
+from langchain_core.output_parsers import StrOutputParser, JsonOutputParser
+from langchain_core.callbacks import BaseCallbackHandler
+
+from embedding_cache import get_embeddings
+from vector_stores import get_vector_store
+from retrieval import batch_search_by_vectors, batch_grouped_search_by_vectors
+from issue_scheduler import OrderedStream, RateLimiter, call_with_rate_limit, run_in_order
+from llm_cache import get_llm_cache
+from candidate_prefilter import CandidateShortlist
+from lexical_index import BM25Index, reciprocal_rank_fusion
+from snapshot_store import SnapshotStore
+from namespace_aliases import resolve_namespace
+from tracing import TracingCallbackHandler, get_tracer
+
+
+# ====== 프로필 정의 ======
+@dataclass
+class NamespaceProfile:
+    """namespace(지식 베이스) 하나를 분석하는 데 필요한 설정"""
+    name: str                     # 프로필 이름 (industry, past_issue, ...)
+    namespace: str                # 벡터 스토어 namespace
+    db_path: str                  # 후보 목록 CSV
+    load_catalogue: object        # df -> (이름→설명 dict, 이름 리스트, 사전 필터용 설명 리스트)
+    header_key: str               # 청크 본문에서 이름이 적힌 줄의 머리말
+    detail_key: str               # 청크 본문에서 설명이 시작되는 머리말
+    candidate_key: str            # AI Agent 1 JSON 출력의 이름 키
+    candidate_messages: list      # AI Agent 1 프롬프트
+    list_variable: str            # AI Agent 1 프롬프트의 후보 목록 변수명
+    analysis_messages: list       # 최종 분석 프롬프트
+    analysis_variable: str        # 최종 분석 프롬프트의 후보 변수명
+    description_label: str        # 최종 분석 프롬프트에 넣는 설명 라벨
+    description_chars: int        # 최종 분석 프롬프트에 넣는 설명 길이
+    progress_message: str
+    not_found_message: str
+
+
+def load_industry_catalogue(df):
+    industry_dict = dict(zip(df["KRX 업종명"], df["상세내용"]))
+    names = list(df["KRX 업종명"].unique())
+    # 업종별 설명(여러 행을 합침) → 사전 필터용
+    descriptions = df.groupby("KRX 업종명", sort=False)["상세내용"].apply(lambda s: "\n".join(s.astype(str)))
+    return industry_dict, names, [descriptions[name] for name in names]
+
+
+def load_past_issue_catalogue(df):
+    issue_dict = dict(zip(df["Issue_name"], df["Contents"] + "\n\n상세: " + df["Contentes(Spec)"]))
+    names = list(df["Issue_name"].unique())
+    return issue_dict, names, [issue_dict[name] for name in names]
+
+
+INDUSTRY_PROFILE = NamespaceProfile(
+    name="industry",
+    namespace="industry",
+    db_path="data/산업DB.v.0.3.csv",
+    load_catalogue=load_industry_catalogue,
+    header_key="KRX 업종명:",
+    detail_key="상세내용:",
+    candidate_key="industry",
+    candidate_messages=[
+        ("system", """너는 뉴스와 산업의 관련성을 판단하는 전문 애널리스트야.
+주어진 뉴스 내용을 분석하고, 제공된 KRX 업종 리스트에서 관련 가능성이 높은 산업들을 선별해야 해.
+
+관련성 판단 기준:
+1. 직접적 영향: 뉴스가 해당 산업에 직접적인 영향을 미치는가?
+2. 공급망 관계: 뉴스 관련 기업/산업과 공급망 관계가 있는가?
+3. 시장 동향: 뉴스가 해당 산업의 시장 동향에 영향을 미치는가?
+4. 정책/규제: 뉴스가 해당 산업 관련 정책이나 규제와 연관되는가?"""),
+        ("human", """
+[뉴스 내용]
+{news}
+
+[KRX 업종 리스트]
+{industries}
+
+위 뉴스와 관련 가능성이 높은 산업을 {top_k}개 선별해주세요.
+각 산업에 대해 관련성 점수(1-10점)와 간단한 이유를 제시해주세요.
+
+출력 형식 (JSON):
+{{
+  "candidates": [
+    {{"industry": "산업명", "score": 점수, "reason": "관련성 이유"}},
+    ...
+  ]
+}}""")
+    ],
+    list_variable="industries",
+    analysis_messages=[
+        ("system", "너는 산업 뉴스 분석 전문가야. 정확하고 신뢰성 있는 분석을 제공해야 해."),
+        ("human", """
+[이슈 내용]
+{news}
+
+[선별된 관련 산업]
+{industries}
+
+위 정보를 바탕으로 다음 형식으로 분석해주세요:
+
+**이슈 요약**
+(핵심 내용 1-2문장)
+
+**관련 산업 분석**
+- **산업명1** (신뢰도: X점): 관련성 설명
+- **산업명2** (신뢰도: X점): 관련성 설명
+- **산업명3** (신뢰도: X점): 관련성 설명
+
+**분석 신뢰도**: 전체적인 분석의 신뢰도를 평가해주세요.
+""")
+    ],
+    analysis_variable="industries",
+    description_label="산업 설명",
+    description_chars=100,
+    progress_message="🤖 AI Agent가 관련 산업을 분석 중...",
+    not_found_message="❌ 관련 산업을 찾을 수 없습니다.",
+)
+
+PAST_ISSUE_PROFILE = NamespaceProfile(
+    name="past_issue",
+    namespace="past_issue",
+    db_path="data/Past_news.csv",
+    load_catalogue=load_past_issue_catalogue,
+    header_key="Issue_name:",
+    detail_key="Contents:",
+    candidate_key="issue",
+    candidate_messages=[
+        ("system", """너는 현재 뉴스와 과거 이슈의 관련성을 판단하는 전문 애널리스트야.
+주어진 현재 뉴스 내용을 분석하고, 제공된 과거 이슈 리스트에서 관련 가능성이 높은 이슈들을 선별해야 해.
+
+관련성 판단 기준:
+1. 유사한 시장 상황: 과거 이슈와 현재 상황이 유사한 시장 환경인가?
+2. 동일한 산업/기업 영향: 같은 산업이나 유사한 기업들에 영향을 미치는가?
+3. 정책/경제적 유사성: 정책 변화나 경제적 요인이 유사한가?
+4. 투자자 심리: 투자자들의 반응이나 시장 심리가 비슷한가?"""),
+        ("human", """
+[현재 뉴스 내용]
+{news}
+
+[과거 이슈 리스트]
+{issues}
+
+위 현재 뉴스와 관련 가능성이 높은 과거 이슈를 {top_k}개 선별해주세요.
+각 과거 이슈에 대해 관련성 점수(1-10점)와 간단한 이유를 제시해주세요.
+
+출력 형식 (JSON):
+{{
+  "candidates": [
+    {{"issue": "이슈명", "score": 점수, "reason": "관련성 이유"}},
+    ...
+  ]
+}}""")
+    ],
+    list_variable="issues",
+    analysis_messages=[
+        ("system", "너는 과거 이슈와 현재 뉴스의 연관성을 분석하는 전문가야. 정확하고 신뢰성 있는 분석을 제공해야 해."),
+        ("human", """
+[현재 이슈 내용]
+{news}
+
+[선별된 관련 과거 이슈]
+{past_issues}
+
+위 정보를 바탕으로 다음 형식으로 분석해주세요:
+
+**현재 이슈 요약**
+(핵심 내용 1-2문장)
+
+**관련 과거 이슈 분석**
+- **과거이슈1** (신뢰도: X점): 현재 상황과의 유사점과 차이점 설명
+- **과거이슈2** (신뢰도: X점): 현재 상황과의 유사점과 차이점 설명
+- **과거이슈3** (신뢰도: X점): 현재 상황과의 유사점과 차이점 설명
+
+**시사점**: 과거 사례를 통해 예상되는 시장 반응이나 투자 전략
+""")
+    ],
+    analysis_variable="past_issues",
+    description_label="과거 이슈 내용",
+    description_chars=200,
+    progress_message="🤖 AI Agent가 관련 과거 이슈를 분석 중...",
+    not_found_message="❌ 관련 과거 이슈를 찾을 수 없습니다.",
+)
+
+# 새 지식 베이스는 프로필을 하나 더 정의해서 여기에 등록하면 된다
+PROFILES = {
+    INDUSTRY_PROFILE.name: INDUSTRY_PROFILE,
+    PAST_ISSUE_PROFILE.name: PAST_ISSUE_PROFILE,
+}
+
+
+# ====== 뉴스 스냅샷 ======
+def get_latest_current_issues_file(store=None):
+    """최신 current_issues JSON 파일 경로 (data2/manifest.json에서 조회)"""
+    latest_file = (store or SnapshotStore()).latest()
+    print(f"📂 자동 선택된 파일: {latest_file}")
+    return latest_file
+
+
+def load_issues(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)["issues"]
+
+
+def _retrieval_label(candidate, separator=", "):
+    """하이브리드 검색이면 종합 점수에 실제로 쓰인 RRF 검색 점수 표시 (벡터 유사도 대신 이 값이 반영됨)"""
+    if "retrieval_score" not in candidate:
+        return ""
+    return f"RRF 검색점수 {candidate['retrieval_score']}/10{separator}"
+
+
+# ====== AI Agent 2: 벡터 검색 결과와 AI 후보 결합 ======
+def combine_and_validate_results(news_content, vector_candidates, ai_candidates, entity_dict, candidate_key,
+                                 lexical_candidates=None, use_ai=True, rrf_k=60):
+    """벡터 검색 결과와 AI 후보를 결합하여 최종 관련 후보 도출
+
+    lexical_candidates(키워드 검색 결과)가 주어지면 벡터 순위와 키워드 순위를
+    RRF로 결합한 점수를 검색 점수로 사용한다. use_ai=False이면 AI 점수 없이
+    검색 점수만으로 순위를 정한다.
+    """
+
+    # 벡터 후보와 AI 후보 결합
+    all_candidates = {}
+
+    # 벡터 검색 결과 추가
+    for candidate in vector_candidates:
+        name = candidate["name"]
+        all_candidates[name] = {
+            "name": name,
+            "vector_similarity": candidate["similarity"],
+            "ai_score": 0,
+            "ai_reason": "",
+            "description": candidate["description"]
+        }
+
+    # 키워드 검색 결과 추가
+    for candidate in lexical_candidates or []:
+        name = candidate["name"]
+        if name not in all_candidates and name in entity_dict:
+            all_candidates[name] = {
+                "name": name,
+                "vector_similarity": 0,
+                "ai_score": 0,
+                "ai_reason": "",
+                "description": entity_dict[name]
+            }
+        if name in all_candidates:
+            all_candidates[name]["lexical_score"] = candidate["score"]
+
+    # AI 후보 추가/업데이트
+    for candidate in ai_candidates:
+        name = candidate[candidate_key]
+        if name in all_candidates:
+            all_candidates[name]["ai_score"] = candidate["score"]
+            all_candidates[name]["ai_reason"] = candidate["reason"]
+        elif name in entity_dict:  # 유효한 이름인 경우만
+            all_candidates[name] = {
+                "name": name,
+                "vector_similarity": 0,
+                "ai_score": candidate["score"],
+                "ai_reason": candidate["reason"],
+                "description": entity_dict[name]
+            }
+
+    # 하이브리드 검색 점수: 벡터 순위 + 키워드 순위 RRF (양쪽 모두 1위일 때 10점)
+    if lexical_candidates is not None:
+        rankings = [[c["name"] for c in vector_candidates], [c["name"] for c in lexical_candidates]]
+        fused = reciprocal_rank_fusion(rankings, k=rrf_k)
+        max_fused = len(rankings) / (rrf_k + 1)
+        for name, candidate in all_candidates.items():
+            candidate["retrieval_score"] = round(fused.get(name, 0) / max_fused * 10, 1)
+
+    # 종합 점수 계산 (검색 점수 + AI 점수)
+    for candidate in all_candidates.values():
+        # 벡터 유사도(%)를 10점 만점으로 정규화 (하이브리드 검색이면 RRF 점수 사용)
+        retrieval_score = candidate.get("retrieval_score", candidate["vector_similarity"] / 10)
+        # AI 점수는 이미 10점 만점
+        ai_score = candidate["ai_score"]
+
+        if use_ai:
+            # 가중평균 (AI 점수에 더 높은 가중치)
+            candidate["final_score"] = round((retrieval_score * 0.3 + ai_score * 0.7), 1)
+        else:
+            candidate["final_score"] = round(retrieval_score, 1)
+
+    # 최종 점수로 정렬
+    sorted_candidates = sorted(all_candidates.values(),
+                              key=lambda x: x["final_score"],
+                              reverse=True)
+
+    return sorted_candidates[:3]  # 상위 3개만 반환
+
+
+# ====== 분석 엔진 ======
+class TokenForwarder(BaseCallbackHandler):
+    """스트리밍 LLM이 토큰을 받을 때마다 on_token(토큰) 호출"""
+
+    def __init__(self, on_token):
+        self.on_token = on_token
+        self.streamed = False
+
+    def on_llm_new_token(self, token, **kwargs):
+        if token:
+            self.streamed = True
+            self.on_token(token)
+
+
+class NamespaceAgent:
+    """프로필 하나에 대한 벡터 스토어, 후보 목록, 체인을 보관"""
+
+    def __init__(self, profile, embedding, llm, index_name, analysis_llm=None):
+        self.profile = profile
+        self._embedding = embedding
+        self._index_name = index_name
+        self._namespace = None
+        self._vector_store = None
+
+        df = pd.read_csv(profile.db_path)
+        self.entity_dict, self.names, descriptions = profile.load_catalogue(df)
+        self.shortlist = CandidateShortlist(self.names, descriptions, embedding)
+        self.lexical_index = BM25Index.from_catalogue(self.names, descriptions)
+
+        # 체인은 한 번만 만들어 모든 이슈에서 재사용
+        self.candidate_chain = ChatPromptTemplate.from_messages(profile.candidate_messages) | llm | JsonOutputParser()
+        self.analysis_chain = ChatPromptTemplate.from_messages(profile.analysis_messages) | (analysis_llm or llm) | StrOutputParser()
+
+    @property
+    def vector_store(self):
+        """별칭이 가리키는 namespace의 벡터 스토어 (관리 도구가 별칭을 바꾸면 다음 검색부터 새 namespace 사용)"""
+        namespace = resolve_namespace(self.profile.namespace)
+        if namespace != self._namespace:
+            self._vector_store = get_vector_store(namespace, self._embedding, self._index_name)
+            self._namespace = namespace
+        return self._vector_store
+
+
+class RAGEngine:
+    """여러 namespace 프로필을 공유 파이프라인으로 분석
+
+    - 이슈 임베딩은 한 번만 계산하여 모든 namespace 검색에 재사용
+    - 임베딩/LLM/캐시/레이트 리미터는 프로필 사이에 공유
+    """
+
+    def __init__(self, profile_names=("industry", "past_issue")):
+        self.embedding = get_embeddings(model=os.getenv("OPENAI_EMBEDDING_MODEL", "text-embedding-3-small"))
+        self.index_name = os.getenv("PINECONE_INDEX_NAME", "lastproject")
+        self.llm_cache = get_llm_cache()
+        self.tracer = get_tracer()
+        # 체인별 토큰 사용량은 콜백이 현재 span(llm.candidates / llm.analysis)에 기록
+        self.llm = ChatOpenAI(model="gpt-4o", temperature=0, cache=self.llm_cache,
+                              callbacks=[TracingCallbackHandler()])
+        # 최종 분석은 스트리밍으로 요청하여 토큰이 도착하는 대로 출력 (캐시 적중 시에는 전체 응답을 한 번에)
+        # ANALYSIS_STREAM=off이면 기존처럼 응답이 끝난 뒤 한 번에 출력
+        self.stream_analysis = os.getenv("ANALYSIS_STREAM", "on") != "off"
+        self.analysis_llm = ChatOpenAI(model="gpt-4o", temperature=0, cache=self.llm_cache,
+                                       callbacks=[TracingCallbackHandler()],
+                                       streaming=True, stream_usage=True) if self.stream_analysis else self.llm
+        self.llm_limiter = RateLimiter(int(os.getenv("LLM_REQUESTS_PER_MINUTE", "0")))
+        self.issue_concurrency = int(os.getenv("ISSUE_CONCURRENCY", "4"))
+        self.shortlist_n = int(os.getenv("CANDIDATE_SHORTLIST_N", "30"))
+        self.search_k = 10
+        # grouped: 서로 다른 업종/이슈 k개를 보장 (청크 점수 집계: max / sum), chunk: 청크 k개
+        self.retrieval_mode = os.getenv("RETRIEVAL_MODE", "grouped")
+        self.group_agg = os.getenv("GROUP_AGG", "max")
+        # LEXICAL_SEARCH=on: 키워드(문자 n-gram BM25) 검색을 벡터 검색과 RRF로 결합 (기본 off — 벡터 유사도 그대로 사용)
+        self.lexical_search = os.getenv("LEXICAL_SEARCH", "off") == "on"
+        # off이면 AI Agent 1(후보 선별 LLM 호출)을 건너뛰고 하이브리드 검색 점수만 사용
+        self.candidate_llm = os.getenv("CANDIDATE_LLM", "on") != "off"
+
+        self.agents = {
+            name: NamespaceAgent(PROFILES[name], self.embedding, self.llm, self.index_name, self.analysis_llm)
+            for name in profile_names
+        }
+
+    # ---- Step 0: 임베딩 1회 + namespace별 검색 ----
+    def retrieve(self, queries):
+        """질의를 한 번 임베딩하고 모든 namespace에서 검색
+
+        Returns:
+            (질의 벡터 리스트, {프로필 이름: 질의별 (Document, score) 리스트})
+        """
+        with self.tracer.span("retrieve.embed", batch_size=len(queries)):
+            vectors = self.embedding.embed_documents(list(queries))
+        results = {}
+        for name, agent in self.agents.items():
+            with self.tracer.span("retrieve.search", profile=name, batch_size=len(vectors)):
+                if self.retrieval_mode == "grouped":
+                    results[name] = batch_grouped_search_by_vectors(
+                        agent.vector_store, vectors, k=self.search_k,
+                        key_fn=lambda doc, profile=agent.profile: self.doc_entities(profile, doc),
+                        agg=self.group_agg
+                    )
+                else:
+                    results[name] = batch_search_by_vectors(agent.vector_store, vectors, k=self.search_k)
+        return vectors, results
+
+    # ---- Step 1: 벡터 검색 결과에서 후보 추출 ----
+    def doc_entities(self, profile, doc):
+        """청크의 엔티티 이름 목록
+
+        - group_key: 엔티티 단위 검색에서 이 청크가 묶인 엔티티
+        - entities: 근사 중복 제거로 여러 행이 공유하는 청크의 모든 엔티티
+        - entity: 적재 시 저장한 행의 엔티티 (없으면 본문 머리말 줄에서 추출)
+        """
+        metadata = doc.metadata
+        if metadata.get("group_key"):
+            return [metadata["group_key"]]
+        if metadata.get("entities"):
+            return list(metadata["entities"])
+        name = metadata.get("entity")
+        if name:
+            return [name]
+        for line in doc.page_content.replace('\ufeff', '').split("\n"):
+            if profile.header_key in line:
+                return [line.replace(profile.header_key, "").strip()]
+        return []
+
+    def extract_vector_candidates(self, agent, results):
+        """검색 결과를 이름 기준으로 중복 제거하여 후보 리스트로 변환 (점수 순서 유지)"""
+        profile = agent.profile
+        vector_candidates = []
+        seen = set()
+        for doc, score in results:
+            content = doc.page_content.replace('\ufeff', '')
+            content_parts = content.split(profile.detail_key, 1)
+            for name in self.doc_entities(profile, doc):
+                if not name or name not in agent.entity_dict or name in seen:
+                    continue
+                seen.add(name)
+
+                detail = content_parts[1].strip() if len(content_parts) > 1 else agent.entity_dict[name]
+
+                vector_candidates.append({
+                    "name": name,
+                    # 검색 점수는 코사인 유사도(높을수록 관련) — 엔티티 묶기 순위와 같은 방향
+                    "similarity": round(score * 100, 1),
+                    "description": detail
+                })
+        return vector_candidates
+
+    def extract_lexical_candidates(self, agent, query):
+        """키워드 역색인 검색 결과를 후보 리스트로 변환"""
+        return [
+            {"name": name, "score": round(score, 2)}
+            for name, score in agent.lexical_index.search(query, k=self.search_k)
+        ]
+
+    # ---- Step 2: AI Agent 1 ----
+    def extract_candidates(self, agent, news_content, names, top_k=10):
+        """AI Agent가 뉴스 내용을 보고 관련 가능성이 높은 후보들을 추출"""
+        with self.tracer.span("llm.candidates", profile=agent.profile.name, list_size=len(names)):
+            result = call_with_rate_limit(lambda: agent.candidate_chain.invoke({
+                "news": news_content,
+                agent.profile.list_variable: ", ".join(names),
+                "top_k": top_k
+            }), self.llm_limiter)
+        return result["candidates"]
+
+    # ---- 이슈 하나 × 프로필 하나 분석 ----
+    def analyze_issue(self, profile_name, idx, issue, query, query_vector, results, total, on_text=None):
+        """이슈 하나를 프로필 하나로 분석하여 결과 dict 반환 (text: 출력용 텍스트)
+
+        on_text(텍스트 조각, part)를 주면 출력용 텍스트를 만들어지는 대로 전달한다.
+        (part: "analysis"는 최종 분석 LLM 토큰, "text"는 그 밖의 머리말/점수 줄,
+        조각을 이어 붙이면 result["text"]와 같다)
+        """
+        on_text = on_text or (lambda text, part: None)
+        agent = self.agents[profile_name]
+        profile = agent.profile
+        out = []
+        out.append(f"\n{'='*80}")
+        out.append(f"📰 이슈 {idx+1}/{total}: {issue['제목']}")
+        out.append(f"{'='*80}")
+
+        vector_candidates = self.extract_vector_candidates(agent, results)
+        lexical_candidates = None
+        if self.lexical_search:
+            with self.tracer.span("candidates.lexical", profile=profile_name):
+                lexical_candidates = self.extract_lexical_candidates(agent, query)
+
+        out.append(profile.progress_message)
+        ai_candidates = []
+        if self.candidate_llm:
+            # 전체 목록 대신 사전 필터로 추린 상위 N개만 프롬프트에 포함
+            with self.tracer.span("candidates.shortlist", profile=profile_name):
+                shortlisted_names = agent.shortlist.shortlist(
+                    query, self.shortlist_n, query_vector=query_vector,
+                    always_include=[c["name"] for c in vector_candidates + (lexical_candidates or [])]
+                )
+            ai_candidates = self.extract_candidates(agent, query, shortlisted_names, top_k=10)
+
+        # Step 3: 결과 결합 및 검증
+        with self.tracer.span("combine", profile=profile_name):
+            final_candidates = combine_and_validate_results(
+                query, vector_candidates, ai_candidates, agent.entity_dict, profile.candidate_key,
+                lexical_candidates=lexical_candidates, use_ai=self.candidate_llm
+            )
+        result = {
+            "profile": profile_name,
+            "issue_index": idx,
+            "title": issue["제목"],
+            "candidates": final_candidates,
+            "analysis": None,
+        }
+
+        if not final_candidates:
+            out.append(profile.not_found_message)
+            result["text"] = "\n".join(out)
+            on_text(result["text"], "text")
+            return result
+
+        # Step 4: 최종 분석 결과 생성
+        candidates_text = "\n".join([
+            f"- {c['name']} (종합점수: {c['final_score']}/10, 벡터유사도: {c['vector_similarity']}%, "
+            f"키워드점수: {c.get('lexical_score', 0)}, {_retrieval_label(c)}AI점수: {c['ai_score']}/10)\n"
+            f"  AI 판단 근거: {c['ai_reason']}\n"
+            f"  {profile.description_label}: {c['description'][:profile.description_chars]}..."
+            for c in final_candidates
+        ])
+        on_text("\n".join(out) + "\n", "text")
+        forwarder = TokenForwarder(lambda token: on_text(token, "analysis"))
+        with self.tracer.span("llm.analysis", profile=profile_name):
+            response = call_with_rate_limit(lambda: agent.analysis_chain.invoke({
+                "news": query,
+                profile.analysis_variable: candidates_text
+            }, config={"callbacks": [forwarder]}), self.llm_limiter)
+        if not forwarder.streamed:
+            # 캐시 적중 또는 스트리밍을 끈 경우
+            on_text(response, "analysis")
+        result["analysis"] = response
+        details_start = len(out)
+        out.append(response)
+
+        # 디버깅 정보
+        out.append(f"\n📊 상세 점수:")
+        for i, c in enumerate(final_candidates, 1):
+            out.append(f"{i}. {c['name']}: 종합{c['final_score']}/10 (벡터 유사도 {c['vector_similarity']}% "
+                       f"+ 키워드 점수 {c.get('lexical_score', 0)} + {_retrieval_label(c, ' + ')}"
+                       f"AI 분석 점수 {c['ai_score']}/10)")
+
+        if idx < total - 1:
+            out.append(f"\n{'-'*80}")
+
+        result["text"] = "\n".join(out)
+        on_text("\n" + "\n".join(out[details_start + 1:]), "text")
+        return result
+
+    # ---- 스냅샷 전체 분석 ----
+    def analyze_issues(self, issues, profile_names=None, on_result=None, on_text=None, on_error=None):
+        """이슈 리스트를 지정한 프로필들로 분석하고 (이슈, 프로필) 순서대로 결과 반환
+
+        Args:
+            issues: {"제목", "내용", ...} dict 리스트
+            profile_names: 분석할 프로필 (기본: 엔진에 로드된 전체)
+            on_result: 결과가 순서대로 준비될 때마다 호출할 함수
+            on_text: on_text(이슈 index, 프로필, 텍스트 조각, part) — 출력 텍스트를 만들어지는 대로
+                (이슈, 프로필) 순서로 전달. 결과마다 result["text"] 뒤에 줄바꿈 조각("text")이 붙는다.
+                실패한 작업은 오류 메시지 조각(part "error")으로 같은 순서에 전달된다.
+            on_error: 실패한 (이슈, 프로필)마다 실패 dict를 받아 호출할 함수 (결과와 같은 순서)
+
+        Returns:
+            (결과 리스트, 실패 리스트) — 실패: {"profile", "issue_index", "title", "error"}
+            실패가 있으면 호출 측은 해당 스냅샷을 처리 완료로 기록하지 않아야 한다.
+        """
+        profile_names = list(profile_names or self.agents)
+        queries = [f"{issue['제목']}\n{issue['내용']}" for issue in issues]
+        vectors, search_results = self.retrieve(queries)
+
+        total = len(issues)
+        tasks = [(idx, name) for idx in range(total) for name in profile_names]
+
+        stream = OrderedStream(lambda task_no, text, part: on_text(*tasks[task_no], text, part)) if on_text else None
+
+        def worker(task_no, task):
+            idx, name = task
+            if not stream:
+                return self.analyze_issue(name, idx, issues[idx], queries[idx], vectors[idx],
+                                          search_results[name][idx], total)
+            try:
+                result = self.analyze_issue(name, idx, issues[idx], queries[idx], vectors[idx],
+                                            search_results[name][idx], total,
+                                            on_text=lambda text, part: stream.write(task_no, text, part))
+                stream.write(task_no, "\n", "text")
+                return result
+            except Exception as e:
+                # 오류 메시지도 순서 스트림으로 보내 다른 작업의 토큰 사이에 끼지 않게 함
+                stream.write(task_no, f"❌ 이슈 {idx+1} ({name}) 분석 중 오류 발생: {e}\n", "error")
+                raise
+            finally:
+                stream.finish(task_no)
+
+        results, failures = [], []
+        for task_no, result in run_in_order(tasks, worker, max_workers=self.issue_concurrency):
+            if isinstance(result, Exception):
+                idx, name = tasks[task_no]
+                if not stream:
+                    print(f"❌ 이슈 {idx+1} ({name}) 분석 중 오류 발생: {result}")
+                failure = {"profile": name, "issue_index": idx, "title": issues[idx]["제목"], "error": str(result)}
+                failures.append(failure)
+                if on_error:
+                    on_error(failure)
+                continue
+            results.append(result)
+            if on_result:
+                on_result(result)
+        return results, failures
+
+    def print_stats(self):
+        if self.llm_cache:
+            self.llm_cache.print_stats()
+
+
+def profile_consumer(profile_names):
+    """스냅샷 매니페스트에 분석 완료 스냅샷을 기록할 이름 (프로필 조합별)"""
+    return "rag:" + ",".join(profile_names)
+
+
+def select_issues(store, path, consumer, scope="delta"):
+    """분석할 이슈 선택
+
+    delta: consumer가 마지막으로 분석한 스냅샷 이후 새로 나오거나 바뀐 이슈만
+    all: 스냅샷 전체
+    """
+    if scope != "delta":
+        return load_issues(path)
+    checkpoint = store.get_checkpoint(consumer)
+    issues = store.changed_since(checkpoint, path)
+    print(f"🔎 이전 분석 이후 새 이슈/변경된 이슈: {len(issues)}개")
+    if not issues and checkpoint:
+        print(f"ℹ️ '{checkpoint}'까지 이미 분석한 이슈뿐이라 분석할 이슈가 없습니다 "
+              f"(전체를 다시 분석하려면 ANALYZE_SCOPE=all)")
+    return issues
+
+
+def analyze_and_print(engine, issues):
+    """이슈를 분석하면서 결과를 표준 출력에 출력 (스트리밍이면 분석 토큰을 도착하는 대로, 이슈/프로필 순서 유지)
+
+    Returns:
+        analyze_issues와 같은 (결과 리스트, 실패 리스트)
+    """
+    if engine.stream_analysis:
+        return engine.analyze_issues(issues, on_text=lambda idx, name, text, part: print(text, end="", flush=True))
+    return engine.analyze_issues(issues, on_result=lambda result: print(result["text"]))
+
+
+def run_cli(profile_names):
+    """최신 스냅샷을 지정한 프로필로 분석하여 결과를 출력 (04 스크립트 진입점)"""
+    load_dotenv(override=True)
+    store = SnapshotStore()
+
+    try:
+        news_json_path = get_latest_current_issues_file(store)
+    except FileNotFoundError as e:
+        print(f"❌ 오류: {e}")
+        print("data2/ 폴더에 *_BigKinds_current_issues.json 파일이 있는지 확인해주세요.")
+        exit(1)
+
+    # 04는 기본으로 최신 스냅샷 전체를 분석 (프롬프트를 고쳐 다시 실행하는 경우)
+    # ANALYZE_SCOPE=delta 이면 이전 분석 이후 새 이슈/변경된 이슈만 (05/06 상주 모드의 기본)
+    consumer = profile_consumer(profile_names)
+    issues = select_issues(store, news_json_path, consumer, os.getenv("ANALYZE_SCOPE", "all"))
+
+    failures = []
+    if issues:
+        engine = RAGEngine(profile_names)
+        _, failures = analyze_and_print(engine, issues)
+        engine.print_stats()
+
+    if failures:
+        # 체크포인트를 옮기지 않으므로 다음 delta 실행에서 이 스냅샷을 다시 분석
+        print(f"\n⚠️ {len(failures)}개 (이슈, 프로필) 분석 실패 — 분석 완료 기록을 남기지 않습니다")
+        exit(1)
+    store.set_checkpoint(consumer, news_json_path)
+
+    print(f"\n🎉 총 {len(issues)}개 이슈 분석 완료!")
+
+
+if __name__ == "__main__":
+    # 예: RAG_PROFILES=industry,past_issue python rag_engine.py
+    load_dotenv(override=True)
+    run_cli([name.strip() for name in os.getenv("RAG_PROFILES", "industry,past_issue").split(",")])
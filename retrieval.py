@@ -0,0 +1,92 @@
+# retrieval.py
+# 04 에이전트가 함께 쓰는 검색 유틸리티
+
+from concurrent.futures import ThreadPoolExecutor
+
+from langchain_core.documents import Document
+
+
+def batch_similarity_search(vector_store, queries, k=10, max_workers=8):
+    """여러 질의를 한 번에 임베딩하고 검색하여 질의별 (Document, score) 리스트 반환
+
+    - 임베딩: 모든 질의를 embed_documents 한 번으로 요청
+    - 검색: 로컬 백엔드는 행렬 곱 한 번, Pinecone은 질의들을 동시에 요청
+    """
+    if not queries:
+        return []
+    vectors = vector_store.embeddings.embed_documents(list(queries))
+    return batch_search_by_vectors(vector_store, vectors, k=k, max_workers=max_workers)
+
+
+def batch_search_by_vectors(vector_store, vectors, k=10, max_workers=8):
+    """이미 계산된 질의 벡터들로 검색 (여러 namespace에서 같은 벡터를 재사용할 때)"""
+    if not vectors:
+        return []
+    if hasattr(vector_store, "similarity_search_by_vectors_with_score"):
+        return vector_store.similarity_search_by_vectors_with_score(vectors, k=k)
+
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(vectors))) as executor:
+        return list(executor.map(
+            lambda vector: vector_store.similarity_search_by_vector_with_score(vector, k=k),
+            vectors
+        ))
+
+
+def collapse_by_entity(results, key_fn, agg="max"):
+    """청크 단위 검색 결과를 엔티티(업종명/이슈명) 단위로 묶기
+
+    - 순위는 엔티티별 청크 점수의 max 또는 sum으로 정함
+    - 반환 점수는 가장 높은 청크의 유사도 (기존 유사도 표시 방식과 호환)
+    - key_fn이 리스트를 반환하면(여러 행이 공유하는 중복 제거 청크) 각 엔티티에 모두 반영하고,
+      반환 Document의 metadata["group_key"]에 어느 엔티티로 묶였는지 기록
+
+    Returns:
+        [(대표 청크 Document, 대표 청크 점수)] — 집계 점수 내림차순
+    """
+    groups = {}
+    for doc, score in results:
+        keys = key_fn(doc)
+        shared = isinstance(keys, (list, tuple))
+        for key in (keys if shared else [keys]):
+            if key is None:
+                continue
+            if shared and len(keys) > 1:
+                doc_for_key = Document(page_content=doc.page_content, id=doc.id,
+                                       metadata={**doc.metadata, "group_key": key})
+            else:
+                doc_for_key = doc
+            if key not in groups:
+                groups[key] = [doc_for_key, score, score]
+                continue
+            group = groups[key]
+            group[2] = group[2] + score if agg == "sum" else max(group[2], score)
+            if score > group[1]:
+                group[0], group[1] = doc_for_key, score
+    ranked = sorted(groups.values(), key=lambda g: g[2], reverse=True)
+    return [(doc, best) for doc, best, _ in ranked]
+
+
+def batch_grouped_search_by_vectors(vector_store, vectors, k, key_fn, agg="max",
+                                    fetch_factor=3, max_fetch=200, max_workers=8):
+    """질의마다 서로 다른 엔티티 k개가 모일 때까지 검색 범위를 늘려가며 검색
+
+    처음에는 k * fetch_factor개 청크를 가져오고, 엔티티가 k개보다 적으면
+    아직 부족한 질의만 검색 수를 두 배로 늘려 다시 가져온다.
+    (더 가져올 청크가 없거나 max_fetch에 도달하면 멈춤)
+    """
+    grouped = [None] * len(vectors)
+    pending = list(range(len(vectors)))
+    fetch = min(k * fetch_factor, max_fetch)
+
+    while pending:
+        results = batch_search_by_vectors(vector_store, [vectors[i] for i in pending],
+                                          k=fetch, max_workers=max_workers)
+        still_pending = []
+        for i, chunk_results in zip(pending, results):
+            grouped[i] = collapse_by_entity(chunk_results, key_fn, agg)[:k]
+            exhausted = len(chunk_results) < fetch or fetch >= max_fetch
+            if len(grouped[i]) < k and not exhausted:
+                still_pending.append(i)
+        pending = still_pending
+        fetch = min(fetch * 2, max_fetch)
+    return grouped
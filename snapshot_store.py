@@ -0,0 +1,236 @@
+# snapshot_store.py
+# data2/ 뉴스 스냅샷의 매니페스트 (이슈 내용 해시 기반 중복 제거 + 최신 스냅샷 즉시 조회)
+#
+# data2/manifest.json  (data2/ 스냅샷 파일로 언제든 다시 만들 수 있는 색인)
+#   latest:      가장 최근 crawled_at 스냅샷 파일명
+#   snapshots:   [{file, crawled_at, issues: [이슈 해시, ...]}]  (crawled_at 오름차순)
+#   issues:      {이슈 해시: {file, index}}  — 해당 내용이 처음 등장한 스냅샷 위치
+#
+# data2/checkpoints/<소비자>.json
+#   소비자(03-2, 04, 05, 06)마다 마지막으로 처리한 스냅샷 파일명을 별도 파일에 기록
+#   (여러 프로세스가 매니페스트를 동시에 고쳐도 서로의 체크포인트를 덮어쓰지 않음)
+
+import os
+import re
+import json
+import glob
+import hashlib
+import threading
+
+SNAPSHOT_PATTERN = "*_BigKinds_current_issues.json"
+
+
+def issue_hash(issue):
+    """이슈 제목+내용 해시 (같은 내용이면 스냅샷이 달라도 같은 값)"""
+    text = f"{issue['제목'].strip()}\n{issue['내용'].strip()}"
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()[:16]
+
+
+class SnapshotStore:
+    """스냅샷 매니페스트 + 소비자별 체크포인트
+
+    매니페스트는 파일이 바뀌면 다시 읽고, data2/ 폴더의 mtime이 바뀌었을 때만
+    폴더를 다시 훑어 새 스냅샷은 추가하고 지워진 스냅샷은 뺀다. 바뀐 것이 없으면
+    조회는 stat 두 번과 메모리의 파일명 → 항목 dict만 사용한다.
+    다른 프로세스와 동시에 써서 색인 일부가 빠지더라도 다음 조회에서 다시 채워진다.
+    """
+
+    def __init__(self, root="data2", manifest_name="manifest.json"):
+        self.root = root
+        self.manifest_path = os.path.join(root, manifest_name)
+        self.checkpoint_dir = os.path.join(root, "checkpoints")
+        self._lock = threading.Lock()
+        self._manifest = None
+        self._manifest_stat = None
+        self._entries = {}        # 스냅샷 파일명 -> 매니페스트 snapshots 항목
+        self._dir_mtime = None    # 마지막으로 data2/를 훑었을 때의 폴더 mtime
+
+    # ---- 매니페스트 읽기/쓰기 ----
+    def _load_manifest(self):
+        """디스크의 매니페스트가 마지막으로 읽은 뒤 바뀌었으면 다시 읽음"""
+        try:
+            stat = os.stat(self.manifest_path)
+            stat = (stat.st_mtime_ns, stat.st_size)
+        except FileNotFoundError:
+            stat = None
+        if self._manifest is None or stat != self._manifest_stat:
+            manifest = None
+            if stat is not None:
+                try:
+                    with open(self.manifest_path, "r", encoding="utf-8") as f:
+                        manifest = json.load(f)
+                except ValueError:
+                    manifest = None    # 손상된 색인은 data2/에서 다시 만든다
+            self._manifest = manifest or {"latest": None, "snapshots": [], "issues": {}}
+            self._manifest_stat = stat
+            self._entries = {entry["file"]: entry for entry in self._manifest["snapshots"]}
+            self._dir_mtime = None    # 다른 프로세스가 쓴 색인이면 폴더와 다시 맞춤
+        return self._manifest
+
+    def _root_mtime(self):
+        try:
+            return os.stat(self.root).st_mtime_ns
+        except FileNotFoundError:
+            return None
+
+    def _save_manifest(self):
+        # 임시 파일에 쓴 뒤 교체 (쓰는 도중 중단되어도 기존 매니페스트 유지)
+        # (매니페스트 교체도 폴더 mtime을 바꾸므로, 그 사이 다른 파일 변화가 없었을 때만 새 mtime을 기억)
+        unchanged = self._dir_mtime is not None and self._root_mtime() == self._dir_mtime
+        tmp_path = f"{self.manifest_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self._manifest, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, self.manifest_path)
+        stat = os.stat(self.manifest_path)
+        self._manifest_stat = (stat.st_mtime_ns, stat.st_size)
+        self._dir_mtime = self._root_mtime() if unchanged else None
+
+    def _register_locked(self, path):
+        name = os.path.basename(path)
+        if name in self._entries:
+            return False
+        with open(os.path.join(self.root, name), "r", encoding="utf-8") as f:
+            data = json.load(f)
+
+        hashes = []
+        for index, issue in enumerate(data["issues"]):
+            h = issue_hash(issue)
+            hashes.append(h)
+            self._manifest["issues"].setdefault(h, {"file": name, "index": index})
+
+        entry = {"file": name, "crawled_at": data.get("crawled_at", ""), "issues": hashes}
+        self._entries[name] = entry
+        snapshots = self._manifest["snapshots"]
+        snapshots.append(entry)
+        snapshots.sort(key=lambda e: (e["crawled_at"], e["file"]))
+        self._manifest["latest"] = snapshots[-1]["file"]
+        return True
+
+    def _drop_missing_locked(self, existing):
+        """파일이 지워진 스냅샷을 색인에서 빼고 이슈 첫 등장 위치를 다시 계산"""
+        snapshots = [entry for entry in self._manifest["snapshots"] if entry["file"] in existing]
+        if len(snapshots) == len(self._manifest["snapshots"]):
+            return False
+        issues = {}
+        for entry in snapshots:
+            for index, h in enumerate(entry["issues"]):
+                issues.setdefault(h, {"file": entry["file"], "index": index})
+        self._manifest.update(snapshots=snapshots, issues=issues,
+                              latest=snapshots[-1]["file"] if snapshots else None)
+        self._entries = {entry["file"]: entry for entry in snapshots}
+        return True
+
+    def _sync_locked(self):
+        self._load_manifest()
+        # 폴더에 파일이 추가/삭제/이름 변경되지 않았으면 다시 훑지 않음
+        mtime = self._root_mtime()
+        if mtime is not None and mtime == self._dir_mtime:
+            return 0
+        self._dir_mtime = mtime
+        paths = sorted(glob.glob(os.path.join(self.root, SNAPSHOT_PATTERN)))
+        changed = self._drop_missing_locked({os.path.basename(path) for path in paths})
+        added = 0
+        for path in paths:
+            added += self._register_locked(path)
+        if added or changed:
+            self._save_manifest()
+        return added
+
+    # ---- 공개 API ----
+    def register(self, path):
+        """새 스냅샷을 매니페스트에 추가 (이미 등록된 파일이면 무시)"""
+        with self._lock:
+            self._load_manifest()
+            if self._register_locked(path):
+                self._save_manifest()
+
+    def sync(self):
+        """data2/와 매니페스트를 맞추고(새 파일 추가, 지워진 파일 제외) 추가된 수 반환"""
+        with self._lock:
+            return self._sync_locked()
+
+    def latest(self):
+        """최신 스냅샷 경로 (data2/를 다시 훑어 다른 프로세스가 저장한 스냅샷도 반영)"""
+        with self._lock:
+            self._sync_locked()
+            name = self._manifest["latest"]
+        if not name:
+            raise FileNotFoundError("현재이슈 JSON 파일을 찾을 수 없습니다. data2/ 폴더를 확인해주세요.")
+        return os.path.join(self.root, name)
+
+    def snapshots(self):
+        """등록된 스냅샷 파일명 (crawled_at 오름차순)"""
+        with self._lock:
+            self._sync_locked()
+            return [entry["file"] for entry in self._manifest["snapshots"]]
+
+    def load(self, snapshot):
+        with open(os.path.join(self.root, os.path.basename(snapshot)), "r", encoding="utf-8") as f:
+            return json.load(f)["issues"]
+
+    def changed_since(self, base=None, target=None):
+        """target 스냅샷(기본: 최신)에서 base 스냅샷까지 한 번도 나오지 않은 새 이슈/변경된 이슈만 반환
+
+        base가 None이거나 더 이상 없는 스냅샷이면 target의 모든 이슈를 반환한다.
+        """
+        target = os.path.basename(target or self.latest())
+        with self._lock:
+            self._sync_locked()
+            if target not in self._entries:
+                raise FileNotFoundError(f"스냅샷을 찾을 수 없습니다: {target}")
+            target_hashes = self._entries[target]["issues"]
+            seen = set()
+            base_entry = self._entries.get(os.path.basename(base)) if base is not None else None
+            if base_entry is not None:
+                for entry in self._manifest["snapshots"]:
+                    seen.update(entry["issues"])
+                    if entry is base_entry:
+                        break
+
+        issues = self.load(target)
+        return [issue for issue, h in zip(issues, target_hashes) if h not in seen]
+
+    # ---- 소비자별 체크포인트 ----
+    def _checkpoint_path(self, consumer):
+        # 소비자 이름의 ':' ',' 등은 파일명에 쓸 수 없는 OS가 있어 치환하고, 원래 이름은 내용에 기록
+        safe = re.sub(r"[^0-9A-Za-z_.-]", "_", consumer)
+        suffix = hashlib.sha1(consumer.encode("utf-8")).hexdigest()[:8]
+        return os.path.join(self.checkpoint_dir, f"{safe}.{suffix}.json")
+
+    def get_checkpoint(self, consumer):
+        """소비자(예: rag_engine, 03-2)가 마지막으로 처리한 스냅샷 파일명"""
+        path = self._checkpoint_path(consumer)
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                return json.load(f)["snapshot"]
+        # 이전 형식: 매니페스트 안의 checkpoints
+        with self._lock:
+            return self._load_manifest().get("checkpoints", {}).get(consumer)
+
+    def _order_key(self, snapshot):
+        """스냅샷 정렬 기준 (crawled_at, 파일명) — 매니페스트에 없으면 None"""
+        with self._lock:
+            self._sync_locked()
+            entry = self._entries.get(os.path.basename(snapshot))
+        return (entry["crawled_at"], entry["file"]) if entry else None
+
+    def advance_checkpoint(self, consumer, snapshot):
+        """snapshot이 기존 체크포인트보다 최신일 때만 기록하고 기록 여부 반환
+
+        오래된 스냅샷을 나중에 다시 분석(재시도)해도 체크포인트가 뒤로 가지 않는다.
+        """
+        current = self.get_checkpoint(consumer)
+        if current is not None:
+            current_key, new_key = self._order_key(current), self._order_key(snapshot)
+            if current_key is not None and (new_key is None or new_key <= current_key):
+                return False
+        self.set_checkpoint(consumer, snapshot)
+        return True
+
+    def set_checkpoint(self, consumer, snapshot):
+        os.makedirs(self.checkpoint_dir, exist_ok=True)
+        path = self._checkpoint_path(consumer)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"consumer": consumer, "snapshot": os.path.basename(snapshot)}, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
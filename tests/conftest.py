@@ -0,0 +1,37 @@
+# tests/conftest.py
+# 저장소 루트의 모듈을 import할 수 있게 하고, 네트워크 없이 쓰는 가짜 임베딩 제공
+
+import os
+import sys
+import hashlib
+
+import numpy as np
+import pytest
+from langchain_core.embeddings import Embeddings
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+
+class FakeEmbeddings(Embeddings):
+    """텍스트 해시로 시드를 정한 난수 벡터 (같은 텍스트면 항상 같은 벡터)"""
+
+    def __init__(self, dim=16):
+        self.dim = dim
+        self.calls = 0
+
+    def embed_documents(self, texts):
+        self.calls += 1
+        return [
+            np.random.default_rng(int(hashlib.md5(text.encode("utf-8")).hexdigest()[:8], 16))
+            .standard_normal(self.dim).tolist()
+            for text in texts
+        ]
+
+    def embed_query(self, text):
+        return self.embed_documents([text])[0]
+
+
+@pytest.fixture
+def fake_embeddings():
+    return FakeEmbeddings()
@@ -0,0 +1,50 @@
+from langchain_core.documents import Document
+
+from ingest_utils import incremental_upsert, iter_chunk_ids, list_namespace_ids, make_chunk_id
+from local_vector_store import LocalIndex
+
+
+def test_make_chunk_id_is_stable():
+    first = make_chunk_id("industry", "abc", "내용", {"업종": "IT", "종목": "A"})
+    # metadata 키 순서가 달라도 같은 ID
+    assert make_chunk_id("industry", "abc", "내용", {"종목": "A", "업종": "IT"}) == first
+    assert first.startswith("industry-abc-")
+    assert make_chunk_id("industry", "abc", "내용2", {"업종": "IT", "종목": "A"}) != first
+    assert make_chunk_id("industry", "abd", "내용", {"업종": "IT", "종목": "A"}) != first
+    assert make_chunk_id("industry", "abc", "내용", {"업종": "금융", "종목": "A"}) != first
+
+
+def test_iter_chunk_ids_ignores_position_metadata_and_drops_duplicates():
+    chunks = [
+        Document(page_content="같은 내용", metadata={"row_id": "r1", "row": 0, "이슈번호": 1}),
+        Document(page_content="같은 내용", metadata={"row_id": "r1", "row": 5, "이슈번호": 3}),
+        Document(page_content="다른 내용", metadata={"row_id": "r1", "row": 0}),
+    ]
+    ids = [chunk_id for chunk_id, _ in iter_chunk_ids(chunks, "past_issue", row_key_field="row_id")]
+    assert len(ids) == 2
+    assert ids[0] == make_chunk_id("past_issue", "r1", "같은 내용", {"row_id": "r1"})
+
+
+def _docs(contents):
+    return [Document(page_content=text, metadata={"row_id": key}) for key, text in contents]
+
+
+def test_incremental_upsert_deletes_orphans(tmp_path, fake_embeddings):
+    index = LocalIndex(str(tmp_path))
+    first = _docs([("a", "가 내용"), ("b", "나 내용"), ("c", "다 내용")])
+    assert incremental_upsert(fake_embeddings, index, first, "industry", "industry",
+                              row_key_field="row_id") == (3, 0, 0)
+
+    # b는 내용이 바뀌고 c는 원본에서 사라짐
+    second = _docs([("a", "가 내용"), ("b", "나 새 내용")])
+    assert incremental_upsert(fake_embeddings, index, iter(second), "industry", "industry",
+                              row_key_field="row_id") == (1, 1, 2)
+
+    expected = {chunk_id for chunk_id, _ in iter_chunk_ids(second, "industry", row_key_field="row_id")}
+    assert list_namespace_ids(LocalIndex(str(tmp_path)), "industry") == expected
+
+    # 바뀐 것이 없으면 임베딩 호출 없이 모두 유지
+    calls = fake_embeddings.calls
+    assert incremental_upsert(fake_embeddings, index, second, "industry", "industry",
+                              row_key_field="row_id") == (0, 2, 0)
+    assert fake_embeddings.calls == calls
@@ -0,0 +1,41 @@
+import threading
+
+from issue_scheduler import OrderedStream
+
+
+def test_ordered_stream_writes_in_task_order():
+    written = []
+    stream = OrderedStream(lambda index, text: written.append((index, text)))
+
+    stream.write(1, "b1")
+    stream.write(0, "a1")
+    stream.write(2, "c1")
+    stream.write(1, "b2")
+    assert written == [(0, "a1")]
+
+    stream.finish(2)
+    assert written == [(0, "a1")]
+    stream.finish(0)
+    assert written == [(0, "a1"), (1, "b1"), (1, "b2")]
+    # 맨 앞이 된 작업의 조각은 바로 전달
+    stream.write(1, "b3")
+    stream.finish(1)
+    assert written == [(0, "a1"), (1, "b1"), (1, "b2"), (1, "b3"), (2, "c1")]
+
+
+def test_ordered_stream_keeps_order_across_threads():
+    written = []
+    stream = OrderedStream(lambda index, text: written.append(index))
+
+    def task(index):
+        for _ in range(50):
+            stream.write(index, "x")
+        stream.finish(index)
+
+    threads = [threading.Thread(target=task, args=(index,)) for index in reversed(range(8))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert written == sorted(written)
+    assert len(written) == 8 * 50
@@ -0,0 +1,18 @@
+import pytest
+
+from lexical_index import reciprocal_rank_fusion
+
+
+def test_reciprocal_rank_fusion_scores():
+    fused = reciprocal_rank_fusion([["a", "b", "c"], ["b", "d"]], k=60)
+    assert fused["a"] == pytest.approx(1 / 61)
+    assert fused["b"] == pytest.approx(1 / 62 + 1 / 61)
+    assert fused["c"] == pytest.approx(1 / 63)
+    assert fused["d"] == pytest.approx(1 / 62)
+    # 양쪽 모두 상위인 b가 한쪽에서만 1위인 a보다 앞섬
+    assert max(fused, key=fused.get) == "b"
+
+
+def test_reciprocal_rank_fusion_empty():
+    assert reciprocal_rank_fusion([]) == {}
+    assert reciprocal_rank_fusion([[], []]) == {}
@@ -0,0 +1,53 @@
+import os
+import importlib.util
+
+import pytest
+
+import namespace_aliases
+import vector_stores
+from namespace_aliases import NamespaceAliases
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_switch_returns_previous_and_keeps_history(tmp_path):
+    aliases = NamespaceAliases(str(tmp_path / "aliases.json"))
+    assert aliases.resolve("industry") == "industry"
+
+    assert aliases.switch("industry", "industry__v1") == "industry"
+    assert aliases.switch("industry", "industry__v2") == "industry__v1"
+    assert aliases.resolve("industry") == "industry__v2"
+    assert aliases.history("industry") == ["industry", "industry__v1"]
+
+    # 롤백하면 history에서 빠지고, 다른 인스턴스(프로세스)도 바뀐 파일을 읽음
+    assert aliases.switch("industry", "industry__v1") == "industry__v2"
+    other = NamespaceAliases(str(tmp_path / "aliases.json"))
+    assert other.resolve("industry") == "industry__v1"
+    assert other.history("industry") == ["industry", "industry__v2"]
+
+
+@pytest.fixture
+def namespace_tool(tmp_path, monkeypatch):
+    """참고/pinecone_namespace_delete.py를 로컬 백엔드로 불러옴"""
+    monkeypatch.setenv("VECTOR_BACKEND", "local")
+    monkeypatch.setenv("LOCAL_VECTOR_DIR", str(tmp_path / "vectors"))
+    monkeypatch.setenv("NAMESPACE_ALIAS_PATH", str(tmp_path / "aliases.json"))
+    monkeypatch.setattr(namespace_aliases, "_aliases", None)
+    monkeypatch.setattr(vector_stores, "_indexes", {})
+    path = os.path.join(ROOT, "참고", "pinecone_namespace_delete.py")
+    spec = importlib.util.spec_from_file_location("pinecone_namespace_delete", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def test_delete_namespace_refuses_current_alias_target(namespace_tool, fake_embeddings):
+    index = vector_stores.get_index("test")
+    for namespace in ("industry__v1", "industry__v2"):
+        index.upsert(vectors=[(f"{namespace}-1", fake_embeddings.embed_query(namespace), {})], namespace=namespace)
+    namespace_aliases.get_aliases().switch("industry", "industry__v2")
+
+    assert namespace_tool.delete_namespace("test", "industry__v2") is False
+    assert namespace_tool.delete_namespace("test", "industry__v1") is True
+    assert list(index.list(namespace="industry__v2")) == [["industry__v2-1"]]
+    assert list(index.list(namespace="industry__v1")) == []
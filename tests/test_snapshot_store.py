@@ -0,0 +1,49 @@
+import json
+
+from snapshot_store import SnapshotStore
+
+
+def _write_snapshot(root, name, crawled_at, titles):
+    issues = [{"이슈번호": i + 1, "제목": title, "내용": f"{title} 내용"} for i, title in enumerate(titles)]
+    path = root / f"{name}_BigKinds_current_issues.json"
+    path.write_text(json.dumps({"crawled_at": crawled_at, "issues": issues}, ensure_ascii=False), encoding="utf-8")
+    return path.name
+
+
+def _titles(issues):
+    return [issue["제목"] for issue in issues]
+
+
+def test_changed_since_returns_only_unseen_issues(tmp_path):
+    first = _write_snapshot(tmp_path, "20250101_090000", "2025-01-01 09:00:00", ["A", "B"])
+    second = _write_snapshot(tmp_path, "20250101_120000", "2025-01-01 12:00:00", ["B", "C"])
+    store = SnapshotStore(str(tmp_path))
+
+    assert store.snapshots() == [first, second]
+    assert store.latest().endswith(second)
+    assert _titles(store.changed_since()) == ["B", "C"]
+    assert _titles(store.changed_since(first)) == ["C"]
+    assert store.changed_since(second) == []
+    # 없는 스냅샷을 기준으로 주면 전체 반환
+    assert _titles(store.changed_since("missing.json")) == ["B", "C"]
+
+
+def test_changed_since_sees_snapshots_added_later(tmp_path):
+    first = _write_snapshot(tmp_path, "20250101_090000", "2025-01-01 09:00:00", ["A"])
+    store = SnapshotStore(str(tmp_path))
+    assert store.changed_since(first) == []
+
+    # 다른 프로세스가 저장한 스냅샷도 다음 조회에서 반영
+    third = _write_snapshot(tmp_path, "20250101_150000", "2025-01-01 15:00:00", ["A", "D"])
+    assert store.latest().endswith(third)
+    assert _titles(store.changed_since(first)) == ["D"]
+
+
+def test_advance_checkpoint_never_moves_backwards(tmp_path):
+    first = _write_snapshot(tmp_path, "20250101_090000", "2025-01-01 09:00:00", ["A"])
+    second = _write_snapshot(tmp_path, "20250101_120000", "2025-01-01 12:00:00", ["B"])
+    store = SnapshotStore(str(tmp_path))
+
+    assert store.advance_checkpoint("rag:industry", second)
+    assert not store.advance_checkpoint("rag:industry", first)
+    assert SnapshotStore(str(tmp_path)).get_checkpoint("rag:industry") == second
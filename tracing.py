@@ -0,0 +1,273 @@
+# tracing.py
+# 적재/분석 단계별 소요 시간, 토큰 수, 배치 크기, 캐시 적중, 오류를 JSON-lines span으로 기록
+#
+# TRACE=on 일 때만 기록 (기본 off)
+# TRACE_PATH: span 파일 경로 (기본 .cache/traces/<실행 시각>_<pid>.jsonl)
+# TRACE_KEEP: 기본 경로를 쓸 때 남겨 둘 최근 span 파일 수 (기본 20, 나머지는 새 파일을 만들 때 삭제)
+# 실행이 끝나면 span 이름별 요약 표를 출력
+
+import os
+import glob
+import json
+import math
+import time
+import atexit
+import threading
+import contextvars
+from contextlib import contextmanager
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.embeddings import Embeddings
+
+# 현재 스레드(컨텍스트)에서 열려 있는 span — LLM 콜백이 토큰 수를 더할 대상
+_current_span = contextvars.ContextVar("current_span", default=None)
+
+TRACE_DIR = os.path.join(".cache", "traces")
+
+
+class _SpanStats:
+    """span 이름 하나의 누적 통계 (상주 프로세스에서도 메모리가 늘지 않도록 기록은 저장하지 않음)
+
+    p95는 소요 시간을 로그 간격(약 5%) 구간으로 센 히스토그램에서 추정한다.
+    """
+    _BASE = math.log(1.05)
+
+    def __init__(self):
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.errors = 0
+        self.totals = {}
+        self.buckets = {}
+
+    def add(self, record):
+        duration = record["duration_ms"]
+        self.count += 1
+        self.total_ms += duration
+        self.max_ms = max(self.max_ms, duration)
+        self.errors += bool(record["error"])
+        bucket = math.ceil(math.log(max(duration, 0.01)) / self._BASE)
+        self.buckets[bucket] = self.buckets.get(bucket, 0) + 1
+        for key, value in record.items():
+            if key not in ("ts", "duration_ms") and isinstance(value, (int, float)) and not isinstance(value, bool):
+                self.totals[key] = self.totals.get(key, 0) + value
+
+    def percentile(self, q):
+        rank = max(1, math.ceil(self.count * q))
+        seen = 0
+        for bucket in sorted(self.buckets):
+            seen += self.buckets[bucket]
+            if seen >= rank:
+                return min(math.exp(bucket * self._BASE), self.max_ms)
+        return self.max_ms
+
+
+class Tracer:
+    def __init__(self, path=None, enabled=None):
+        self.enabled = enabled if enabled is not None else os.getenv("TRACE", "off") == "on"
+        self.path = path or os.getenv("TRACE_PATH") or os.path.join(
+            TRACE_DIR, f"{time.strftime('%Y%m%d_%H%M%S')}_{os.getpid()}.jsonl"
+        )
+        self.keep = int(os.getenv("TRACE_KEEP", "20"))
+        self.stats = {}
+        self._lock = threading.Lock()
+        self._file = None
+
+    def _prune(self):
+        """기본 경로(.cache/traces)의 span 파일 중 최근 keep개만 남기고 삭제 (새 파일 포함)"""
+        if os.path.dirname(self.path) != TRACE_DIR:
+            return
+        old_files = sorted(glob.glob(os.path.join(TRACE_DIR, "*.jsonl")), key=os.path.getmtime)
+        for old_path in old_files[:max(len(old_files) - self.keep, 0)]:
+            try:
+                os.remove(old_path)
+            except OSError:
+                pass
+
+    def _write(self, record):
+        with self._lock:
+            self.stats.setdefault(record["name"], _SpanStats()).add(record)
+            if self._file is None:
+                if os.path.dirname(self.path):
+                    os.makedirs(os.path.dirname(self.path), exist_ok=True)
+                self._file = open(self.path, "a", encoding="utf-8", buffering=1)
+                self._prune()
+            self._file.write(json.dumps(record, ensure_ascii=False, default=str) + "\n")
+
+    @contextmanager
+    def span(self, name, **attrs):
+        """with tracer.span("이름", 속성=값) as span: ... — span[키] = 값 으로 속성 추가 가능"""
+        if not self.enabled:
+            yield {}
+            return
+        span = dict(attrs)
+        token = _current_span.set(span)
+        started = time.time()
+        perf_started = time.perf_counter()
+        error = None
+        try:
+            yield span
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            _current_span.reset(token)
+            self.record(name, started, (time.perf_counter() - perf_started) * 1000, error, **span)
+
+    def record(self, name, started, duration_ms, error=None, **attrs):
+        """이미 잰 소요 시간으로 span 하나를 기록 (with 블록으로 감쌀 수 없는 generator 등에서 사용)"""
+        if not self.enabled:
+            return
+        self._write({
+            "name": name,
+            "ts": round(started, 3),
+            "duration_ms": round(duration_ms, 2),
+            "thread": threading.current_thread().name,
+            "error": error,
+            **attrs,
+        })
+
+    def summary(self):
+        """span 이름별 {count, total_s, avg_ms, p95_ms(근사), max_ms, errors, 숫자 속성 합계}"""
+        with self._lock:
+            rows = [{
+                "name": name,
+                "count": stats.count,
+                "total_s": round(stats.total_ms / 1000, 2),
+                "avg_ms": round(stats.total_ms / stats.count, 1),
+                "p95_ms": round(stats.percentile(0.95), 1),
+                "max_ms": round(stats.max_ms, 1),
+                "errors": stats.errors,
+                "totals": {key: round(value, 3) if isinstance(value, float) else value
+                           for key, value in stats.totals.items()},
+            } for name, stats in self.stats.items()]
+        return sorted(rows, key=lambda row: row["total_s"], reverse=True)
+
+    def print_summary(self):
+        rows = self.summary()
+        if not rows:
+            return
+        print(f"\n⏱️ 단계별 소요 시간 (span 기록: {self.path})")
+        print(f"{'span':<24} {'count':>6} {'total(s)':>9} {'avg(ms)':>9} {'p95(ms)':>9} {'max(ms)':>9} {'err':>4}  합계")
+        for row in rows:
+            totals = ", ".join(f"{key}={value}" for key, value in row["totals"].items())
+            print(f"{row['name']:<24} {row['count']:>6} {row['total_s']:>9} {row['avg_ms']:>9} "
+                  f"{row['p95_ms']:>9} {row['max_ms']:>9} {row['errors']:>4}  {totals}")
+
+    def close(self):
+        with self._lock:
+            if self._file:
+                self._file.close()
+                self._file = None
+
+
+_tracer = None
+_tracer_lock = threading.Lock()
+
+
+def get_tracer():
+    """프로세스에서 공유하는 Tracer (종료 시 요약 표 출력)"""
+    global _tracer
+    with _tracer_lock:
+        if _tracer is None:
+            _tracer = Tracer()
+            if _tracer.enabled:
+                atexit.register(lambda: (_tracer.print_summary(), _tracer.close()))
+    return _tracer
+
+
+# ====== 래퍼 ======
+class TracedEmbeddings(Embeddings):
+    """임베딩 API 호출을 span으로 기록 (batch_size: 요청한 텍스트 수)"""
+
+    def __init__(self, underlying, name="embedding.api"):
+        self.underlying = underlying
+        self.name = name
+
+    def embed_documents(self, texts):
+        with get_tracer().span(self.name, batch_size=len(texts)):
+            return self.underlying.embed_documents(texts)
+
+    def embed_query(self, text):
+        with get_tracer().span(self.name, batch_size=1):
+            return self.underlying.embed_query(text)
+
+
+class TracedIndex:
+    """Pinecone Index / LocalIndex의 upsert·query·delete·list를 span으로 기록하는 프록시"""
+
+    def __init__(self, index):
+        self._index = index
+
+    def __getattr__(self, name):
+        return getattr(self._index, name)
+
+    def upsert(self, vectors, namespace=None, **kwargs):
+        with get_tracer().span("index.upsert", namespace=namespace, batch_size=len(vectors)):
+            return self._index.upsert(vectors=vectors, namespace=namespace, **kwargs)
+
+    def query(self, *args, **kwargs):
+        with get_tracer().span("index.query", namespace=kwargs.get("namespace")):
+            return self._index.query(*args, **kwargs)
+
+    def query_many(self, vectors, *args, **kwargs):
+        with get_tracer().span("index.query", namespace=kwargs.get("namespace"), batch_size=len(vectors)):
+            return self._index.query_many(vectors, *args, **kwargs)
+
+    def delete(self, *args, **kwargs):
+        ids = kwargs.get("ids") or []
+        with get_tracer().span("index.delete", namespace=kwargs.get("namespace"), batch_size=len(ids)):
+            return self._index.delete(*args, **kwargs)
+
+    def list(self, *args, **kwargs):
+        # 페이지 단위 generator — 페이지를 가져오는 시간만 더해 기록
+        # (yield 사이에 호출자가 하는 일이 섞이지 않도록 span을 열어 두지 않고 _current_span도 건드리지 않음)
+        tracer = get_tracer()
+        pages = iter(self._index.list(*args, **kwargs))
+        count = 0
+        elapsed_ms = 0.0
+        error = None
+        started = time.time()
+        try:
+            while True:
+                perf_started = time.perf_counter()
+                try:
+                    page = next(pages)
+                except StopIteration:
+                    break
+                except Exception as e:
+                    error = f"{type(e).__name__}: {e}"
+                    raise
+                finally:
+                    elapsed_ms += (time.perf_counter() - perf_started) * 1000
+                count += 1
+                yield page
+        finally:
+            tracer.record("index.list", started, elapsed_ms, error,
+                          namespace=kwargs.get("namespace"), pages=count)
+
+
+def count_in_current_span(key, value=1):
+    """현재 열린 span의 숫자 속성에 value를 더함 (열린 span이 없으면 무시)"""
+    span = _current_span.get()
+    if span is not None:
+        span[key] = span.get(key, 0) + value
+
+
+class TracingCallbackHandler(BaseCallbackHandler):
+    """LLM 응답의 토큰 사용량을 현재 열린 span에 더함"""
+
+    def on_llm_end(self, response, **kwargs):
+        usage = (response.llm_output or {}).get("token_usage") or {}
+        prompt_tokens = usage.get("prompt_tokens") or 0
+        completion_tokens = usage.get("completion_tokens") or 0
+        if not usage:
+            # llm_output이 없는 응답(스트리밍 등)은 메시지의 usage_metadata 사용
+            for generations in response.generations:
+                for generation in generations:
+                    metadata = getattr(getattr(generation, "message", None), "usage_metadata", None) or {}
+                    prompt_tokens += metadata.get("input_tokens", 0)
+                    completion_tokens += metadata.get("output_tokens", 0)
+        count_in_current_span("llm_calls")
+        count_in_current_span("prompt_tokens", prompt_tokens)
+        count_in_current_span("completion_tokens", completion_tokens)
@@ -0,0 +1,61 @@
+# vector_stores.py
+# 설정(VECTOR_BACKEND)에 따라 Pinecone 또는 로컬 벡터 스토어를 생성
+
+import os
+
+from tracing import TracedIndex, get_tracer
+
+_indexes = {}
+
+
+def get_backend():
+    """사용할 벡터 백엔드 이름 (pinecone / local)"""
+    return os.getenv("VECTOR_BACKEND", "pinecone")
+
+
+def get_index(index_name=None):
+    """백엔드에 맞는 인덱스 객체를 반환 (프로세스 안에서 재사용)
+
+    - pinecone: Pinecone Index
+    - local: LocalIndex (LOCAL_VECTOR_DIR 아래에 저장)
+    """
+    index_name = index_name or os.getenv("PINECONE_INDEX_NAME") or "lastproject"
+    backend = get_backend()
+    key = (backend, index_name)
+    if key in _indexes:
+        return _indexes[key]
+
+    if backend == "local":
+        from local_vector_store import LocalIndex
+        root_dir = os.path.join(os.getenv("LOCAL_VECTOR_DIR", ".cache/vectors"), index_name)
+        # LOCAL_VECTOR_QUANTIZE=int8/float16: 검색용 행렬만 양자화해 메모리에 두고 상위 후보는 원래 정밀도로 재채점
+        index = LocalIndex(
+            root_dir,
+            dtype=os.getenv("LOCAL_VECTOR_DTYPE", "float32"),
+            quantize=os.getenv("LOCAL_VECTOR_QUANTIZE", "none"),
+            rescore_factor=int(os.getenv("LOCAL_VECTOR_RESCORE", "4"))
+        )
+    else:
+        from pinecone import Pinecone
+        pc = Pinecone(api_key=os.getenv("PINECONE_API_KEY"))
+        # PINECONE_INDEX_HOST가 있으면 describe_index 호출 없이 해당 호스트로 바로 연결 (벤치마크 대역 서버 등)
+        host = os.getenv("PINECONE_INDEX_HOST")
+        index = pc.Index(host=host) if host else pc.Index(index_name)
+
+    # TRACE=on이면 upsert/query/delete/list 호출 시간을 기록
+    if get_tracer().enabled:
+        index = TracedIndex(index)
+
+    _indexes[key] = index
+    return index
+
+
+def get_vector_store(namespace, embedding, index_name=None):
+    """similarity_search_with_score 등을 제공하는 벡터 스토어 생성"""
+    index = get_index(index_name)
+    if get_backend() == "local":
+        from local_vector_store import LocalVectorStore
+        return LocalVectorStore(index, embedding, namespace=namespace)
+
+    from langchain_pinecone import PineconeVectorStore
+    return PineconeVectorStore(index=index, embedding=embedding, namespace=namespace)
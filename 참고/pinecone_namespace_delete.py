@@ -1,31 +1,68 @@
+# namespace 관리 도구 (통계 / 삭제 / 무중단 재구축 / 별칭 전환 / 이전 버전 정리)
+#
+#   python 참고/pinecone_namespace_delete.py                       # 기존 동작: industry, past_issue 삭제 (확인 후,
+#                                                                   #   별칭이 가리키는 현재 namespace는 삭제하지 않음)
+#   python 참고/pinecone_namespace_delete.py stats
+#   python 참고/pinecone_namespace_delete.py rebuild industry past_issue [--keep 1]
+#   python 참고/pinecone_namespace_delete.py switch industry industry__v6   # 롤백
+#   python 참고/pinecone_namespace_delete.py gc industry [--keep 1]
+#   python 참고/pinecone_namespace_delete.py aliases
+#
+# rebuild: 새 버전 namespace(industry__v7)에 전체 적재 → CSV 기준 벡터 수 확인 → 별칭 전환 → 이전 버전 병렬 삭제
+# 에이전트는 별칭(namespace_aliases.json)을 통해 읽으므로 재구축 중에도 기존 데이터로 계속 동작한다.
+
 import os
+import sys
+import time
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+
 from dotenv import load_dotenv
-from pinecone import Pinecone
+
+# 저장소 루트의 모듈 사용 (참고/ 폴더에서 실행)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from vector_stores import get_index
+from namespace_aliases import get_aliases, versioned_namespace, namespace_version
+from ingest_sources import SOURCES, ingest_source, count_source_chunks
 
 # 환경변수 로드
 load_dotenv(override=True)
 
 PINECONE_API_KEY = os.getenv("PINECONE_API_KEY")
 INDEX_NAME = os.getenv("PINECONE_INDEX_NAME", "lastproject")
+GC_CONCURRENCY = int(os.getenv("NAMESPACE_GC_CONCURRENCY", "4"))
+VERIFY_TIMEOUT = float(os.getenv("NAMESPACE_VERIFY_TIMEOUT", "120"))
+
+
+def protected_namespaces():
+    """별칭이 현재 가리키는 namespace (에이전트가 읽는 중이므로 삭제 금지)"""
+    return {entry["current"] for entry in get_aliases().all().values()}
 
 def delete_namespace(index_name, namespace):
-    """특정 namespace의 모든 벡터 삭제"""
+    """특정 namespace의 모든 벡터 삭제 (별칭이 가리키는 namespace는 거부)"""
+    protected = {name for name, entry in get_aliases().all().items() if entry["current"] == namespace}
+    if protected:
+        print(f"⛔ '{namespace}'는 별칭 {', '.join(sorted(protected))}이(가) 현재 가리키는 namespace라 삭제하지 않습니다. "
+              f"(다른 버전으로 switch한 뒤 삭제하세요)")
+        return False
     try:
-        # Pinecone 클라이언트 초기화
-        pc = Pinecone(api_key=PINECONE_API_KEY)
-        
-        # 인덱스 연결
-        index = pc.Index(index_name)
+        # 프로세스에서 공유하는 인덱스 연결 사용 (호출마다 클라이언트를 만들지 않음)
+        index = get_index(index_name)
         
         print(f"🗑️ '{namespace}' namespace 삭제 중...")
         
         # namespace의 모든 벡터 삭제
         index.delete(delete_all=True, namespace=namespace)
+        if hasattr(index, "flush"):
+            index.flush()
         
         print(f"✅ '{namespace}' namespace 삭제 완료!")
+        return True
         
     except Exception as e:
         print(f"❌ 오류 발생: {e}")
+        return False
 
 def delete_multiple_namespaces(index_name, namespaces):
     """여러 namespace를 한번에 삭제"""
@@ -35,26 +72,111 @@ def delete_multiple_namespaces(index_name, namespaces):
         delete_namespace(index_name, namespace)
         print(f"{'='*50}")
 
+def namespace_counts(index_name):
+    """namespace별 벡터 수"""
+    stats = get_index(index_name).describe_index_stats()
+    return {ns: info["vector_count"] for ns, info in (stats.get("namespaces") or {}).items()}
+
 def get_index_stats(index_name):
     """인덱스 통계 확인 (삭제 전후 비교용)"""
     try:
-        pc = Pinecone(api_key=PINECONE_API_KEY)
-        index = pc.Index(index_name)
+        index = get_index(index_name)
         
         stats = index.describe_index_stats()
         print(f"📊 인덱스 '{index_name}' 통계:")
         print(f"   전체 벡터 수: {stats['total_vector_count']}")
         
-        if 'namespaces' in stats:
+        if stats.get('namespaces'):
+            aliases = get_aliases()
             print("   Namespace별 벡터 수:")
             for ns, info in stats['namespaces'].items():
-                print(f"     - {ns}: {info['vector_count']}개")
+                active = [name for name in SOURCES if aliases.resolve(name) == ns]
+                mark = f"  ← {', '.join(active)} (현재)" if active else ""
+                print(f"     - {ns}: {info['vector_count']}개{mark}")
         else:
             print("   등록된 namespace가 없습니다.")
             
     except Exception as e:
         print(f"❌ 통계 조회 오류: {e}")
 
+
+# ====== 무중단 재구축 ======
+def existing_versions(index_name, name):
+    """인덱스와 별칭 기록에 있는 name의 버전 namespace {버전: namespace}"""
+    aliases = get_aliases()
+    candidates = set(namespace_counts(index_name)) | {aliases.resolve(name)} | set(aliases.history(name))
+    versions = {}
+    for ns in candidates:
+        version = namespace_version(name, ns)
+        if version is not None:
+            versions[version] = ns
+    return versions
+
+def wait_for_count(index_name, namespace, expected, timeout=VERIFY_TIMEOUT):
+    """namespace 벡터 수가 expected가 될 때까지 대기 (Pinecone 통계는 upsert 직후 바로 반영되지 않음)"""
+    deadline = time.time() + timeout
+    while True:
+        actual = namespace_counts(index_name).get(namespace, 0)
+        if actual == expected or time.time() >= deadline:
+            return actual
+        time.sleep(2)
+
+def rebuild_namespace(index_name, name, keep=1):
+    """새 버전 namespace에 적재하고 벡터 수 확인 후 별칭 전환"""
+    source = SOURCES[name]
+    versions = existing_versions(index_name, name)
+    target = versioned_namespace(name, max(versions, default=0) + 1)
+    print(f"🏗️ '{name}' 재구축: {get_aliases().resolve(name)} → {target}")
+
+    # 빈 namespace이므로 기존 ID 비교 없이 전체 적재
+    ingest_source(source, namespace=target, full=True)
+
+    expected = count_source_chunks(source)
+    actual = wait_for_count(index_name, target, expected)
+    if actual != expected:
+        print(f"❌ 벡터 수 불일치: CSV 기준 {expected}개, '{target}' {actual}개 — 별칭을 전환하지 않습니다.")
+        return False
+    print(f"✅ 벡터 수 확인: {actual}개 (CSV 기준 {expected}개)")
+
+    previous = get_aliases().switch(name, target)
+    print(f"🔀 별칭 전환: {name} → {target} (이전: {previous})")
+
+    gc_versions(index_name, name, keep)
+    return True
+
+def gc_versions(index_name, name, keep=1):
+    """현재 버전과 최근 keep개 이전 버전(롤백용)을 제외한 나머지 버전을 병렬 삭제"""
+    aliases = get_aliases()
+    current = aliases.resolve(name)
+    counts = namespace_counts(index_name)
+    recent = [ns for ns in aliases.history(name) if ns != current][-keep:] if keep > 0 else []
+    stale = [
+        ns for version, ns in sorted(existing_versions(index_name, name).items())
+        if ns != current and ns not in recent and counts.get(ns)
+    ]
+    if not stale:
+        print(f"🧹 '{name}' 정리할 이전 버전 없음 (유지: {[current] + recent})")
+        return []
+
+    print(f"🧹 '{name}' 이전 버전 삭제: {stale} (유지: {[current] + recent})")
+    with ThreadPoolExecutor(max_workers=max(1, min(GC_CONCURRENCY, len(stale)))) as executor:
+        results = list(executor.map(lambda ns: delete_namespace(index_name, ns), stale))
+    deleted = [ns for ns, ok in zip(stale, results) if ok]
+    aliases.forget(name, deleted)
+    return deleted
+
+def switch_alias(name, namespace):
+    previous = get_aliases().switch(name, namespace)
+    print(f"🔀 별칭 전환: {name} → {namespace} (이전: {previous})")
+
+def print_aliases():
+    aliases = get_aliases().all()
+    if not aliases:
+        print("등록된 별칭이 없습니다 (namespace 이름을 그대로 사용).")
+    for name, entry in aliases.items():
+        print(f"   {name} → {entry['current']}  (이전: {', '.join(entry['history']) or '-'})")
+
+
 def main():
     print("🚀 Pinecone Namespace 삭제 도구")
     print("="*60)
@@ -64,8 +186,20 @@ def main():
     get_index_stats(INDEX_NAME)
     print("="*60)
     
-    # 삭제할 namespace 목록
+    # 삭제할 namespace 목록 (별칭이 가리키는 현재 namespace는 제외)
     namespaces_to_delete = ["industry", "past_issue"]
+    aliases = get_aliases()
+    for name in namespaces_to_delete:
+        if aliases.resolve(name) != name:
+            print(f"🔀 별칭: {name} → {aliases.resolve(name)} (에이전트는 '{aliases.resolve(name)}'를 읽음)")
+    protected = protected_namespaces()
+    skipped = [ns for ns in namespaces_to_delete if ns in protected]
+    if skipped:
+        print(f"⛔ 별칭이 가리키는 namespace는 삭제하지 않습니다: {skipped}")
+        namespaces_to_delete = [ns for ns in namespaces_to_delete if ns not in protected]
+    if not namespaces_to_delete:
+        print("❌ 삭제할 namespace가 없습니다.")
+        return
     
     # 사용자 확인
     print(f"⚠️  다음 namespace들을 삭제합니다: {namespaces_to_delete}")
@@ -91,10 +225,39 @@ def delete_past_issue_namespace():
     """past_issue namespace만 삭제"""
     delete_namespace(INDEX_NAME, "past_issue")
 
+def cli():
+    parser = argparse.ArgumentParser(description="namespace 관리 도구")
+    sub = parser.add_subparsers(dest="command")
+    sub.add_parser("stats")
+    sub.add_parser("aliases")
+    rebuild = sub.add_parser("rebuild")
+    rebuild.add_argument("names", nargs="+", choices=list(SOURCES))
+    rebuild.add_argument("--keep", type=int, default=1, help="롤백용으로 남길 이전 버전 수")
+    switch = sub.add_parser("switch")
+    switch.add_argument("name", choices=list(SOURCES))
+    switch.add_argument("namespace")
+    gc = sub.add_parser("gc")
+    gc.add_argument("names", nargs="+", choices=list(SOURCES))
+    gc.add_argument("--keep", type=int, default=1)
+    args = parser.parse_args()
+
+    if args.command is None:
+        main()
+    elif args.command == "stats":
+        get_index_stats(INDEX_NAME)
+    elif args.command == "aliases":
+        print_aliases()
+    elif args.command == "rebuild":
+        ok = all([rebuild_namespace(INDEX_NAME, name, args.keep) for name in args.names])
+        get_index_stats(INDEX_NAME)
+        sys.exit(0 if ok else 1)
+    elif args.command == "switch":
+        switch_alias(args.name, args.namespace)
+    elif args.command == "gc":
+        for name in args.names:
+            gc_versions(INDEX_NAME, name, args.keep)
+
 if __name__ == "__main__":
-    # 메인 실행: 두 namespace 모두 삭제
-    main()
-    
-    # 개별 실행 예시:
-    # delete_industry_namespace()    # industry만 삭제
-    # delete_past_issue_namespace()  # past_issue만 삭제
\ No newline at end of file
+    # 인자 없이 실행하면 기존처럼 industry, past_issue 삭제 (개별 삭제: delete_industry_namespace())
+    # 별칭이 가리키는 namespace는 어느 경로로도 삭제하지 않음
+    cli()